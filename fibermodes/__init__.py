@@ -23,11 +23,18 @@ All those classes are imported if using import *
 
 from .wavelength import Wavelength
 from .mode import Mode, HE11, LP01, Family as ModeFamily
-from .fiber.factory import FiberFactory
-from .simulator.simulator import Simulator
-from .simulator.psimulator import PSimulator
+from importlib import import_module
+import sys
+
+# Classes imported on first use (they load numpy, scipy and
+# multiprocessing), by module where they are defined.
+_LAZY = {'WavelengthGrid': '.wavelengthgrid',
+         'FiberFactory': '.fiber.factory',
+         'Simulator': '.simulator.simulator',
+         'PSimulator': '.simulator.psimulator'}
 
 __all__ = ['Wavelength',
+           'WavelengthGrid',
            'Mode',
            'HE11',
            'LP01',
@@ -36,3 +43,19 @@ __all__ = ['Wavelength',
            'Simulator',
            'PSimulator'
            ]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    value = globals()[name] = getattr(import_module(_LAZY[name], __name__),
+                                      name)
+    return value
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ (PEP 562) is not supported: import them now
+    for _name in __all__:
+        if _name in _LAZY:
+            __getattr__(_name)
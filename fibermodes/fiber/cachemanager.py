@@ -0,0 +1,188 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Memory budget for the caches of fibers.
+
+Each :py:class:`~fibermodes.fiber.fiber.Fiber` keeps the cutoffs,
+effective indexes, and fields it computed. Fibers tell the process-wide
+:py:data:`manager` about the memory they add to their caches, and a
+:py:class:`~fibermodes.simulator.simulator.Simulator` does the same
+for the modes and results it keeps for each fiber. When the total goes
+over the budget, the caches of the least recently used fibers are
+cleared. Before that, their owner is called: a Simulator saves the
+results into its :py:class:`~fibermodes.simulator.store.ResultStore`
+(if it has one), and releases them.
+
+By default, there is no budget, and memory usage is only reported::
+
+    from fibermodes.fiber import cachemanager
+    cachemanager.manager.budget = 500e6  # bytes
+    ...
+    print(cachemanager.manager.usage())
+
+"""
+
+from collections import OrderedDict
+import logging
+import sys
+import threading
+import weakref
+
+
+def sizeof(obj):
+    """Estimated memory used by obj (in bytes), including the items of
+    tuples and lists, and the data of numpy arrays.
+
+    """
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(sizeof(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class CacheManager(object):
+
+    """Memory accounting, and LRU eviction, for the caches of fibers.
+
+    Fibers are tracked through weak references: a fiber that is
+    garbage collected does not count anymore.
+
+    Args:
+        budget(int): Maximum memory (in bytes) used by the caches
+            of all fibers, or None for no limit.
+
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self._fibers = OrderedDict()  # id -> [ref, nbytes, spill]
+        self._lock = threading.RLock()
+        self.used = 0
+        self.peak = 0
+        self.evictions = 0
+        self.spills = 0
+
+    def _entry(self, fiber):
+        """Entry of fiber, moved to the most recently used position."""
+        key = id(fiber)
+        try:
+            entry = self._fibers[key]
+            self._fibers.move_to_end(key)
+        except KeyError:
+            ref = weakref.ref(fiber, self._collected(key))
+            entry = self._fibers[key] = [ref, 0, None]
+        return entry
+
+    def _collected(self, key):
+        def callback(ref):
+            with self._lock:
+                entry = self._fibers.get(key)
+                if entry is not None and entry[0] is ref:
+                    del self._fibers[key]
+                    self.used -= entry[1]
+        return callback
+
+    def track(self, fiber, spill=None):
+        """Mark fiber as the most recently used.
+
+        Args:
+            fiber(Fiber): The fiber.
+            spill(method): Bound method called with the fiber before its
+                caches are evicted, to save (and release) the results
+                kept for it. It returns whether results were saved. It
+                is kept as a weak reference, hence it does not keep its
+                object alive.
+
+        """
+        with self._lock:
+            entry = self._entry(fiber)
+            if spill is not None:
+                entry[2] = weakref.WeakMethod(spill)
+
+    def grow(self, fiber, nbytes):
+        """Account for nbytes added to the caches of fiber.
+
+        The fiber becomes the most recently used. If the budget is
+        exceeded, the caches of other fibers are evicted.
+
+        """
+        with self._lock:
+            entry = self._entry(fiber)
+            entry[1] += nbytes
+            self.used += nbytes
+            self.peak = max(self.peak, self.used)
+            if self.budget is not None and self.used > self.budget:
+                self._evict(id(fiber))
+
+    def _evict(self, keep):
+        for key in list(self._fibers):
+            if self.used <= self.budget:
+                break
+            if key == keep:
+                continue
+            ref, nbytes, spill = self._fibers.pop(key)
+            self.used -= nbytes
+            fiber = ref()
+            if fiber is None:
+                continue
+            spill = spill() if spill is not None else None
+            if spill is not None and spill(fiber):
+                self.spills += 1
+            fiber.clearCaches()
+            self.evictions += 1
+            self.logger.info("Evicted caches of fiber {} ({} bytes)".format(
+                key, nbytes))
+
+    def release(self, fiber):
+        """Stop accounting for the caches of fiber (e.g. when they are
+        cleared).
+
+        """
+        with self._lock:
+            entry = self._fibers.pop(id(fiber), None)
+            if entry is not None:
+                self.used -= entry[1]
+
+    def usage(self):
+        """Report memory usage.
+
+        Returns:
+            dict with *budget*, *used* and *peak* memory (in bytes),
+            number of *fibers* having cached values, and number of
+            *evictions* and *spills* (evictions saved by the owner
+            of the fiber).
+
+        """
+        with self._lock:
+            return {'budget': self.budget,
+                    'used': self.used,
+                    'peak': self.peak,
+                    'fibers': len(self._fibers),
+                    'evictions': self.evictions,
+                    'spills': self.spills}
+
+    def reset(self):
+        """Stop tracking all fibers, and reset counters."""
+        with self._lock:
+            self._fibers.clear()
+            self.used = 0
+            self.peak = 0
+            self.evictions = 0
+            self.spills = 0
+
+
+#: Process-wide cache manager, used by all fibers.
+manager = CacheManager()
@@ -21,21 +21,61 @@
 
 import json
 import time
-from distutils.version import StrictVersion as Version
+import numpy
+from collections import namedtuple
+from collections.abc import MutableSequence
 from operator import mul
 from functools import reduce
-from itertools import product, islice
 from .fiber import Fiber
 from fibermodes.slrc import SLRC
 from fibermodes.fiber import material as materialmod
 from fibermodes.fiber import geometry as geometrymod
-from fibermodes.fiber.solver.solver import FiberSolver
+from fibermodes.fiber import solver as solvermod
 from fibermodes.fiber.material.compmaterial import CompMaterial
 
 
 __version__ = "0.0.1"
 
 
+#: Description of a parameter axis of a fiber factory.
+#: *layer* is the layer number, *key* is 'tparams' or 'mparams',
+#: *pos* is the position of the parameter in that list (radius is
+#: tparams 0), and *size* is the number of values of the parameter.
+FactoryAxis = namedtuple('FactoryAxis', 'layer key pos size')
+
+
+def _fingerprint(obj):
+    """Hashable snapshot of nested factory parameters."""
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _fingerprint(v)) for k, v in obj.items()))
+    elif isinstance(obj, (list, tuple, numpy.ndarray)):
+        return tuple(_fingerprint(v) for v in obj)
+    return obj
+
+
+def _version(s):
+    """Comparable version number from a string like '1.2.3'.
+
+    Raises:
+        ValueError: Invalid version number.
+
+    """
+    return tuple(int(n) for n in s.split('.'))
+
+
+def _decode(index, sizes):
+    """Convert a flat index into a list of indexes, one for each axis.
+
+    Indexes are in the same order as given by :py:func:`itertools.product`
+    (last axis varies fastest).
+
+    """
+    indexes = [0] * len(sizes)
+    for i in range(len(sizes)-1, -1, -1):
+        index, indexes[i] = divmod(index, sizes[i])
+    return indexes
+
+
 class FiberFactoryValidationError(Exception):
 
     """Exception emmited when fiber file does not validate.
@@ -44,19 +84,61 @@ class FiberFactoryValidationError(Exception):
     pass
 
 
+class ParamsProxy(MutableSequence):
+
+    """List of parameters (tparams or mparams) of a layer.
+
+    Modifying a parameter tells the factory that its parameter axes
+    changed. Parameters must be replaced, not modified in place
+    (e.g. the dict of a range).
+
+    """
+
+    def __init__(self, params, factory):
+        self._params = params
+        self._factory = factory
+
+    def __getitem__(self, index):
+        return self._params[index]
+
+    def __setitem__(self, index, value):
+        self._params[index] = value
+        self._factory._changed()
+
+    def __delitem__(self, index):
+        del self._params[index]
+        self._factory._changed()
+
+    def __len__(self):
+        return len(self._params)
+
+    def insert(self, index, value):
+        self._params.insert(index, value)
+        self._factory._changed()
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(self._params)
+
+
 class LayerProxy(object):
 
-    def __init__(self, layer):
+    def __init__(self, layer, factory=None):
         self._layer = layer
+        self._factory = factory
 
     def __getattr__(self, name):
+        if name in ("tparams", "mparams"):
+            return self[name]
         if name in self._layer:
             return self._layer[name]
         else:
             raise AttributeError
 
     def __setattr__(self, name, value):
-        if name == "_layer":
+        if name in ("_layer", "_factory"):
             super().__setattr__(name, value)
         elif name == "material":
             self._material(value)
@@ -64,29 +146,39 @@ class LayerProxy(object):
             self._type(value)
         elif name in self._layer:
             self._layer[name] = value
+            self._changed()
         else:
             super().__setattr__(name, value)
 
     def __getitem__(self, name):
+        if name in ("tparams", "mparams") and self._factory is not None:
+            return ParamsProxy(self._layer[name], self._factory)
         return self._layer[name]
 
     def __setitem__(self, name, value):
         if name in self._layer:
             self._layer[name] = value
+            self._changed()
         else:
             raise KeyError
 
+    def _changed(self):
+        if self._factory is not None:
+            self._factory._changed()
+
     def _material(self, value):
         if value != self.material:
             self._layer["material"] = value
             self._layer["mparams"] = [0] * materialmod.__dict__[value].nparams
+            self._changed()
 
     def _type(self, value):
         self._layer["type"] = value
-        dp = geometrymod.__dict__[value].DEFAULT_PARAMS
+        dp = getattr(geometrymod, value).DEFAULT_PARAMS
         tp = self._layer["tparams"]
         for i in range(len(tp)-1, len(dp)):
             tp.append(dp[i])
+        self._changed()
         # print("_type", value, self._layer["tparams"])
 
     @property
@@ -96,6 +188,7 @@ class LayerProxy(object):
     @radius.setter
     def radius(self, value):
         self._layer["tparams"][0] = value
+        self._changed()
 
 
 class LayersProxy(object):
@@ -107,7 +200,8 @@ class LayersProxy(object):
         return len(self.factory._fibers["layers"])
 
     def __getitem__(self, index):
-        return LayerProxy(self.factory._fibers["layers"][index])
+        return LayerProxy(self.factory._fibers["layers"][index],
+                          self.factory)
 
 
 class FiberFactory(object):
@@ -131,6 +225,7 @@ class FiberFactory(object):
     """
 
     def __init__(self, filename=None):
+        self._axescache = None
         self._fibers = {
             "version": __version__,
             "name": "",
@@ -264,6 +359,50 @@ class FiberFactory(object):
         assert len(kwargs) == 0, "unknown arguments {}".format(
             ", ".join(kwargs.keys()))
         self._fibers["layers"].insert(pos, layer)
+        self._changed()
+
+    def addProfile(self, profile, pos=None, name="", unit=1, **kwargs):
+        """Insert layers from a tabulated index profile.
+
+        The profile is approximated by a staircase of
+        :py:class:`~fibermodes.fiber.geometry.stepindex.StepIndex` layers
+        of :py:class:`~fibermodes.fiber.material.fixed.Fixed` material:
+        sample *i* gives the index between radii *r[i-1]* and *r[i]*.
+        The cladding is not part of the profile; it must be added
+        with :py:meth:`addLayer`.
+
+        Args:
+            profile: Name of a text file (or file object) with two
+                     columns (radius and index), or sequence of
+                     (radius, index) pairs. Radii must be increasing.
+            pos(int or None): Position of the first inserted layer.
+                              By default, layers are inserted at the end.
+            name(string): Base name of the layers. The sample number is
+                          appended to it.
+            unit(float): Unit of the radii in the profile (e.g. 1e-6
+                         for radii in microns).
+            kwargs: Passed to :py:func:`numpy.loadtxt` when reading
+                    a file (e.g. *delimiter*, *skiprows*).
+
+        Returns:
+            Number of inserted layers.
+
+        """
+        if isinstance(profile, str) or hasattr(profile, "read"):
+            profile = numpy.loadtxt(profile, ndmin=2, **kwargs)
+        profile = numpy.asarray(profile, dtype=float)
+        if profile.ndim != 2 or profile.shape[1] != 2:
+            raise ValueError("profile must be a list of (radius, index)")
+        r = profile[:, 0] * unit
+        if numpy.any(numpy.diff(r) <= 0):
+            raise ValueError("profile radii must be increasing")
+        if pos is None:
+            pos = len(self._fibers["layers"])
+        for i, (rho, n) in enumerate(zip(r, profile[:, 1])):
+            self.addLayer(pos + i,
+                          name="{}{}".format(name, i) if name else "",
+                          radius=float(rho), index=float(n))
+        return len(r)
 
     def removeLayer(self, pos=-1):
         """Remore layer at given position (default: last layer)
@@ -273,6 +412,7 @@ class FiberFactory(object):
 
         """
         self._fibers["layers"].pop(pos)
+        self._changed()
 
     def dump(self, fp, **kwargs):
         """Dumps fiber factory to a file.
@@ -324,6 +464,7 @@ class FiberFactory(object):
         fibers = json.loads(s, **kwargs)
         self.validate(fibers)
         self._fibers = fibers
+        self._changed()
 
     def validate(self, obj):
         """Validates that obj is a valid fiber factory.
@@ -341,11 +482,11 @@ class FiberFactory(object):
                 raise FiberFactoryValidationError(
                     "Missing '{}' parameter".format(key))
 
-        if Version(obj["version"]) > Version(__version__):
+        if _version(obj["version"]) > _version(__version__):
             raise FiberFactoryValidationError("Version of loaded object "
                                               "is higher that version "
                                               "of current library")
-        elif Version(obj["version"]) < Version(__version__):
+        elif _version(obj["version"]) < _version(__version__):
             self._upgrade(obj)
 
         for layernum, layer in enumerate(obj["layers"], 1):
@@ -362,40 +503,128 @@ class FiberFactory(object):
         obj["version"] = __version__
 
     def __iter__(self):
-        self._buildFiberList()
-        g = product(*(range(i) for i in self._nitems))
-        return (self._buildFiber(i) for i in g)
+        return iter(FactoryView(self))
 
     def __len__(self):
-        if not self.layers:
-            return 0
-        self._buildFiberList()
-        return reduce(mul, self._nitems)
+        return self._paramAxes()[2]
 
     def __getitem__(self, key):
-        self._buildFiberList()
-        return self._buildFiber(self._getIndexes(key))
+        """Get a fiber, or a view on a subset of the fibers.
+
+        Args:
+            key(int or slice): Index of the fiber, or slice of fibers.
+
+        Returns:
+            :py:class:`~fibermodes.fiber.fiber.Fiber` if key is an int,
+            or :py:class:`FactoryView` if key is a slice.
+
+        Raises:
+            IndexError: Index out of range.
+
+        """
+        return FactoryView(self)[key]
+
+    @property
+    def axes(self):
+        """Tuple of :py:class:`FactoryAxis`, describing each parameter
+        of the factory.
+
+        Fibers are generated in the same order as
+        :py:func:`itertools.product` applied on the axes:
+        the last parameter varies fastest.
+
+        """
+        return self._paramAxes()[0]
+
+    def select(self, axis, key):
+        """Get a view where values of a given parameter are restricted.
+
+        Args:
+            axis(int or tuple): Position of the parameter in
+                :py:attr:`axes`, or (layer, key, pos) tuple
+                (e.g. (0, 'tparams', 0) for the radius of the first layer).
+            key(int or slice): Index of the value to keep, or slice of
+                values to keep.
+
+        Returns:
+            :py:class:`FactoryView`
+
+        """
+        return FactoryView(self).select(axis, key)
+
+    def _changed(self):
+        """Forget the parameter axes, after the layers were modified."""
+        self._axescache = None
 
-    def _buildFiberList(self):
-        self._nitems = []
-        for layer in self._fibers["layers"]:
-            for key in ("tparams", "mparams"):
-                for tp in layer[key]:
-                    self._nitems.append(len(SLRC(tp)))
+    def _paramAxes(self):
+        """Description of parameter axes, SLRC object for each axis,
+        and number of fibers.
+
+        It is cached, and rebuilt only after the layers are modified
+        (through :py:attr:`layers`, :py:meth:`addLayer`,
+        :py:meth:`removeLayer`, or :py:meth:`loads`).
+
+        """
+        if self._axescache is None:
+            axes = []
+            params = []
+            for i, layer in enumerate(self._fibers["layers"]):
+                for key in ("tparams", "mparams"):
+                    for j, p in enumerate(layer[key]):
+                        slrc = SLRC(p)
+                        slrc.codeParams = ["r", "fp", "mp"]
+                        axes.append(FactoryAxis(i, key, j, len(slrc)))
+                        params.append(slrc)
+            size = reduce(mul, (axis.size for axis in axes)) if axes else 0
+            self._axescache = (tuple(axes), params, size)
+        return self._axescache
 
     def _getIndexes(self, index):
         """Get list of indexes from a single index."""
-        g = product(*(range(i) for i in self._nitems))
-        return next(islice(g, index, None))
+        return _decode(index, [axis.size for axis in self.axes])
 
     def setSolvers(self, Cutoff=None, Neff=None):
-        assert Cutoff is None or issubclass(Cutoff, FiberSolver)
-        assert Neff is None or issubclass(Neff, FiberSolver)
+        assert Cutoff is None or issubclass(Cutoff, solvermod.FiberSolver)
+        assert Neff is None or issubclass(Neff, solvermod.FiberSolver)
         self._Cutoff = Cutoff
         self._Neff = Neff
 
+    def fingerprint(self, index):
+        """Hashable description of the fiber at given index.
+
+        Fibers with the same fingerprint are identical (names of the
+        layers are ignored). This allows to find, after the factory
+        was modified, which fibers did not change (see
+        :py:meth:`~fibermodes.simulator.simulator.Simulator.set_factory`).
+        The fingerprint is also the *fingerprint* attribute of the
+        fibers built by the factory.
+
+        Args:
+            index(int): Index of the fiber.
+
+        Returns:
+            tuple
+
+        Raises:
+            IndexError: Index out of range.
+
+        """
+        params = self._fiberParams(FactoryView(self)._indexes(index))
+        return self._fingerprint(params)
+
+    def _fingerprint(self, params):
+        return _fingerprint(params[:5]) + (self._Cutoff, self._Neff)
+
     def _buildFiber(self, indexes):
         """Build Fiber object from list of indexes"""
+        params = self._fiberParams(indexes)
+        fiber = Fiber(*params, Cutoff=self._Cutoff, Neff=self._Neff)
+        fiber.fingerprint = self._fingerprint(params)
+        return fiber
+
+    def _fiberParams(self, indexes):
+        """Parameters (r, f, fp, m, mp, names) of Fiber object
+        at given list of indexes."""
 
         r = []
         f = []
@@ -405,32 +634,27 @@ class FiberFactory(object):
         names = []
 
         # Get parameters for selected fiber
+        params = self._paramAxes()[1]
         ii = 0
         for i, layer in enumerate(self._fibers["layers"], 1):
             name = layer["name"] if layer["name"] else "layer {}".format(i+1)
             names.append(name)
 
             if i < len(self._fibers["layers"]):
-                rr = SLRC(layer["tparams"][0])
-                rr.codeParams = ["r", "fp", "mp"]
-                r.append(rr[indexes[ii]])
+                r.append(params[ii][indexes[ii]])
             ii += 1  # we count radius of cladding, even if we don't use it
 
             f.append(layer["type"])
             fp_ = []
-            for p in layer["tparams"][1:]:
-                ff = SLRC(p)
-                ff.codeParams = ["r", "fp", "mp"]
-                fp_.append(ff[indexes[ii]])
+            for _ in layer["tparams"][1:]:
+                fp_.append(params[ii][indexes[ii]])
                 ii += 1
             fp.append(fp_)
 
             m.append(layer["material"])
             mp_ = []
-            for p in layer["mparams"]:
-                mm = SLRC(p)
-                mm.codeParams = ["r", "fp", "mp"]
-                mp_.append(mm[indexes[ii]])
+            for _ in layer["mparams"]:
+                mp_.append(params[ii][indexes[ii]])
                 ii += 1
             mp.append(mp_)
 
@@ -465,4 +689,101 @@ class FiberFactory(object):
                 del names[i]
             i -= 1
 
-        return Fiber(r, f, fp, m, mp, names, self._Cutoff, self._Neff)
+        return r, f, fp, m, mp, names
+
+
+class FactoryView(object):
+
+    """Read-only view on a subset of the fibers of a
+    :py:class:`FiberFactory`.
+
+    A view is obtained by slicing a factory, or by selecting values
+    of a parameter (see :py:meth:`FiberFactory.select`). Like the factory,
+    it has a length, and it can be iterated or indexed to get
+    :py:class:`~fibermodes.fiber.fiber.Fiber` objects. Views can be
+    sliced or restricted again.
+
+    The view refers to the parameters of the factory at the time it
+    was created. It should not be used after the factory is modified.
+
+    Args:
+        factory(FiberFactory): Parent factory.
+        ranges(list): Selected indexes (range) for each parameter
+            (default: all).
+        flat(range): Selected fibers among the fibers described by
+            ranges (default: all).
+
+    """
+
+    def __init__(self, factory, ranges=None, flat=None):
+        self.factory = factory
+        if ranges is None:
+            ranges = [range(axis.size) for axis in factory.axes]
+        self._ranges = list(ranges)
+        if flat is None:
+            flat = range(self._size())
+        self._flat = flat
+
+    def _size(self):
+        if not self._ranges:
+            return 0
+        return reduce(mul, (len(r) for r in self._ranges))
+
+    def __len__(self):
+        return len(self._flat)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return FactoryView(self.factory, self._ranges, self._flat[key])
+        return self.factory._buildFiber(self._indexes(key))
+
+    def _indexes(self, i):
+        """Indexes, in the parent factory, for each parameter."""
+        local = _decode(self._flat[i], [len(r) for r in self._ranges])
+        return [r[j] for r, j in zip(self._ranges, local)]
+
+    def index(self, i):
+        """Index, in the parent factory, of the i-th fiber of the view.
+
+        Args:
+            i(int): Index of the fiber in the view.
+
+        Returns:
+            int
+
+        """
+        index = 0
+        for j, axis in zip(self._indexes(i), self.factory.axes):
+            index = index * axis.size + j
+        return index
+
+    @property
+    def axes(self):
+        """Tuple of :py:class:`FactoryAxis`, with the number of
+        selected values for each parameter.
+
+        """
+        return tuple(axis._replace(size=len(r))
+                     for axis, r in zip(self.factory.axes, self._ranges))
+
+    def select(self, axis, key):
+        """Get a view where values of a given parameter are restricted.
+
+        See :py:meth:`FiberFactory.select`.
+
+        Raises:
+            ValueError: The view was sliced, or the axis does not exist.
+
+        """
+        if self._flat != range(self._size()):
+            raise ValueError("Cannot select parameter values "
+                             "from a sliced view.")
+        if isinstance(axis, tuple):
+            axis = [a[:3] for a in self.factory.axes].index(axis)
+        ranges = list(self._ranges)
+        r = ranges[axis][key]
+        ranges[axis] = r if isinstance(key, slice) else range(r, r+1)
+        return FactoryView(self.factory, ranges)
@@ -30,16 +30,15 @@ you should use a :py:class:`~fibermodes.simulator.simulator.Simulator`.
 
 from . import geometry
 from . import solver
-from .solver.solver import FiberSolver
 from math import sqrt, isnan, isinf
-from fibermodes import Wavelength, Mode, ModeFamily
+from fibermodes import Wavelength, WavelengthGrid, Mode, ModeFamily
 from fibermodes import constants
-from fibermodes.functions import derivative
 from fibermodes.field import Field
+from .modecache import ModeRegistry, ModeCache, ModeValues
+from . import cachemanager
 from itertools import count
 import logging
-from scipy.optimize import fixed_point
-from functools import lru_cache
+import numpy
 
 
 class Fiber(object):
@@ -60,13 +59,17 @@ class Fiber(object):
         for i, (f_, fp_, m_, mp_) in enumerate(zip(f, fp, m, mp)):
             ri = self._r[i-1] if i else 0
             ro = self._r[i] if i < len(r) else float("inf")
-            layer = geometry.__dict__[f_](ri, ro, *fp_,
+            layer = getattr(geometry, f_)(ri, ro, *fp_,
                                           m=m_, mp=mp_, cm=m[-1], cmp=mp[-1])
             self.layers.append(layer)
 
-        self.co_cache = {Mode("HE", 1, 1): 0,
-                         Mode("LP", 0, 1): 0}
-        self.ne_cache = {}
+        self.registry = ModeRegistry()
+        self.co_cache = ModeValues(ModeCache(self.registry))
+        self.ne_cache = ModeCache(self.registry)
+        self.fi_cache = {}
+        self.clearCaches()
+        self.stats = None
+        self.fingerprint = None  # Set by FiberFactory
 
         self.setSolvers(Cutoff, Neff)
 
@@ -129,7 +132,7 @@ class Fiber(object):
         return self.layers[layer].maxIndex(wl)
 
     def _findCutoffSolver(self):
-        cutoff = FiberSolver
+        cutoff = solver.FiberSolver
         if all(isinstance(layer, geometry.StepIndex)
                for layer in self.layers):
             nlayers = len(self)
@@ -137,6 +140,8 @@ class Fiber(object):
                 cutoff = solver.ssif.Cutoff
             elif nlayers == 3:
                 cutoff = solver.tlsif.Cutoff
+            elif nlayers > 3:
+                cutoff = solver.mlsif.Cutoff
         return cutoff
 
     def _findNeffSolver(self):
@@ -149,8 +154,8 @@ class Fiber(object):
         return neff
 
     def setSolvers(self, Cutoff=None, Neff=None):
-        assert Cutoff is None or issubclass(Cutoff, FiberSolver)
-        assert Neff is None or issubclass(Neff, FiberSolver)
+        assert Cutoff is None or issubclass(Cutoff, solver.FiberSolver)
+        assert Neff is None or issubclass(Neff, solver.FiberSolver)
         if Cutoff is None:
             Cutoff = self._findCutoffSolver()
         self._cutoff = Cutoff(self)
@@ -158,11 +163,32 @@ class Fiber(object):
             Neff = self._findNeffSolver()
         self._neff = Neff(self)
 
+    def clearCaches(self):
+        """Forget the cutoffs, effective indexes, and fields computed
+        for this fiber (e.g. to free memory).
+
+        Memory used by the caches is accounted by
+        :py:data:`fibermodes.fiber.cachemanager.manager`, which calls
+        this when the memory budget is exceeded. Caches are cleared
+        under the lock of the registry, hence values stored meanwhile by
+        another thread are either kept whole, or forgotten.
+
+        """
+        with self.registry.lock:
+            self.co_cache.cache.clear()
+            self.co_cache.update({Mode("HE", 1, 1): 0,
+                                  Mode("LP", 0, 1): 0})
+            self.ne_cache.clear()
+            self.fi_cache.clear()
+        cachemanager.manager.release(self)
+
     def set_ne_cache(self, wl, mode, neff):
-        try:
-            self.ne_cache[wl][mode] = neff
-        except KeyError:
-            self.ne_cache[wl] = {mode: neff}
+        self._store(self.ne_cache, wl, mode, neff)
+
+    def _store(self, cache, wl, mode, value):
+        """Store value into cache, accounting for the cells added."""
+        n = cache.store(wl, mode, value)
+        cachemanager.manager.grow(self, n * ModeCache.ITEMSIZE)
 
     def NA(self, wl):
         n1 = max(layer.maxIndex(wl) for layer in self.layers)
@@ -191,6 +217,7 @@ class Fiber(object):
 
         wl = f(1.55e-6)
         if abs(wl - f(wl)) > tol:
+            from scipy.optimize import fixed_point  # slow to import
             for w in (1.55e-6, 5e-6, 10e-6):
                 try:
                     wl = fixed_point(f, w, xtol=tol, maxiter=maxiter)
@@ -208,24 +235,39 @@ class Fiber(object):
 
         return Wavelength(wl)
 
+    def _solve(self, cache, mode, wl, solver, *args):
+        """Call solver, counting and timing it when stats are enabled."""
+        if self.stats is None:
+            return solver(*args)
+        self.stats.cache(cache, False)
+        with self.stats.measure(solver, mode, wl):
+            return solver(*args)
+
     def cutoff(self, mode):
         try:
-            return self.co_cache[mode]
+            co = self.co_cache[mode]
         except KeyError:
-            co = self._cutoff(mode)
-            self.co_cache[mode] = co
+            co = self._solve('co_cache', mode, None, self._cutoff, mode)
+            self._store(self.co_cache.cache, self.co_cache.wl, mode, co)
             return co
+        if self.stats is not None:
+            self.stats.cache('co_cache', True)
+        return co
 
     def cutoffWl(self, mode):
         return self.toWl(self.cutoff(mode))
 
     def neff(self, mode, wl, delta=1e-6, lowbound=None):
         try:
-            return self.ne_cache[wl][mode]
+            neff = self.ne_cache.lookup(wl, mode)
         except KeyError:
-            neff = self._neff(Wavelength(wl), mode, delta, lowbound)
+            neff = self._solve('ne_cache', mode, wl, self._neff,
+                               Wavelength(wl), mode, delta, lowbound)
             self.set_ne_cache(wl, mode, neff)
             return neff
+        if self.stats is not None:
+            self.stats.cache('ne_cache', True)
+        return neff
 
     def beta(self, omega, mode, p=0, delta=1e-6, lowbound=None):
         wl = Wavelength(omega=omega)
@@ -237,12 +279,12 @@ class Fiber(object):
         j = (m - 1) // 2
         h = 1e12  # This value is critical for accurate computation
         lb = lowbound
-        for i in range(m-1, -1, -1):
+        stencil = WavelengthGrid(omega=omega + (numpy.arange(m) - j) * h)
+        for wl in reversed(stencil):
             # Precompute neff using previous wavelength
-            o = omega + (i-j) * h
-            wl = Wavelength(omega=o)
             lb = self.neff(mode, wl, delta, lb) + delta * 1.1
 
+        from fibermodes.functions import derivative  # imports scipy
         return derivative(
             self.beta, omega, p, m, j, h, mode, 0, delta, lowbound)
 
@@ -329,12 +371,23 @@ class Fiber(object):
         """
         return Field(self, mode, wl, r, np)
 
-    @lru_cache(maxsize=None)
     def _rfield(self, mode, wl, r):
-        neff = self.neff(mode, wl)
-        fct = {ModeFamily.LP: self._neff._lpfield,
-               ModeFamily.TE: self._neff._tefield,
-               ModeFamily.TM: self._neff._tmfield,
-               ModeFamily.EH: self._neff._ehfield,
-               ModeFamily.HE: self._neff._hefield}
-        return fct[mode.family](wl, mode.nu, neff, r)
+        key = (mode, wl, r)
+        try:
+            fields = self.fi_cache[key]
+        except KeyError:
+            if self.stats is not None:
+                self.stats.cache('fi_cache', False)
+            neff = self.neff(mode, wl)
+            fct = {ModeFamily.LP: self._neff._lpfield,
+                   ModeFamily.TE: self._neff._tefield,
+                   ModeFamily.TM: self._neff._tmfield,
+                   ModeFamily.EH: self._neff._ehfield,
+                   ModeFamily.HE: self._neff._hefield}
+            fields = self.fi_cache[key] = fct[mode.family](wl, mode.nu,
+                                                           neff, r)
+            cachemanager.manager.grow(self, cachemanager.sizeof((key, fields)))
+            return fields
+        if self.stats is not None:
+            self.stats.cache('fi_cache', True)
+        return fields
@@ -1,10 +1,31 @@
 """A geometry describes a function applied to the refractive index,
 as function of the radial position.
 
+Geometries are imported on first use, since they load scipy.
+
 """
 
-from .stepindex import StepIndex
-from .supergaussian import SuperGaussian
+from importlib import import_module
+import sys
 
 
 __all__ = ['StepIndex', 'SuperGaussian']
+
+# Module where each geometry is defined
+_MODULES = {'StepIndex': '.stepindex',
+            'SuperGaussian': '.supergaussian'}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    value = globals()[name] = getattr(import_module(_MODULES[name],
+                                                    __name__), name)
+    return value
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ (PEP 562) is not supported: import them now
+    for _name in __all__:
+        __getattr__(_name)
@@ -15,11 +15,12 @@
 
 from fibermodes.fiber.geometry.geometry import Geometry
 from fibermodes import constants
+from fibermodes.functions import ivr, kvr
 from math import sqrt
 import numpy
-from scipy.special import jn, yn, iv, kn
-from scipy.special import j0, y0, i0, k0
-from scipy.special import j1, y1, i1, k1
+from scipy.special import jn, yn, iv, kn, ive, kve
+from scipy.special import j0, y0, i0e, k0e
+from scipy.special import j1, y1, i1e, k1e
 from scipy.special import jvp, yvp, ivp, kvp
 
 
@@ -40,157 +41,389 @@ class StepIndex(Geometry):
         return self._m.n(wl, *self._mp)
 
     def u(self, r, neff, wl):
-        return wl.k0 * r * sqrt(abs(self.index(r, wl)**2 - neff**2))
+        d = abs(self.index(r, wl)**2 - neff**2)
+        return wl.k0 * r * (numpy.sqrt(d) if isinstance(d, numpy.ndarray)
+                            else sqrt(d))
 
     def Psi(self, r, neff, wl, nu, C):
         u = self.u(r, neff, wl)
-        if neff < self.maxIndex(wl):
-            psi = (C[0] * jn(nu, u) + C[1] * yn(nu, u) if C[1] else
-                   C[0] * jn(nu, u))
-            psip = u * (C[0] * jvp(nu, u) + C[1] * yvp(nu, u) if C[1] else
-                        C[0] * jvp(nu, u))
-        else:
-            psi = (C[0] * iv(nu, u) + C[1] * kn(nu, u) if C[1] else
-                   C[0] * iv(nu, u))
-            psip = u * (C[0] * ivp(nu, u) + C[1] * kvp(nu, u) if C[1] else
-                        C[0] * ivp(nu, u))
-        # if numpy.isnan(psi):
-        #     print(neff, self.maxIndex(wl), C, r)
-        return psi, psip
+        if isinstance(neff, numpy.ndarray):
+            with numpy.errstate(all='ignore'):
+                g = self._psi(nu, u, C, True)
+                e = self._psi(nu, u, C, False)
+            guided = neff < self.maxIndex(wl)
+            return tuple(numpy.where(guided, a, b) for a, b in zip(g, e))
+        return self._psi(nu, u, C, neff < self.maxIndex(wl))
+
+    @staticmethod
+    def _psi(nu, u, C, guided):
+        """Same as Psi, using J and Y if guided, otherwise I and K."""
+        F, G, Fp, Gp = (jn, yn, jvp, yvp) if guided else (iv, kn, ivp, kvp)
+        if numpy.any(C[1]):
+            return (C[0] * F(nu, u) + C[1] * G(nu, u),
+                    u * (C[0] * Fp(nu, u) + C[1] * Gp(nu, u)))
+        return C[0] * F(nu, u), u * (C[0] * Fp(nu, u))
 
     def lpConstants(self, r, neff, wl, nu, A):
         u = self.u(r, neff, wl)
-        if neff < self.maxIndex(wl):
+        if isinstance(neff, numpy.ndarray):
+            with numpy.errstate(all='ignore'):
+                g = self._lpConstants(nu, u, A, True)
+                e = self._lpConstants(nu, u, A, False)
+            guided = neff < self.maxIndex(wl)
+            return tuple(numpy.where(guided, a, b) for a, b in zip(g, e))
+        return self._lpConstants(nu, u, A, neff < self.maxIndex(wl))
+
+    @staticmethod
+    def _lpConstants(nu, u, A, guided):
+        """Same as lpConstants, using J and Y if guided, otherwise I and K."""
+        if guided:
             W = constants.pi / 2
             return (W * (u * yvp(nu, u) * A[0] - yn(nu, u) * A[1]),
                     W * (jn(nu, u) * A[1] - u * jvp(nu, u) * A[0]))
         else:
-            return ((u * kvp(nu, u) * A[0] - kn(nu, u) * A[1]),
-                    (iv(nu, u) * A[1] - u * ivp(nu, u) * A[0]))
+            # Wronskian is I K' - I' K = -1 / u
+            return ((kn(nu, u) * A[1] - u * kvp(nu, u) * A[0]),
+                    (u * ivp(nu, u) * A[0] - iv(nu, u) * A[1]))
 
-    def EH_fields(self, ri, ro, nu, neff, wl, EH, tm=True):
-        """
+    def EH_fields(self, ri, ro, nu, neff, wl, EH, tm=True, C=None):
+        """Compute fields at outer radius of the layer, from fields at
+        inner radius.
 
         modify EH in-place (for speed)
 
+        Args:
+            ri(float): Inner radius.
+            ro(float): Outer radius.
+            nu(int): Azimuthal number.
+            neff(float or array): Effective index.
+            wl(Wavelength): Wavelength.
+            EH(array): Fields (Ez, Hz, Ephi, Hphi) at ri. Shape is (4,)
+                if nu == 0, otherwise (4, 2). Additional dimensions are
+                used when neff is an array.
+            tm(bool): TM (True) or TE (False) mode, when nu == 0.
+            C(array): Buffer where constants are written (same shape
+                as EH). A new array is created by default. Nothing is
+                stored on the layer, so that it can be shared between
+                threads.
+
+        Returns:
+            EH
+
         """
+        if C is None:
+            C = numpy.empty(numpy.shape(EH))
         n = self.maxIndex(wl)
         u = self.u(ro, neff, wl)
 
         if ri == 0:
+            C[:] = 0
             if nu == 0:
                 if tm:
-                    self.C = numpy.array([1., 0., 0., 0.])
+                    C[0] = 1
                 else:
-                    self.C = numpy.array([0., 0., 1., 0.])
+                    C[2] = 1
             else:
-                self.C = numpy.zeros((4, 2))
-                self.C[0, 0] = 1  # Ez = 1
-                self.C[2, 1] = 1  # Hz = alpha
+                C[0, 0] = 1  # Ez = 1
+                C[2, 1] = 1  # Hz = alpha
         elif nu == 0:
-            self.C = numpy.zeros(4)
             if tm:
                 c = constants.Y0 * n * n
-                idx = (0, 3)
-                self.C[:2] = self.tetmConstants(ri, ro, neff, wl, EH, c, idx)
+                self.tetmConstants(ri, ro, neff, wl, EH, c, (0, 3), C[:2])
+                C[2:] = 0
             else:
                 c = -constants.eta0
-                idx = (1, 2)
-                self.C[2:] = self.tetmConstants(ri, ro, neff, wl, EH, c, idx)
+                self.tetmConstants(ri, ro, neff, wl, EH, c, (1, 2), C[2:])
+                C[:2] = 0
         else:
-            self.C = self.vConstants(ri, ro, neff, wl, nu, EH)
+            self.vConstants(ri, ro, neff, wl, nu, EH, C)
 
         # Compute EH fields
-        if neff < n:
-            c1 = wl.k0 * ro / u
-            F3 = jvp(nu, u) / jn(nu, u)
-            F4 = yvp(nu, u) / yn(nu, u)
-        else:
-            c1 = -wl.k0 * ro / u
-            F3 = ivp(nu, u) / iv(nu, u)
-            F4 = kvp(nu, u) / kn(nu, u)
-
+        _, _, F3, F4, s = self._bessel(nu, u, u, neff < n)
+        c1 = s * wl.k0 * ro / u
         c2 = neff * nu / u * c1
         c3 = constants.eta0 * c1
         c4 = constants.Y0 * n * n * c1
 
-        EH[0] = self.C[0] + self.C[1]
-        EH[1] = self.C[2] + self.C[3]
-        EH[2] = (c2 * (self.C[0] + self.C[1]) -
-                 c3 * (F3 * self.C[2] + F4 * self.C[3]))
-        EH[3] = (c4 * (F3 * self.C[0] + F4 * self.C[1]) -
-                 c2 * (self.C[2] + self.C[3]))
+        return self._product(((1, 1, 0, 0),
+                              (0, 0, 1, 1),
+                              (c2, c2, -c3 * F3, -c3 * F4),
+                              (c4 * F3, c4 * F4, -c2, -c2)),
+                             C, EH, isinstance(neff, numpy.ndarray))
 
-        return EH
+    @classmethod
+    def transferMatrix(cls, ri, ro, n, neff, wl, nu):
+        """Transfer matrices of step-index layers.
 
-    def vConstants(self, ri, ro, neff, wl, nu, EH):
-        a = numpy.zeros((4, 4))
-        n = self.maxIndex(wl)
-        u = self.u(ro, neff, wl)
-        urp = self.u(ri, neff, wl)
+        The transfer matrix gives the fields (Ez, Hz, Ephi, Hphi) at
+        outer radius of a layer, from the fields at its inner radius.
+        It is computed for many layers at once, which is faster than
+        calling :py:meth:`EH_fields` on each layer when layers are
+        numerous (e.g. tabulated index profiles).
+
+        Args:
+            ri(array): Inner radius of each layer (must not be 0).
+            ro(array): Outer radius of each layer.
+            n(array): Refractive index of each layer.
+            neff(float or array): Effective index.
+            wl(Wavelength): Wavelength.
+            nu(int): Azimuthal number.
+
+        ri, ro, n and neff are broadcast together.
+
+        Returns:
+            array of shape (..., 4, 4).
+
+        """
+        kappa = wl.k0 * numpy.sqrt(numpy.abs(n * n - neff * neff))
+        u = kappa * ro
+        urp = kappa * ri
+        guided = numpy.less(neff, n)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            F1, F2, F3, F4, G3, G4, s = cls._layerBessel(nu, u, urp, guided)
+            c1 = s * wl.k0 * ro / u
+            c2 = neff * nu / urp * c1
+            c3 = constants.eta0 * c1
+            c4 = constants.Y0 * n * n * c1
+            c5 = neff * nu / u * c1
+
+            # Constants from fields at ri (see vConstants)
+            D = F1 * F4 - F2 * F3
+            a = F4 / D
+            b = -F2 / D
+            c = -F3 / D
+            d = F1 / D
+            Q = cls._stack(((a, b * c2 / c4, 0, b / c4),
+                            (c, d * c2 / c4, 0, d / c4),
+                            (b * c2 / c3, a, -b / c3, 0),
+                            (d * c2 / c3, c, -d / c3, 0)), u.shape)
+            # Fields at ro from constants (see EH_fields)
+            P = cls._stack(((1, 1, 0, 0),
+                            (0, 0, 1, 1),
+                            (c5, c5, -c3 * G3, -c3 * G4),
+                            (c4 * G3, c4 * G4, -c5, -c5)), u.shape)
+        return numpy.matmul(P, Q)
+
+    @classmethod
+    def lpTransferMatrix(cls, ri, ro, n, neff, wl, nu):
+        """Transfer matrices of step-index layers, for LP modes.
+
+        Same as :py:meth:`transferMatrix`, for (psi, psip) fields
+        (see :py:meth:`Psi`).
+
+        Returns:
+            array of shape (..., 2, 2).
+
+        """
+        kappa = wl.k0 * numpy.sqrt(numpy.abs(n * n - neff * neff))
+        u = kappa * ro
+        urp = kappa * ri
+        guided = numpy.less(neff, n)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            F1, F2, F3, F4, G3, G4, _ = cls._layerBessel(nu, u, urp, guided)
+            E = F1 * F4 - F2 * F3
+            return cls._stack((((F4 - F3) / E,
+                                (F1 - F2) / (urp * E)),
+                               (u * (G3 * F4 - G4 * F3) / E,
+                                u * (G4 * F1 - G3 * F2) / (urp * E))),
+                              u.shape, 2)
+
+    @staticmethod
+    def _layerBessel(nu, u, urp, guided):
+        """Bessel functions for transfer matrices (arrays only).
+
+        Returns:
+            (F1, F2, F3, F4, G3, G4, s): same as :py:meth:`_bessel` for
+            (F1, F2, F3, F4), and derivatives at u (G3, G4).
+
+        """
+        u, urp, guided = numpy.broadcast_arrays(u, urp, guided)
+        F = numpy.empty((7,) + guided.shape)
+        for g in (True, False):
+            mask = guided if g else ~guided
+            if not mask.any():
+                continue
+            x = u[mask]
+            y = urp[mask]
+            if g:
+                a, b = jn(nu, x), yn(nu, x)
+                am, bm = jn(nu-1, x), yn(nu-1, x)
+                c, d = jn(nu, y), yn(nu, y)
+                cm, dm = jn(nu-1, y), yn(nu-1, y)
+                F[6][mask] = 1
+            else:
+                # Exponentially scaled functions
+                e = numpy.exp(y - x)
+                a, b = ive(nu, x), kve(nu, x)
+                am, bm = ive(nu-1, x), -kve(nu-1, x)
+                c, d = ive(nu, y) * e, kve(nu, y) / e
+                cm, dm = ive(nu-1, y) * e, -kve(nu-1, y) / e
+                F[6][mask] = -1
+            # Z' = Z_nu-1 - nu / x Z (-K_nu-1 for K)
+            F[0][mask] = c / a
+            F[1][mask] = d / b
+            F[2][mask] = (cm - nu / y * c) / a
+            F[3][mask] = (dm - nu / y * d) / b
+            F[4][mask] = am / a - nu / x
+            F[5][mask] = bm / b - nu / x
+        return tuple(F)
+
+    @staticmethod
+    def _stack(m, shape, size=4):
+        """Array of shape (..., size, size) from nested tuples of arrays."""
+        M = numpy.empty(shape + (size, size))
+        for i, row in enumerate(m):
+            for j, x in enumerate(row):
+                M[..., i, j] = x
+        return M
+
+    @staticmethod
+    def _bessel(nu, u, urp, guided):
+        """Bessel functions at urp, normalized by their value at u.
 
-        if neff < n:
+        Returns:
+            (F1, F2, F3, F4, s): Bessel functions of first and second
+            kind (J and Y if guided, otherwise I and K), their derivatives,
+            and the sign (1 if guided, otherwise -1).
+
+        """
+        if isinstance(guided, numpy.ndarray):
+            # Each kind of function is only evaluated where needed
+            same = urp is u
+            u, urp = numpy.broadcast_arrays(u, urp)
+            F = numpy.empty((5,) + guided.shape)
+            with numpy.errstate(all='ignore'):
+                for g in (True, False):
+                    mask = guided if g else ~guided
+                    if mask.any():
+                        v = u[mask]
+                        f = StepIndex._bessel(
+                            nu, v, v if same else urp[mask], g)
+                        for i in range(5):
+                            F[i][mask] = f[i]
+            return tuple(F)
+
+        if guided:
             B1 = jn(nu, u)
             B2 = yn(nu, u)
-            F1 = jn(nu, urp) / B1
-            F2 = yn(nu, urp) / B2
-            F3 = jvp(nu, urp) / B1
-            F4 = yvp(nu, urp) / B2
-            c1 = wl.k0 * ro / u
+            if urp is u:
+                return 1, 1, jvp(nu, u) / B1, yvp(nu, u) / B2, 1
+            return (jn(nu, urp) / B1, yn(nu, urp) / B2,
+                    jvp(nu, urp) / B1, yvp(nu, urp) / B2, 1)
+        else:
+            # Exponentially scaled, to avoid overflow at large u
+            if urp is u:
+                return 1, 1, ivr(nu, u), kvr(nu, u), -1
+            B1 = ive(nu, u) / numpy.exp(urp - u)
+            B2 = kve(nu, u) / numpy.exp(u - urp)
+            return (ive(nu, urp) / B1, kve(nu, urp) / B2,
+                    (ive(nu-1, urp) + ive(nu+1, urp)) / (2 * B1),
+                    -(kve(nu-1, urp) + kve(nu+1, urp)) / (2 * B2), -1)
+
+    def _bessel0(self, u, urp, guided):
+        """Same as _bessel, for nu == 0."""
+        if isinstance(guided, numpy.ndarray):
+            with numpy.errstate(all='ignore'):
+                g = self._bessel0(u, urp, True)
+                e = self._bessel0(u, urp, False)
+            return tuple(numpy.where(guided, a, b) for a, b in zip(g, e))
+
+        if guided:
+            B1 = j0(u)
+            B2 = y0(u)
+            return (j0(urp) / B1, y0(urp) / B2,
+                    -j1(urp) / B1, -y1(urp) / B2, 1)
         else:
-            B1 = iv(nu, u)
-            B2 = kn(nu, u)
-            F1 = iv(nu, urp) / B1 if u else 1
-            F2 = kn(nu, urp) / B2
-            F3 = ivp(nu, urp) / B1 if u else 1
-            F4 = kvp(nu, urp) / B2
-            c1 = -wl.k0 * ro / u
+            B1 = i0e(u) / numpy.exp(urp - u)
+            B2 = k0e(u) / numpy.exp(u - urp)
+            return (i0e(urp) / B1, k0e(urp) / B2,
+                    i1e(urp) / B1, -k1e(urp) / B2, -1)
+
+    def vConstants(self, ri, ro, neff, wl, nu, EH, C=None):
+        """Constants (A, B, A', B') of the fields in the layer,
+        from fields EH at inner radius.
+
+        The 4x4 system has a block structure: it is solved as two
+        2x2 systems sharing the same matrix.
+
+        Args:
+            C(array): Buffer where constants are written (same shape
+                as EH). A new array is created by default.
+
+        Returns:
+            C
+
+        """
+        if C is None:
+            C = numpy.empty(numpy.shape(EH))
+        n = self.maxIndex(wl)
+        u = self.u(ro, neff, wl)
+        urp = self.u(ri, neff, wl)
+
+        F1, F2, F3, F4, s = self._bessel(nu, u, urp, neff < n)
+        c1 = s * wl.k0 * ro / u
         c2 = neff * nu / urp * c1
         c3 = constants.eta0 * c1
         c4 = constants.Y0 * n * n * c1
 
-        a[0, 0] = F1
-        a[0, 1] = F2
-        a[1, 2] = F1
-        a[1, 3] = F2
-        a[2, 0] = F1 * c2
-        a[2, 1] = F2 * c2
-        a[2, 2] = -F3 * c3
-        a[2, 3] = -F4 * c3
-        a[3, 0] = F3 * c4
-        a[3, 1] = F4 * c4
-        a[3, 2] = -F1 * c2
-        a[3, 3] = -F2 * c2
-
-        return numpy.linalg.solve(a, EH)
-
-    def tetmConstants(self, ri, ro, neff, wl, EH, c, idx):
-        a = numpy.empty((2, 2))
+        # The system reduces to
+        # [F1 F2; F3 F4] [A; B] = [Ez; (Hphi + c2 Hz) / c4]
+        # [F1 F2; F3 F4] [A'; B'] = [Hz; (c2 Ez - Ephi) / c3]
+        D = F1 * F4 - F2 * F3
+        a = F4 / D
+        b = -F2 / D
+        c = -F3 / D
+        d = F1 / D
+        return self._product(
+            ((a, b * c2 / c4, 0, b / c4),
+             (c, d * c2 / c4, 0, d / c4),
+             (b * c2 / c3, a, -b / c3, 0),
+             (d * c2 / c3, c, -d / c3, 0)),
+            EH, C, isinstance(neff, numpy.ndarray))
+
+    def _product(self, m, X, out, batch):
+        """Matrix product out = m X, where m is a 4x4 matrix given as nested
+        tuples (of floats, or of arrays if batch is True).
+
+        """
+        if batch:
+            for i in range(4):
+                out[i] = (m[i][0] * X[0] + m[i][1] * X[1] +
+                          m[i][2] * X[2] + m[i][3] * X[3])
+        else:
+            numpy.dot(numpy.array(m), X, out=out)
+        return out
+
+    def tetmConstants(self, ri, ro, neff, wl, EH, c, idx, C=None):
+        """Constants of the fields in the layer, for TE or TM modes.
+
+        Args:
+            c(float): -eta0 for TE modes, or Y0 n^2 for TM modes.
+            idx(tuple): Indexes of the fields in EH: (1, 2) for TE modes,
+                or (0, 3) for TM modes.
+            C(array): Buffer of length 2 where constants are written.
+                A new array is created by default.
+
+        Returns:
+            C
+
+        """
         n = self.maxIndex(wl)
         u = self.u(ro, neff, wl)
         urp = self.u(ri, neff, wl)
 
-        if neff < n:
-            B1 = j0(u)
-            B2 = y0(u)
-            F1 = j0(urp) / B1
-            F2 = y0(urp) / B2
-            F3 = -j1(urp) / B1
-            F4 = -y1(urp) / B2
-            c1 = wl.k0 * ro / u
-        else:
-            B1 = i0(u)
-            B2 = k0(u)
-            F1 = i0(urp) / B1
-            F2 = k0(urp) / B2
-            F3 = i1(urp) / B1
-            F4 = -k1(urp) / B2
-            c1 = -wl.k0 * ro / u
-        c3 = c * c1
-
-        a[0, 0] = F1
-        a[0, 1] = F2
-        a[1, 0] = F3 * c3
-        a[1, 1] = F4 * c3
-
-        return numpy.linalg.solve(a, EH.take(idx))
+        F1, F2, F3, F4, s = self._bessel0(u, urp, neff < n)
+        c3 = c * s * wl.k0 * ro / u
+
+        e0 = EH[idx[0]]
+        e1 = EH[idx[1]]
+        D = c3 * (F1 * F4 - F2 * F3)
+        a = (c3 * F4 * e0 - F2 * e1) / D
+        b = (F1 * e1 - c3 * F3 * e0) / D
+        if C is None:
+            return numpy.array((a, b))
+        C[0] = a
+        C[1] = b
+        return C
@@ -20,13 +20,20 @@ import numpy
 from scipy.special import jn, iv
 from scipy.special import jvp, ivp
 
-from scipy.integrate import ode
+from scipy.integrate import DOP853
 
 
 class SuperGaussian(Geometry):
 
     DEFAULT_PARAMS = [0, 1e-6, 1]
 
+    #: Start of the integration, relative to the outer radius,
+    #: for the center layer (the equations are singular at r = 0).
+    R0 = 1e-3
+
+    #: Relative tolerance of the integration.
+    RTOL = 1e-10
+
     def __init__(self, ri, ro, *fp, **kwargs):
         super().__init__(ri, ro, *fp, **kwargs)
         mu, self.c, self.m = fp
@@ -34,35 +41,43 @@ class SuperGaussian(Geometry):
             self.mu = mu
         else:
             self.mu = (self.ro - self.ri) / 2 + self.ri + mu
+        self._indexcache = (None, None, None)
+        self._step = {}
 
-    def index(self, r, wl):
-        if self.ri <= abs(r) <= self.ro:
+    def _indexes(self, wl):
+        """Indexes of the material and of the cladding material.
+
+        They are cached for the last wavelength, since the profile
+        is evaluated many times during integration.
 
+        """
+        cwl, n, cn = self._indexcache
+        if wl != cwl:
             n = self._m.n(wl, *self._mp)
             cn = self._cm.n(wl, *self._cmp)
+            self._indexcache = (wl, n, cn)  # single assignment (threads)
+        return n, cn
 
-            if r > 0 or self.ri == 0:
-                a = exp(-0.5 * ((r - self.mu) / self.c)**(2*self.m))
-            else:
-                a = exp(-0.5 * ((r + self.mu) / self.c)**(2*self.m))
+    def _a(self, r):
+        """Shape of the profile (between 0 and 1) at radius r."""
+        x = ((r - self.mu) if r > 0 or self.ri == 0 else (r + self.mu))
+        return exp(-0.5 * (x / self.c)**(2*self.m))
 
+    def index(self, r, wl):
+        if self.ri <= abs(r) <= self.ro:
+            n, cn = self._indexes(wl)
+            a = self._a(r)
             assert a <= 1
-
             return cn + a * (n - cn)
 
         return None
 
     def indexp(self, r, wl):
         """First derivative of index."""
-        n = self._m.n(wl, *self._mp)
-        cn = self._cm.n(wl, *self._cmp)
-
-        if r > 0 or self.ri == 0:
-            return ((cn - n) * self.m * n *
-                    ((r - self.mu) / self.c)**(2*self.m - 1) / self.c)
-        else:
-            return ((cn - n) * self.m * n *
-                    ((r + self.mu) / self.c)**(2*self.m) / (self.mu + r))
+        n, cn = self._indexes(wl)
+        x = ((r - self.mu) if r > 0 or self.ri == 0 else (r + self.mu))
+        x /= self.c
+        return (cn - n) * self.m * self._a(r) * x**(2*self.m - 1) / self.c
 
     def minIndex(self, wl):
         di = abs(self.mu - self.ri)
@@ -80,114 +95,107 @@ class SuperGaussian(Geometry):
     def u(self, r, neff, wl):
         return wl.k0 * r * sqrt(abs(self.index(r, wl)**2 - neff**2))
 
-    def EH_fields(self, ri, ro, nu, neff, wl, EH, tm=False):
-        dr = 1e-10
+    def EH_fields(self, ri, ro, nu, neff, wl, EH, tm=True):
+        """Compute fields at outer radius of the layer, from fields at
+        inner radius.
+
+        The tangential fields (Ez, Hz, Ephi, Hphi) are integrated
+        together, as a first order system derived from Maxwell's
+        equations. Unlike the second order equations for Ez and Hz,
+        this system only involves n(r), and is regular where
+        n(r) = neff. The initial step size is reused from the previous
+        integration of the same layer.
+
+        Args:
+            ri(float): Inner radius.
+            ro(float): Outer radius.
+            nu(int): Azimuthal number.
+            neff(float): Effective index.
+            wl(Wavelength): Wavelength.
+            EH(array): Fields (Ez, Hz, Ephi, Hphi) at ri. Shape is (4,)
+                if nu == 0, otherwise (4, 2). Modified in-place.
+            tm(bool): TM (True) or TE (False) mode, when nu == 0.
+
+        Returns:
+            EH
+
+        """
+        k0 = wl.k0
         if ri == 0:
-            # set initial condition
-            ri = dr
-            n = self.index(ri, wl)
-            u = self.u(ri, neff, wl)
-            if neff < n:
-                ez = jn(nu, u)
-                ezp = jvp(nu, u) * u / ri
-            else:
-                ez = iv(nu, u)
-                ezp = ivp(nu, u) * u / ri
-            hz = 0
-            hzp = 0
-            eza = 0
-            ezap = 0
-            hza = ez
-            hzap = ezp
-        elif nu == 0:
-            ez, hz = EH
+            ri = self.R0 * ro
+            y = self._axisFields(ri, nu, neff, wl, tm, EH.shape)
         else:
-            ez, eza = EH[0]
-            hz, hza = EH[1]
-            # find derivatives...
-
-        nu2 = nu * nu
-        beta = wl.k0 * neff
-        beta2 = beta * beta
-
-        def f(r, y):
-            """
-            Bures (3.139)
-
-            """
-            assert r != 0
-            r2 = r * r
-            p = (wl.k0 * self.index(r, wl))**2 - beta2
-
-            np = self.indexp(r, wl)
-            n = self.index(r, wl)
-
-            yp = numpy.empty(4)
-            yp[0] = y[2]
-            yp[1] = y[3]
-            yp[2] = (y[0] * (nu2 / r2 - p) +
-                     y[2] * (2 * beta2 / p * np / n - 1 / r) -
-                     y[1] * constants.eta0 * (2 * nu * beta * wl.k0 * np /
-                                              (r * p * n)))
-            yp[3] = (y[1] * (nu2 / r2 - p) +
-                     y[3] * (2 * wl.k0**2 * n * np / p - 1 / r) -
-                     y[0] * constants.Y0 * (2 * nu * beta * wl.k0 * n * np /
-                                            (r * p)))
-            return yp
-
-        def jac(r, y):
-            r2 = r * r
-            p = (wl.k0 * self.index(r, wl))**2 - beta2
-
-            np = self.indexp(r, wl)
-            n = self.index(r, wl)
-
-            m = numpy.empty((4, 4))
-            m[0, :] = (0, 0, 1, 0)
-            m[1, :] = (0, 0, 0, 1)
-            m[2, :] = ((nu2 / r2 - p),
-                       -(constants.eta0 * (2 * nu * beta * wl.k0 * np /
-                                           (r * p * n))),
-                       (2 * wl.k0**2 * n * np / p - 1 / r),
-                       0)
-            m[3, :] = (-constants.Y0 * (2 * nu * beta * wl.k0 * n * np /
-                                        (r * p)),
-                       0,
-                       (nu2 / r2 - p),
-                       (2 * wl.k0**2 * n * np / p - 1 / r))
-            return m
-
-        s = ode(f, jac).set_integrator("dopri5")
-
-        if nu == 0:
-            s.set_initial_value([ez, hz, ezp, hzp], ri)
-            ez, hz, ezp, hzp = s.integrate(ro)
-
-            EH = ez, hz
-            Ezp = numpy.array([ezp])
-            Hzp = numpy.array([hzp])
-        else:
-            s.set_initial_value([ez, hz, ezp, hzp], ri)
-            ez, hz, ezp, hzp = s.integrate(ro)
-
-            s.set_initial_value([eza, hza, ezap, hzap], ri)
-            eza, hza, ezap, hzap = s.integrate(ro)
-
-            EH[0] = ez, eza
-            EH[1] = hz, hza
+            y = numpy.array(EH, dtype=float)
+            if nu == 0:
+                # Only TM (Ez, Hphi) or TE (Hz, Ephi) components
+                y[[1, 2] if tm else [0, 3]] = 0
+        y[1] *= constants.eta0  # integrate eta0 H
+        y[3] *= constants.eta0
+
+        n, cn = self._indexes(wl)
+        dn = n - cn
+        b2 = neff * neff
+        a = self._a
+        shape = y.shape
+        A = numpy.zeros((4, 4))
+
+        def f(x, y):
+            """d(Ez, Hz, Ephi, Hphi)/dx, with x = k0 r"""
+            n2 = (cn + a(x / k0) * dn)**2
+            nx = nu / x
+            A[0, 1] = neff * nx / n2
+            A[0, 3] = 1 - b2 / n2
+            A[1, 0] = neff * nx
+            A[1, 2] = b2 - n2
+            A[2, 1] = 1 - nx * nx / n2
+            A[2, 2] = A[3, 3] = -1 / x
+            A[2, 3] = A[0, 1]
+            A[3, 0] = nx * nx - n2
+            A[3, 2] = A[1, 0]
+            return A.dot(y.reshape(shape)).ravel()
+
+        key = (ri, ro, nu)
+        solver = DOP853(f, k0 * ri, y.ravel(), k0 * ro,
+                        rtol=self.RTOL, atol=self.RTOL * abs(y).max(),
+                        first_step=self._step.get(key))
+        if solver.status == 'running':
+            solver.step()
+            self._step[key] = solver.t - k0 * ri
+        while solver.status == 'running':
+            solver.step()
+        if solver.status == 'failed':
+            EH[:] = float("nan")
+            return EH
+
+        y = solver.y.reshape(shape)
+        EH[0] = y[0]
+        EH[1] = y[1] / constants.eta0
+        EH[2] = y[2]
+        EH[3] = y[3] / constants.eta0
+        return EH
 
-            Ezp = numpy.array([ezp, ezap])
-            Hzp = numpy.array([hzp, hzap])
+    def _axisFields(self, r, nu, neff, wl, tm, shape):
+        """Fields at small radius r, from the solutions of a uniform
+        layer with the index on the axis.
 
-        # calc ephi and hphi
-        u = self.u(ro, neff, wl)
-        n = self.index(ro, wl)
-        beta = wl.k0 * neff
-        c = 1 / (wl.k0**2 * (n*n - neff*neff))
+        Solutions are Ez = Z(u) (first column) and Hz = Z(u)
+        (second column), where Z is J if guided, otherwise I.
 
-        EH[2] = c * (beta * EH[0] * nu / ro -
-                     constants.eta0 * wl.k0 * Hzp)
-        EH[3] = c * (-beta * EH[1] * nu / ro +
-                     constants.Y0 * wl.k0 * n * n * Ezp)
+        """
+        n = self.index(r, wl)
+        k0 = wl.k0
+        beta = k0 * neff
+        u = self.u(r, neff, wl)
+        if neff < n:
+            z, zp = jn(nu, u), jvp(nu, u) * u / r
+        else:
+            z, zp = iv(nu, u), ivp(nu, u) * u / r
+        c = 1 / (k0 * k0 * (n * n - neff * neff))
 
-        return EH
+        te = numpy.array((0, z, -c * constants.eta0 * k0 * zp,
+                          -c * beta * nu / r * z))
+        tm_ = numpy.array((z, 0, c * beta * nu / r * z,
+                           c * constants.Y0 * k0 * n * n * zp))
+        if nu == 0:
+            return tm_ if tm else te
+        return numpy.column_stack((tm_, te)).reshape(shape)
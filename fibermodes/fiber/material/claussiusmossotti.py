@@ -15,7 +15,6 @@
 
 from .compmaterial import CompMaterial
 import numpy
-from math import sqrt
 
 
 class ClaussiusMossotti(CompMaterial):
@@ -35,6 +34,7 @@ class ClaussiusMossotti(CompMaterial):
         cls._testRange(wl)
         cls._testConcentration(x)
 
-        wl2 = wl * wl
-        s = numpy.sum((cls.A + cls.B * x) * wl2 / (wl2 - cls.Z * cls.Z))
-        return sqrt((2 * s + 1) / (1 - s))
+        wl2 = numpy.square(wl)[..., numpy.newaxis]  # sum on last axis
+        s = numpy.sum((cls.A + cls.B * x) * wl2 / (wl2 - cls.Z * cls.Z),
+                      axis=-1)
+        return ((2 * s + 1) / (1 - s)) ** 0.5
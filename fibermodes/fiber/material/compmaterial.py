@@ -17,7 +17,6 @@
 
 import warnings
 from .material import Material, OutOfRangeWarning
-from scipy.optimize import brentq
 
 
 class CompMaterial(Material):
@@ -52,6 +51,7 @@ class CompMaterial(Material):
             else:
                 assert n2 <= n <= n1
 
+        from scipy.optimize import brentq  # slow to import
         x = 1 if cls.XRANGE is None else cls.XRANGE
         return brentq(lambda x: cls.n(wl, x)-n, 0, x)
 
@@ -19,8 +19,8 @@ A material gives a refractive index, as function of the wavelength.
 
 """
 
-from scipy.optimize import brentq
 import warnings
+import numpy
 
 
 class OutOfRangeWarning(UserWarning):
@@ -53,7 +53,10 @@ class Material(object):
     def _testRange(cls, wl):
         if cls.WLRANGE is None:
             return
-        if cls.WLRANGE[0] <= wl <= cls.WLRANGE[1]:
+        lo = hi = wl
+        if isinstance(wl, numpy.ndarray):
+            lo, hi = wl.min(), wl.max()
+        if cls.WLRANGE[0] <= lo and hi <= cls.WLRANGE[1]:
             return
 
         msg = ("Wavelength {} out of supported range for material {}. "
@@ -86,6 +89,7 @@ class Material(object):
                           OutOfRangeWarning)
             return None
 
+        from scipy.optimize import brentq  # slow to import
         return brentq(f, cls.WLRANGE[0], cls.WLRANGE[1])
 
     @classmethod
@@ -18,7 +18,6 @@
 """
 
 from .material import Material
-from math import sqrt
 
 
 class Sellmeier(Material):
@@ -36,7 +35,8 @@ class Sellmeier(Material):
     @classmethod
     def _n(cls, wl, B, C):
         x2 = wl * wl * 1e12
-        return sqrt(abs(1 + x2 * sum(b / (x2 - c**2) for (b, c) in zip(B, C))))
+        n2 = 1 + x2 * sum(b / (x2 - c**2) for (b, c) in zip(B, C))
+        return abs(n2) ** 0.5  # also works on arrays
 
     @classmethod
     def n(cls, wl):
@@ -0,0 +1,362 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Array-backed caches of modal values.
+
+Values computed for each mode of a fiber (cutoffs, effective indexes)
+are kept in arrays of floats, with one row per wavelength and one column
+per mode. The column of a mode is given by the
+:py:class:`ModeRegistry` of the fiber, from the integer
+:py:attr:`~fibermodes.mode.Mode.id` of the mode. This takes about
+14 bytes per value (8 for the value, 1 for its flag, and the overhead
+of the rows), instead of about 70 bytes for a dict of dicts. Looking
+up a single value takes about the same time as with dicts, but
+:py:meth:`ModeCache.array` gives the values of a whole grid at once.
+
+The caches keep the interface of the dicts they replace
+(``fiber.ne_cache[wl][mode]``), through light views. Fibers use
+:py:meth:`ModeCache.lookup` and :py:meth:`ModeCache.store` directly,
+and simulators use :py:meth:`ModeCache.lookupRow` with the index of
+the wavelength in their grid.
+
+Caches of a fiber can be used by several threads (e.g. a simulator,
+and the cache manager evicting them), hence their rows are only
+changed under the lock of their registry.
+
+"""
+
+from array import array
+from collections.abc import MutableMapping
+import threading
+import numpy
+
+
+class ModeRegistry(object):
+
+    """Column index of each mode known by a fiber.
+
+    Columns are attributed in the order modes are registered. A
+    registry is shared by all the caches of a fiber, and so is its
+    :py:attr:`lock`.
+
+    """
+
+    def __init__(self):
+        self.modes = []
+        self._columns = {}
+        #: Lock taken by the caches to read or change their rows.
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.modes)
+
+    def column(self, mode):
+        """Column of mode, or None if mode is not registered."""
+        return self._columns.get(mode.id)
+
+    def register(self, mode):
+        """Column of mode, registering the mode if needed."""
+        try:
+            return self._columns[mode.id]
+        except KeyError:
+            j = self._columns[mode.id] = len(self.modes)
+            self.modes.append(mode)
+            return j
+
+
+class ModeCache(MutableMapping):
+
+    """Values by wavelength and by mode (``cache[wl][mode]``).
+
+    Rows are wavelengths, in the order they are first seen, unless a
+    grid of wavelengths is given to :py:meth:`setGrid`. Columns come
+    from the registry. Unknown values are flagged in a separate array
+    of bytes, since NaN is a valid value (e.g. mode not guided).
+
+    Iterating the cache gives the wavelengths having at least one known
+    value, and ``cache[wl]`` is a :py:class:`ModeValues` view.
+
+    Args:
+        registry(ModeRegistry): Columns of the cache. A new registry is
+            created if None.
+
+    """
+
+    #: Memory used by each value (in bytes): the value, and its flag.
+    ITEMSIZE = 9
+
+    def __init__(self, registry=None):
+        self.registry = ModeRegistry() if registry is None else registry
+        self._columns = self.registry._columns  # shortcut for lookup
+        self._lock = self.registry.lock
+        self._rows = {}
+        self._wavelengths = []
+        self._values = []  # array('d') for each row
+        self._known = []  # bytearray for each row
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = self.registry.lock
+
+    def _row(self, wl):
+        try:
+            return self._rows[wl]
+        except KeyError:
+            i = self._rows[wl] = len(self._wavelengths)
+            self._wavelengths.append(wl)
+            self._values.append(array('d'))
+            self._known.append(bytearray())
+            return i
+
+    def _mask(self, wl):
+        """Known flags of the row of wl, or None if there is no row."""
+        i = self._rows.get(wl)
+        return None if i is None else self._known[i]
+
+    def _forget(self, wl, mode=None):
+        """Mark values of wl (or of mode at wl) as unknown."""
+        with self._lock:
+            i = self._rows.get(wl)
+            if i is None:
+                return
+            if mode is None:
+                self._values[i] = array('d')
+                self._known[i] = bytearray()
+            else:
+                j = self.registry.column(mode)
+                if j is not None and j < len(self._known[i]):
+                    self._values[i][j] = float("nan")
+                    self._known[i][j] = 0
+
+    def lookup(self, wl, mode):
+        """Value for mode at wl (same as ``cache[wl][mode]``).
+
+        Raises:
+            KeyError: The value is not known.
+
+        """
+        with self._lock:
+            try:
+                i = self._rows[wl]
+                j = self._columns[mode.id]
+                value = self._values[i][j]
+            except (KeyError, IndexError):
+                raise KeyError((wl, mode)) from None
+            if value != value and not self._known[i][j]:  # NaN: unknown?
+                raise KeyError((wl, mode))
+            return value
+
+    def lookupRow(self, i, mode):
+        """Value for mode at the wavelength of row i.
+
+        When the grid of a simulation is set (see :py:meth:`setGrid`),
+        row *i* is wavelength index *i*: this avoids building and hashing
+        the wavelength.
+
+        Raises:
+            KeyError: The value is not known.
+
+        """
+        with self._lock:
+            try:
+                j = self._columns[mode.id]
+                value = self._values[i][j]
+            except (KeyError, IndexError):
+                raise KeyError((i, mode)) from None
+            if value != value and not self._known[i][j]:  # NaN: unknown?
+                raise KeyError((i, mode))
+            return value
+
+    def known(self, wl, mode):
+        """Tell whether the value for mode at wl is known."""
+        try:
+            self.lookup(wl, mode)
+        except KeyError:
+            return False
+        return True
+
+    def store(self, wl, mode, value):
+        """Set value for mode at wl (same as ``cache[wl][mode] = value``).
+
+        Returns:
+            int: Number of cells added to the cache (0 when the cell
+            of the value already exists). Each cell uses
+            :py:attr:`ITEMSIZE` bytes.
+
+        """
+        with self._lock:
+            i = self._row(wl)
+            j = self.registry.register(mode)
+            values = self._values[i]
+            n = 0
+            if j >= len(values):
+                # Make room for all registered modes at once
+                n = len(self.registry) - len(values)
+                values.extend(array('d', [float("nan")]) * n)
+                self._known[i].extend(bytes(n))
+            values[j] = value
+            self._known[i][j] = 1
+            return n
+
+    def setGrid(self, wavelengths):
+        """Put wavelengths in the first rows of the cache, in order.
+
+        When the grid of a simulation is set, row *i* holds the values
+        at wavelength index *i*, and :py:meth:`array` gives the values
+        of the whole grid. Known values are kept. Rows are only moved
+        when the grid changes.
+
+        Args:
+            wavelengths(list): Wavelengths of the grid.
+
+        """
+        wavelengths = list(wavelengths)
+        with self._lock:
+            if self._wavelengths[:len(wavelengths)] == wavelengths:
+                return
+            order = list(dict.fromkeys(self._row(wl) for wl in wavelengths))
+            if order == list(range(len(order))):
+                return
+            grid = set(order)
+            perm = order + [i for i in range(len(self._wavelengths))
+                            if i not in grid]
+            self._wavelengths = [self._wavelengths[i] for i in perm]
+            self._values = [self._values[i] for i in perm]
+            self._known = [self._known[i] for i in perm]
+            self._rows = {wl: i for i, wl in enumerate(self._wavelengths)}
+
+    def array(self, modes, n=None):
+        """Values of modes, for the first n rows (the grid).
+
+        Args:
+            modes(list): Modes (columns of the result).
+            n(int): Number of rows (default: all the rows).
+
+        Returns:
+            numpy.ndarray of shape (n, len(modes)), with NaN where
+            values are unknown.
+
+        """
+        if n is None:
+            n = len(self._wavelengths)
+        result = numpy.full((n, len(modes)), numpy.nan)
+        columns = [self.registry.column(mode) for mode in modes]
+        with self._lock:
+            for i, values in enumerate(self._values[:n]):
+                for k, j in enumerate(columns):
+                    if j is not None and j < len(values):
+                        result[i, k] = values[j]
+        return result
+
+    def __getitem__(self, wl):
+        if wl not in self:
+            raise KeyError(wl)
+        return ModeValues(self, wl)
+
+    def __setitem__(self, wl, values):
+        self._forget(wl)
+        for mode, value in values.items():
+            self.store(wl, mode, value)
+
+    def __delitem__(self, wl):
+        if wl not in self:
+            raise KeyError(wl)
+        self._forget(wl)
+
+    def __contains__(self, wl):
+        mask = self._mask(wl)
+        return mask is not None and 1 in mask
+
+    def __iter__(self):
+        return (wl for wl, mask in zip(self._wavelengths, self._known)
+                if 1 in mask)
+
+    def __len__(self):
+        return sum(1 for mask in self._known if 1 in mask)
+
+    def setdefault(self, wl, default=()):
+        """View on the values at wl, initialized from default if
+        there are none.
+
+        """
+        if wl not in self:
+            self[wl] = dict(default)
+        return ModeValues(self, wl)
+
+    def clear(self):
+        """Forget all the values (rows and columns are kept)."""
+        with self._lock:
+            for wl in self._wavelengths:
+                self._forget(wl)
+
+    def __repr__(self):
+        return "ModeCache({!r})".format({wl: dict(v)
+                                          for wl, v in self.items()})
+
+
+class ModeValues(MutableMapping):
+
+    """Values by mode, at a given wavelength of a
+    :py:class:`ModeCache` (``cache[wl]``).
+
+    This is a view: it does not hold values itself.
+
+    Args:
+        cache(ModeCache): Cache holding the values. A new cache is
+            created if None.
+        wl: Row of the cache (None for values that do not depend
+            on wavelength, like cutoffs).
+
+    """
+
+    def __init__(self, cache=None, wl=None):
+        self.cache = ModeCache() if cache is None else cache
+        self.wl = wl
+
+    def __getitem__(self, mode):
+        return self.cache.lookup(self.wl, mode)
+
+    def __setitem__(self, mode, value):
+        self.cache.store(self.wl, mode, value)
+
+    def __delitem__(self, mode):
+        self.cache.lookup(self.wl, mode)
+        self.cache._forget(self.wl, mode)
+
+    def __iter__(self):
+        mask = self.cache._mask(self.wl) or ()
+        modes = self.cache.registry.modes
+        return (modes[j] for j, k in enumerate(mask) if k)
+
+    def __len__(self):
+        mask = self.cache._mask(self.wl)
+        return 0 if mask is None else mask.count(1)
+
+    def __repr__(self):
+        return repr(dict(self))
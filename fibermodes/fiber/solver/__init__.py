@@ -2,11 +2,28 @@
 of a given :py:class:`~fibermodes.mode.Mode`
 in a given :py:class:`fibermodes.fiber.fiber.Fiber`.
 
+Solver modules are imported on first use, since they load scipy.
+
 """
 
-from . import ssif
-from . import tlsif
-from . import mlsif
+from importlib import import_module
+import sys
+
+
+__all__ = ['ssif', 'tlsif', 'mlsif', 'fdm']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return import_module('.' + name, __name__)
+    if name == 'FiberSolver':
+        return import_module('.solver', __name__).FiberSolver
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
 
 
-__all__ = ['ssif', 'tlsif', 'mlsif']
+if sys.version_info < (3, 7):
+    # Module __getattr__ (PEP 562) is not supported: import them now
+    for _name in __all__:
+        globals()[_name] = __getattr__(_name)
+    FiberSolver = __getattr__('FiberSolver')
@@ -0,0 +1,210 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Finite-difference solver for the scalar radial wave equation.
+
+The radial equation of LP modes,
+:math:`(r \\psi')' / r + (k_0^2 n^2 - \\nu^2 / r^2) \\psi
+= \\beta^2 \\psi`, is discretized on a nonuniform grid that has a node
+on each layer interface. This gives a symmetric tridiagonal eigenvalue
+problem, from which all the guided modes of a given :math:`\\nu`
+(and their radial fields) are obtained at once. This works for any
+index profile, including graded layers like
+:py:class:`~fibermodes.fiber.geometry.supergaussian.SuperGaussian`.
+
+When all layers are
+:py:class:`~fibermodes.fiber.geometry.stepindex.StepIndex`, the
+approximate effective indexes are used as brackets for the exact
+:py:mod:`~fibermodes.fiber.solver.mlsif` characteristic equation.
+Vector modes are delegated to :py:class:`mlsif.Neff`, seeded by the
+LP solutions.
+
+"""
+
+from . import mlsif
+from fibermodes.fiber.geometry import StepIndex
+from fibermodes import Wavelength, ModeFamily
+from math import isnan
+import numpy
+from scipy.linalg import eigh_tridiagonal
+
+
+class Neff(mlsif.Neff):
+
+    """Effective index of LP modes using finite differences.
+
+    Class attributes control the discretization: *NPOINTS* is the
+    number of grid points inside the core (the radius of the last
+    interface), *RMAX* is the radius of the computation domain
+    (relative to the last interface), and *REFINE* tells whether
+    the result is refined using the exact characteristic equation
+    when possible.
+
+    Since all LP modes are cheap to get, vector modes are searched
+    near their LP parent first (*LPSEED*).
+
+    """
+
+    NPOINTS = 400
+    RMAX = 4
+    REFINE = True
+    LPSEED = True
+
+    def __init__(self, fiber):
+        super().__init__(fiber)
+        self._modes = {}
+        self._grid = None
+
+    def __call__(self, wl, mode, delta, lowbound):
+        if mode.family is not ModeFamily.LP:
+            return super().__call__(wl, mode, delta, lowbound)
+
+        wl = Wavelength(wl)
+        neff, _ = self.solve(wl, mode.nu)
+        if mode.m > len(neff):
+            return float("nan")
+        if self.REFINE and self._stepIndex():
+            z = self._refine(wl, mode.nu, neff, mode.m - 1)
+            if not isnan(z):
+                return z
+        return neff[mode.m - 1]
+
+    def grid(self):
+        """Radial positions of the grid points (in meters).
+
+        The first point is on the fiber axis, and the boundary
+        condition :math:`\\psi = 0` is applied after the last point.
+
+        """
+        if self._grid is None:
+            rc = self.fiber.innerRadius(-1)
+            h = rc / self.NPOINTS
+            r = [0]
+            for i in range(len(self.fiber) - 1):
+                ro = self.fiber.outerRadius(i)
+                n = max(2, int(round((ro - r[-1]) / h)))
+                r.extend(numpy.linspace(r[-1], ro, n+1)[1:])
+
+            # Geometric progression in the cladding
+            n = self.NPOINTS // 2
+            q = numpy.log(self.RMAX) / n
+            r.extend(rc * numpy.exp(q * numpy.arange(1, n+1)))
+            self._grid = numpy.array(r)
+        return self._grid
+
+    def solve(self, wl, nu):
+        """Find all guided LP modes of given azimuthal order.
+
+        Args:
+            wl(Wavelength): Wavelength.
+            nu(int): Azimuthal order.
+
+        Returns:
+            (neff, psi) where *neff* is the array of effective indexes,
+            in decreasing order, and *psi* has the corresponding radial
+            fields as rows (evaluated on :py:meth:`grid`, with
+            :math:`\\int \\psi^2 r dr = 1`).
+
+        """
+        wl = Wavelength(wl)
+        try:
+            return self._modes[(wl, nu)]
+        except KeyError:
+            pass
+
+        # Normalized radius x = k0 r: eigenvalues are neff^2
+        r = self.grid()
+        x = wl.k0 * r
+        xe = numpy.append(x, x[-1] * x[-1] / x[-2])  # psi = 0 there
+        xm = (xe[1:] + xe[:-1]) / 2  # cell boundaries
+        xl = numpy.append(0, xm[:-1])
+        v = (xm * xm - xl * xl) / 2  # cell volumes (x dx)
+        g = xm / numpy.diff(xe)  # x / dx at cell boundaries
+
+        n2 = self._cellIndex(wl, xl, x, xm) ** 2
+        d = -g - numpy.append(0, g[:-1]) + v * n2
+        if nu:
+            # psi(0) = 0
+            d, g, v, n2 = d[1:], g[1:], v[1:], n2[1:]
+            d -= v * nu * nu / (x[1:] * x[1:])
+        s = numpy.sqrt(v)
+        e = g[:-1] / (s[:-1] * s[1:])
+        d /= v
+
+        ncl = self.fiber.minIndex(-1, wl)
+        nmax = max(layer.maxIndex(wl) for layer in self.fiber.layers)
+        if ncl < nmax:
+            w, psi = eigh_tridiagonal(d, e, select='v',
+                                      select_range=(ncl**2, nmax**2))
+            w, psi = w[::-1], psi[:, ::-1].T / s
+            if nu:
+                psi = numpy.insert(psi, 0, 0, axis=1)
+            psi *= wl.k0
+            psi *= numpy.sign(psi[:, 1:2] if nu else psi[:, :1])
+            neff = numpy.sqrt(w)
+        else:
+            neff, psi = numpy.empty(0), numpy.empty((0, r.size))
+
+        self._modes[(wl, nu)] = neff, psi
+        return neff, psi
+
+    def _cellIndex(self, wl, xl, x, xm):
+        """Index averaged (in n^2) on each cell, using one point
+        on each side of the node, so that interfaces are well resolved.
+
+        """
+        k0 = wl.k0
+        nl = numpy.fromiter((self.fiber.index(r, wl)
+                             for r in (xl + x) / (2 * k0)),
+                            dtype=float, count=x.size)
+        nr = numpy.fromiter((self.fiber.index(r, wl)
+                             for r in (x + xm) / (2 * k0)),
+                            dtype=float, count=x.size)
+        vl = x * x - xl * xl
+        vr = xm * xm - x * x
+        return numpy.sqrt((vl * nl * nl + vr * nr * nr) / (vl + vr))
+
+    def _stepIndex(self):
+        return all(isinstance(layer, StepIndex)
+                   for layer in self.fiber.layers)
+
+    def _refine(self, wl, nu, neff, i):
+        """Exact root of the LP characteristic equation, near the
+        finite-difference solution.
+
+        The search window is widened around the approximate solution,
+        up to the midpoints with the neighbouring solutions. Modes
+        close to cutoff can be missing from the finite-difference
+        solutions (the domain is truncated), hence the narrow
+        starting window.
+
+        """
+        ncl = self.fiber.minIndex(-1, wl)
+        nmax = max(layer.maxIndex(wl) for layer in self.fiber.layers)
+        hi = (neff[i] + neff[i-1]) / 2 if i else nmax - 1e-15
+        lo = (neff[i] + neff[i+1]) / 2 if i+1 < len(neff) else ncl + 1e-15
+
+        f = self._record(self._lpceq)
+        w = 1e-4 * (nmax - ncl)
+        while True:
+            a = max(neff[i] - w, lo)
+            b = min(neff[i] + w, hi)
+            fa = f(a, wl, nu)
+            fb = f(b, wl, nu)
+            if (fa > 0 and fb < 0) or (fa < 0 and fb > 0):
+                return self._findBetween(self._lpceq, a, b, args=(wl, nu))
+            if a == lo and b == hi:
+                return float("nan")
+            w *= 10
@@ -16,15 +16,276 @@
 from .solver import FiberSolver
 from fibermodes import Wavelength, Mode, ModeFamily
 from fibermodes import constants
-from math import isnan
+from fibermodes.functions import ivr, kvr
+from fibermodes.fiber.material.material import OutOfRangeWarning
+from fibermodes.fiber.geometry import StepIndex
+from math import isnan, isinf, sqrt
 import numpy
-from scipy.special import kn, kvp, k0, k1, jn, jvp, yn, yvp, iv, ivp
+from scipy.special import kn, kvp, k0e, k1e, jn, jvp, yn, yvp, iv, ivp
+import warnings
+
+
+def _chain(T):
+    """Product T[-1] ... T[1] T[0] of an array of square matrices.
+
+    Matrices are multiplied pairwise, which only requires log2(len(T))
+    vectorized products.
+
+    """
+    while len(T) > 1:
+        m = len(T) // 2 * 2
+        P = numpy.matmul(T[1:m:2], T[0:m:2])
+        T = numpy.concatenate((P, T[m:])) if m < len(T) else P
+    return T[0]
+
+
+class _MultiLayerSolver(FiberSolver):
+
+    """Common base of multilayer step-index solvers.
+
+    When the fiber has many layers (e.g. a tabulated index profile),
+    fields are propagated through the inner layers (all layers but the
+    center and the cladding) using the product of their transfer matrices,
+    computed for all layers at once, instead of looping over the layers.
+
+    """
+
+    #: Minimum number of inner layers for using transfer matrices.
+    TMATRIX_LAYERS = 8
+
+    def _transfer(self, neff, wl, nu, lp=False):
+        """Transfer matrix from the outer radius of the center layer to the
+        inner radius of the cladding, or None if inner layers are not
+        numerous enough, or not all step-index.
+
+        """
+        try:
+            layers, ri, ro, cwl, n = self._tmparams
+        except AttributeError:
+            layers = self.fiber.layers[1:-1]
+            if (len(layers) < self.TMATRIX_LAYERS or
+                    not all(isinstance(layer, StepIndex)
+                            for layer in layers)):
+                layers = None
+            ri = numpy.fromiter((layer.ri for layer in layers or ()), float)
+            ro = numpy.fromiter((layer.ro for layer in layers or ()), float)
+            cwl = n = None
+            self._tmparams = (layers, ri, ro, cwl, n)
+        if layers is None:
+            return None
+        if cwl != wl:
+            n = numpy.fromiter((layer.maxIndex(wl) for layer in layers),
+                               float)
+            self._tmparams = (layers, ri, ro, wl, n)  # atomic (threads)
+
+        if lp:
+            return _chain(StepIndex.lpTransferMatrix(ri, ro, n, neff, wl, nu))
+        return _chain(StepIndex.transferMatrix(ri, ro, n, neff, wl, nu))
+
+
+class Cutoff(_MultiLayerSolver):
+
+    """Cutoff for multilayer step-index fiber.
+
+    Cutoff is the limit of the characteristic equation of
+    :py:class:`Neff` when neff tends to the index of the cladding.
+    Fields in the inner layers are evaluated slightly below
+    the cladding index (relative difference :py:attr:`EPSILON`),
+    and the limit of the cladding fields is taken analytically.
+
+    """
+
+    #: Relative distance from cladding index where inner fields
+    #: are evaluated.
+    EPSILON = 1e-10
+
+    def __call__(self, mode):
+        fct = {ModeFamily.LP: self._lpcoeq,
+               ModeFamily.TE: self._tecoeq,
+               ModeFamily.TM: self._tmcoeq,
+               ModeFamily.HE: self._hecoeq,
+               ModeFamily.EH: self._hecoeq
+               }
+        # HE and EH modes are roots of the same function,
+        # hence the cutoff of EH(nu, m) is after HE(nu, m)
+        if mode.family is ModeFamily.EH:
+            pm = Mode(ModeFamily.HE, mode.nu, mode.m)
+            lowbound = self.fiber.cutoff(pm)
+            delta = 0.05 / lowbound if lowbound > 4 else self._MCD
+            lowbound += delta / 100
+        elif mode.m > 1:
+            if mode.family is ModeFamily.HE:
+                pm = Mode(ModeFamily.EH, mode.nu, mode.m - 1)
+            else:
+                pm = Mode(mode.family, mode.nu, mode.m - 1)
+            if pm == Mode(ModeFamily.LP, 0, 1):
+                pm = Mode(ModeFamily.LP, 1, 1)
+            lowbound = self.fiber.cutoff(pm)
+            delta = 0.05 / lowbound if lowbound > 4 else self._MCD
+            lowbound += delta / 100
+        elif mode.nu > 0 and mode.family is not ModeFamily.LP:
+            # TE(0,1) is single-mode condition
+            # Roots below TE(0,1) are false-positive
+            pm = Mode(ModeFamily.TE, 0, 1)
+            lowbound = self.fiber.cutoff(pm)
+            delta = 0.05 / lowbound
+            lowbound -= delta / 100
+        else:
+            lowbound = delta = self._MCD
+        return self._findFirstRoot(fct[mode.family],
+                                   args=(mode.nu,),
+                                   lowbound=lowbound,
+                                   delta=delta,
+                                   maxiter=int(250/delta))
+
+    def __params(self, v0):
+        wl = self.fiber.toWl(v0)
+        if isinf(wl):
+            wl = Wavelength(k0=1)  # because it causes troubles if 0
+        ncl = self.fiber.minIndex(-1, wl)
+        return wl, ncl, ncl * (1 - self.EPSILON)
+
+    def _matrix(self, layer, r, neff, wl, nu):
+        """Matrix giving fields (Ez, Hz, Ephi, Hphi) at radius r,
+        from coefficients of Bessel functions (A, B, A', B').
+
+        Bessel functions are not normalized, to avoid
+        poles at their roots.
+
+        """
+        n = layer.maxIndex(wl)
+        kappa = wl.k0 * sqrt(abs(n*n - neff*neff))
+        z = kappa * r
+        if neff < n:
+            Z1, Z2 = jn(nu, z), yn(nu, z)
+            D1, D2 = jvp(nu, z), yvp(nu, z)
+            c1 = wl.k0 / kappa
+        else:
+            Z1, Z2 = iv(nu, z), kn(nu, z)
+            D1, D2 = ivp(nu, z), kvp(nu, z)
+            c1 = -wl.k0 / kappa
+        c2 = neff * nu / z * c1
+        c3 = constants.eta0 * c1
+        c4 = constants.Y0 * n * n * c1
+
+        return numpy.array([[Z1, Z2, 0, 0],
+                            [0, 0, Z1, Z2],
+                            [c2 * Z1, c2 * Z2, -c3 * D1, -c3 * D2],
+                            [c4 * D1, c4 * D2, -c2 * Z1, -c2 * Z2]])
+
+    def _fields(self, v0, nu):
+        """Fields (Ez, Hz, Ephi, Hphi) at the inner radius of the cladding.
+
+        The two columns correspond to Ez = J(0) and Hz = J(0)
+        in the center layer.
+
+        """
+        with warnings.catch_warnings():
+            # ignore OutOfRangeWarning; it will occur elsewhere anyway
+            warnings.simplefilter("ignore", category=OutOfRangeWarning)
+            wl, ncl, neff = self.__params(v0)
+            N = len(self.fiber)
+            C = numpy.zeros((4, 2))
+            C[0, 0] = 1
+            C[2, 1] = 1
+
+            T = self._transfer(neff, wl, nu)
+            if T is not None:
+                r = self.fiber.innerRadius(1)
+                EH = T.dot(self._matrix(self.fiber.layers[0], r,
+                                        neff, wl, nu).dot(C))
+                r = self.fiber.innerRadius(-1)
+                return EH, wl.k0 * r, ncl
+
+            for i in range(1, N-1):
+                r = self.fiber.innerRadius(i)
+                EH = self._matrix(self.fiber.layers[i-1], r,
+                                  neff, wl, nu).dot(C)
+                C = numpy.linalg.solve(
+                    self._matrix(self.fiber.layers[i], r, neff, wl, nu), EH)
+
+            r = self.fiber.innerRadius(-1)
+            EH = self._matrix(self.fiber.layers[N-2], r, neff, wl, nu).dot(C)
+            return EH, wl.k0 * r, ncl
+
+    def _lpcoeq(self, v0, nu):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=OutOfRangeWarning)
+            wl, ncl, neff = self.__params(v0)
+            N = len(self.fiber)
+            C = numpy.array((1, 0))
+
+            T = self._transfer(neff, wl, nu, lp=True)
+            if T is not None:
+                r = self.fiber.innerRadius(1)
+                A = T.dot(self.fiber.layers[0].Psi(r, neff, wl, nu, C))
+            else:
+                for i in range(1, N-1):
+                    r = self.fiber.innerRadius(i)
+                    A = self.fiber.layers[i-1].Psi(r, neff, wl, nu, C)
+                    C = self.fiber.layers[i].lpConstants(r, neff, wl, nu, A)
+
+                r = self.fiber.innerRadius(-1)
+                A = self.fiber.layers[N-2].Psi(r, neff, wl, nu, C)
+
+        # u K'(u) / K(u) -> -nu when u -> 0 (or 0 if nu == 0)
+        return A[1] + nu * A[0]
+
+    def _tecoeq(self, v0, nu):
+        EH, _, _ = self._fields(v0, 0)
+        return EH[1, 1]  # Hz -> 0
+
+    def _tmcoeq(self, v0, nu):
+        EH, _, _ = self._fields(v0, 0)
+        return EH[0, 0]  # Ez -> 0
+
+    def _hecoeq(self, v0, nu):
+        (x, y, e, h), k, n = self._fields(v0, nu)
+
+        if nu == 1:
+            # Terms in log(u) dominate
+            return x[0] * y[1] - x[1] * y[0]
+
+        # First terms of the expansion of K'(u) / K(u) when u -> 0
+        s = k * k / (2 * (nu - 1))
+        a = n * x + constants.eta0 * y
+        P = k * e + constants.eta0 * s * y
+        Q = k * h + nu * constants.Y0 * x - constants.Y0 * n * n * s * x
+
+        return (a[0] * Q[1] - a[1] * Q[0] +
+                constants.Y0 * n * (P[1] * a[0] - P[0] * a[1]))
+
+    _ehcoeq = _hecoeq
 
 
-class Neff(FiberSolver):
+class Neff(_MultiLayerSolver):
+
+    """Effective index of modes of multilayer step-index fibers.
+
+    When *LPSEED* is True, vector modes are first searched near the
+    LP mode they are nearly degenerate with (see :py:meth:`_seeded`),
+    before scanning from the upper bound.
+
+    Characteristic equations accept arrays of neff
+    when all layers are step-index (see :py:meth:`evaluate`).
+
+    """
+
+    LPSEED = False
+    VECTORIZED = ('_lpceq', '_teceq', '_tmceq', '_heceq')
+
+    def __init__(self, fiber):
+        super().__init__(fiber)
+        if not all(isinstance(layer, StepIndex) for layer in fiber.layers):
+            self.VECTORIZED = ()
 
     def __call__(self, wl, mode, delta, lowbound):
         wl = Wavelength(wl)
+        if self.LPSEED and mode.family is not ModeFamily.LP:
+            neff = self._seeded(wl, mode, delta, lowbound)
+            if not isnan(neff):
+                return neff
+
         if lowbound is None or isnan(lowbound):
             pm = None
             if mode.family is ModeFamily.HE:
@@ -85,6 +346,71 @@ class Neff(FiberSolver):
                                    highbound=highbound+1e-15,
                                    delta=-delta)
 
+    def _seeded(self, wl, mode, delta, lowbound):
+        """Find vector mode near its parent LP mode.
+
+        HE(nu, m), EH(nu, m) and TE/TM(0, m) are nearly degenerate with
+        LP(nu-1, m), LP(nu+1, m) and LP(1, m). The characteristic
+        equation is evaluated on a window around the LP solution, which
+        is widened until it brackets a root. LP modes are cheap, and
+        they are solved only once per wavelength (they are cached by
+        the fiber).
+
+        HE and EH modes are roots of the same equation, labelled
+        alternately from the top. The seed is only used if the parent
+        LP modes are in the same order, and the window stays within
+        a quarter of the distance to the neighbouring roots.
+
+        Returns:
+            Effective index, or nan if the root was not found this way
+            (the mode is then found by scanning).
+
+        """
+        def lp(ell, m):
+            if ell < 0 or m < 1:
+                return float("inf")
+            n = self.fiber.neff(Mode(ModeFamily.LP, ell, m), wl, delta)
+            return float("-inf") if isnan(n) else n
+
+        nu, m = mode.nu, mode.m
+        if mode.family is ModeFamily.HE:
+            nlp = lp(nu - 1, m)
+            upper, lower = lp(nu + 1, m - 1), lp(nu + 1, m)
+            fct = self._heceq
+        elif mode.family is ModeFamily.EH:
+            nlp = lp(nu + 1, m)
+            upper, lower = lp(nu - 1, m), lp(nu - 1, m + 1)
+            fct = self._heceq
+        else:
+            nlp = lp(1, m)
+            upper, lower = lp(1, m - 1), lp(1, m + 1)
+            fct = self._teceq if mode.family is ModeFamily.TE else self._tmceq
+        if not upper > nlp > lower:
+            return float("nan")
+
+        nmax = max(layer.maxIndex(wl) for layer in self.fiber.layers)
+        if lowbound is not None and not isnan(lowbound):
+            nmax = min(nmax, lowbound)
+        ncl = self.fiber.minIndex(-1, wl)
+        hi = min(nmax - 1e-15, nlp + (upper - nlp) / 4)
+        lo = max(ncl + 1e-15, nlp - (nlp - lower) / 4)
+
+        f = self._record(fct)
+        w = 1e-4 * (nmax - ncl)
+        while True:
+            a = max(nlp - w, lo)
+            b = min(nlp + w, hi)
+            if b <= a:
+                break
+            fa = f(a, wl, nu)
+            fb = f(b, wl, nu)
+            if (fa > 0 and fb < 0) or (fa < 0 and fb > 0):
+                return self._findBetween(fct, a, b, args=(wl, nu))
+            if a == lo and b == hi:
+                break
+            w *= 4
+        return float("nan")
+
     def _lpfield(self, wl, nu, neff, r):
         N = len(self.fiber)
         C = numpy.array((1, 0))
@@ -134,8 +460,8 @@ class Neff(FiberSolver):
                 F4 = yvp(nu, u) / yn(nu, u)
             else:
                 c1 = -wl.k0 * ro / u
-                F3 = ivp(nu, u) / iv(nu, u)
-                F4 = kvp(nu, u) / kn(nu, u)
+                F3 = ivr(nu, u)
+                F4 = kvr(nu, u)
 
             c4 = constants.Y0 * n * n * c1
 
@@ -151,7 +477,9 @@ class Neff(FiberSolver):
         return numpy.array((0, ephi, 0)), numpy.array((hr, 0, hz))
 
     def _hefield(self, wl, nu, neff, r):
-        self._heceq(neff, wl, nu)
+        C = numpy.empty((len(self.fiber), 4, 2))
+        E, H = self._hesystem(neff, wl, nu, C)
+        alpha = -E[0] / E[1] if E[1] != 0 else -H[0] / H[1]
         for i, rho in enumerate(self.fiber._r):
             if r < rho:
                 break
@@ -163,27 +491,15 @@ class Neff(FiberSolver):
         urp = u * r / rho
 
         c1 = rho / u
-        c2 = wl.k0 * c1
         c3 = nu * c1 / r if r else 0  # To avoid div by 0
         c6 = constants.Y0 * n * n
 
-        if neff < n:
-            B1 = jn(nu, u)
-            B2 = yn(nu, u)
-            F1 = jn(nu, urp) / B1
-            F2 = yn(nu, urp) / B2 if i > 0 else 0
-            F3 = jvp(nu, urp) / B1
-            F4 = yvp(nu, urp) / B2 if i > 0 else 0
-        else:
-            c2 = -c2
-            B1 = iv(nu, u)
-            B2 = kn(nu, u)
-            F1 = iv(nu, urp) / B1
-            F2 = kn(nu, urp) / B2 if i > 0 else 0
-            F3 = ivp(nu, urp) / B1
-            F4 = kvp(nu, urp) / B2 if i > 0 else 0
+        F1, F2, F3, F4, s = layer._bessel(nu, u, urp, neff < n)
+        c2 = s * wl.k0 * c1
+        if i == 0:
+            F2 = F4 = 0
 
-        A, B, Ap, Bp = layer.C[:, 0] + layer.C[:, 1] * self.alpha
+        A, B, Ap, Bp = C[i, :, 0] + C[i, :, 1] * alpha
 
         Ez = A * F1 + B * F2
         Ezp = A * F3 + B * F4
@@ -215,77 +531,125 @@ class Neff(FiberSolver):
 
     def _lpceq(self, neff, wl, nu):
         N = len(self.fiber)
-        C = numpy.zeros((N-1, 2))
+        C = numpy.zeros((N-1, 2) + numpy.shape(neff))
         C[0, 0] = 1
 
-        for i in range(1, N-1):
-            r = self.fiber.innerRadius(i)
-            A = self.fiber.layers[i-1].Psi(r, neff, wl, nu, C[i-1, :])
-            C[i, :] = self.fiber.layers[i].lpConstants(r, neff, wl, nu, A)
-
-        r = self.fiber.innerRadius(-1)
-        A = self.fiber.layers[N-2].Psi(r, neff, wl, nu, C[-1, :])
+        if isinstance(neff, numpy.ndarray):
+            T = None
+        else:
+            T = self._transfer(neff, wl, nu, lp=True)
+        if T is not None:
+            r = self.fiber.innerRadius(1)
+            A = T.dot(self.fiber.layers[0].Psi(r, neff, wl, nu, C[0, :]))
+            r = self.fiber.innerRadius(-1)
+        else:
+            for i in range(1, N-1):
+                r = self.fiber.innerRadius(i)
+                A = self.fiber.layers[i-1].Psi(r, neff, wl, nu, C[i-1, :])
+                C[i, :] = self.fiber.layers[i].lpConstants(r, neff, wl, nu,
+                                                           A)
+
+            r = self.fiber.innerRadius(-1)
+            A = self.fiber.layers[N-2].Psi(r, neff, wl, nu, C[-1, :])
         u = self.fiber.layers[N-1].u(r, neff, wl)
-        return u * kvp(nu, u) * A[0] - kn(nu, u) * A[1]
+        # Divided by K_nu(u) > 0, to avoid underflow at large u
+        return u * kvr(nu, u) * A[0] - A[1]
 
-    def _teceq(self, neff, wl, nu):
-        N = len(self.fiber)
-        EH = numpy.empty(4)
-        ri = 0
+    def _vfields(self, neff, wl, nu, EH, tm=True, C=None):
+        """Compute fields EH at the inner radius of the cladding.
 
-        for i in range(N-1):
-            ro = self.fiber.outerRadius(i)
-            self.fiber.layers[i].EH_fields(ri, ro, nu, neff, wl, EH, False)
+        Args:
+            tm(bool): TM (True) or TE (False) mode, when nu == 0.
+            C(array): When given, constants of each layer (but the
+                cladding) are written in C[i] (for fields). Otherwise,
+                transfer matrices can be used.
+
+        Returns:
+            Inner radius of the cladding.
+
+        """
+        def fields(i, ri, ro):
+            if C is None:
+                layers[i].EH_fields(ri, ro, nu, neff, wl, EH, tm)
+            else:
+                layers[i].EH_fields(ri, ro, nu, neff, wl, EH, tm, C[i])
+
+        layers = self.fiber.layers
+        ro = self.fiber.outerRadius(0)
+        fields(0, 0, ro)
+
+        if C is None and not isinstance(neff, numpy.ndarray):
+            T = self._transfer(neff, wl, nu)
+        else:
+            T = None
+        if T is not None:
+            EH[:] = T.dot(EH)
+            return self.fiber.innerRadius(-1)
+
+        for i in range(1, len(layers)-1):
             ri = ro
+            ro = self.fiber.outerRadius(i)
+            fields(i, ri, ro)
+        return ro
+
+    def _teceq(self, neff, wl, nu):
+        EH = numpy.empty((4,) + numpy.shape(neff))
+        ri = self._vfields(neff, wl, nu, EH, False)
 
         # Last layer
         _, Hz, Ep, _ = EH
         u = self.fiber.layers[-1].u(ri, neff, wl)
 
-        F4 = k1(u) / k0(u)
+        F4 = k1e(u) / k0e(u)
         return Ep + wl.k0 * ri / u * constants.eta0 * Hz * F4
 
     def _tmceq(self, neff, wl, nu):
-        N = len(self.fiber)
-        EH = numpy.empty(4)
-        ri = 0
-
-        for i in range(N-1):
-            ro = self.fiber.outerRadius(i)
-            self.fiber.layers[i].EH_fields(ri, ro, nu, neff, wl, EH, True)
-            ri = ro
+        EH = numpy.empty((4,) + numpy.shape(neff))
+        ri = self._vfields(neff, wl, nu, EH, True)
 
         # Last layer
         Ez, _, _, Hp = EH
         u = self.fiber.layers[-1].u(ri, neff, wl)
         n = self.fiber.maxIndex(-1, wl)
 
-        F4 = k1(u) / k0(u)
+        F4 = k1e(u) / k0e(u)
         return Hp - wl.k0 * ri / u * constants.Y0 * n * n * Ez * F4
 
     def _heceq(self, neff, wl, nu):
-        N = len(self.fiber)
-        EH = numpy.empty((4, 2))
-        ri = 0
+        try:
+            E, H = self._hesystem(neff, wl, nu)
+        except ZeroDivisionError:
+            return float("inf")
+        return E[0]*H[1] - E[1]*H[0]
 
-        for i in range(N-1):
-            ro = self.fiber.outerRadius(i)
-            try:
-                self.fiber.layers[i].EH_fields(ri, ro, nu, neff, wl, EH)
-            except ZeroDivisionError:
-                return float("inf")
-            ri = ro
+    def _hesystem(self, neff, wl, nu, C=None):
+        """Continuity of Ephi and Hphi at the cladding interface.
+
+        The fields are the combination of two independent solutions
+        (Ez = 1 or Hz = 1 on the axis): the HE/EH characteristic
+        equation is the determinant of the returned system.
+
+        Args:
+            C(array): Constants of each layer, of shape (N, 4, 2),
+                computed when given (see :py:meth:`_vfields`).
+
+        Returns:
+            (E, H): Mismatch of Ephi and Hphi, for each solution.
+
+        """
+        EH = numpy.empty((4, 2) + numpy.shape(neff))
+        ri = self._vfields(neff, wl, nu, EH, C=C)
 
         # Last layer
-        C = numpy.zeros((4, 2))
-        C[1, :] = EH[0, :]
-        C[3, :] = EH[1, :]
-        self.fiber.layers[N-1].C = C
+        if C is not None:
+            C[-1] = 0
+            C[-1, 1, :] = EH[0, :]
+            C[-1, 3, :] = EH[1, :]
 
-        u = self.fiber.layers[N-1].u(ri, neff, wl)
+        u = self.fiber.layers[-1].u(ri, neff, wl)
         n = self.fiber.maxIndex(-1, wl)
 
-        F4 = kvp(nu, u) / kn(nu, u)
+        F4 = kvr(nu, u)
         c1 = -wl.k0 * ri / u
         c2 = neff * nu / u * c1
         c3 = constants.eta0 * c1
@@ -293,12 +657,6 @@ class Neff(FiberSolver):
 
         E = EH[2, :] - (c2 * EH[0, :] - c3 * F4 * EH[1, :])
         H = EH[3, :] - (c4 * F4 * EH[0, :] - c2 * EH[1, :])
-
-        if E[1] != 0:
-            self.alpha = -E[0] / E[1]
-        else:
-            self.alpha = -H[0] / H[1]
-
-        return E[0]*H[1] - E[1]*H[0]
+        return E, H
 
     _ehceq = _heceq
@@ -16,6 +16,7 @@
 from itertools import count
 from scipy.optimize import brentq
 import logging
+import numpy
 
 
 class FiberSolver(object):
@@ -25,6 +26,9 @@ class FiberSolver(object):
     logger = logging.getLogger(__name__)
     _MCD = 0.1
 
+    #: Names of the methods that accept an array as first argument.
+    VECTORIZED = ()
+
     def __init__(self, fiber):
         self.fiber = fiber
         self.log = []
@@ -40,17 +44,70 @@ class FiberSolver(object):
     def stop_log(self):
         self._logging = False
 
-    def __record(self, fct):
+    def evaluate(self, fct, x, *args):
+        """Evaluate a function of this solver (e.g. a characteristic
+        equation) at each value of x.
+
+        Functions listed in *VECTORIZED* are called once with the whole
+        array. Others are called for each value.
+
+        Args:
+            fct(method): Function of this solver.
+            x(array): Values of the first argument of fct.
+            args: Other arguments of fct.
+
+        Returns:
+            array: Values of fct (nan where it is undefined).
+
+        """
+        x = numpy.asarray(x, dtype=float)
+        if fct.__name__ in self.VECTORIZED:
+            with numpy.errstate(all='ignore'):
+                return numpy.broadcast_to(fct(x, *args), x.shape).copy()
+
+        y = numpy.empty(x.shape)
+        for i, v in enumerate(x.flat):
+            try:
+                y.flat[i] = fct(v, *args)
+            except ZeroDivisionError:
+                y.flat[i] = float("nan")
+        return y
+
+    def _record(self, fct):
+        """Wrap fct to append its evaluations to the log, when logging,
+        and to count them, when the fiber has stats.
+
+        Solvers hold no other state between evaluations, hence they
+        can be used from many threads at once (the log then contains
+        the evaluations of all threads).
+
+        """
+        stats = self.fiber.stats
+        if stats is None and not self._logging:
+            return fct
+
+        log = self.log if self._logging else None
+
         def wrapper(z, *args):
             r = fct(z, *args)
-            if self._logging:
-                self.log.append((z, r))
+            if stats is not None:
+                stats.count('evaluations')
+            if log is not None:
+                log.append((z, r))
             return r
         return wrapper
 
+    def _brentq(self, fct, a, b, args=(), **kwargs):
+        """scipy.optimize.brentq, counting its iterations in stats."""
+        z, r = brentq(fct, a, b, args=args, full_output=True, **kwargs)
+        if self.fiber.stats is not None:
+            self.fiber.stats.count('brentq', r.iterations)
+        return z
+
     def _findFirstRoot(self, fct, args=(), lowbound=0, highbound=None,
                        ipoints=[], delta=0.25, maxiter=None):
-        fct = self.__record(fct)  # For debug purpose.
+        fct = self._record(fct)
+        stats = self.fiber.stats
         while True:
             if ipoints:
                 maxiter = len(ipoints)
@@ -64,6 +121,8 @@ class FiberSolver(object):
                 return a
 
             for i in range(1, maxiter+1):
+                if stats is not None:
+                    stats.count('steps')
                 b = ipoints.pop(0) if ipoints else a + delta
                 if highbound:
                     if ((b > highbound > lowbound) or
@@ -76,7 +135,7 @@ class FiberSolver(object):
                     return b
 
                 if (fa > 0 and fb < 0) or (fa < 0 and fb > 0):
-                    z = brentq(fct, a, b, args=args, xtol=1e-20)
+                    z = self._brentq(fct, a, b, args=args, xtol=1e-20)
                     fz = fct(z, *args)
                     if abs(fa) > abs(fz) < abs(fb):  # Skip discontinuities
                         self.logger.debug("skipped ({}, {}, {})".format(
@@ -93,7 +152,7 @@ class FiberSolver(object):
         return float("nan")
 
     def _findBetween(self, fct, lowbound, highbound, args=(), maxj=15):
-        fct = self.__record(fct)  # For debug purpose.
+        fct = self._record(fct)
         v = [lowbound, highbound]
         s = [fct(lowbound, *args), fct(highbound, *args)]
 
@@ -106,12 +165,14 @@ class FiberSolver(object):
                 fa, fb = s[i], s[i+1]
 
                 if (fa > 0 and fb < 0) or (fa < 0 and fb > 0):
-                    z = brentq(fct, a, b, args=args)
+                    z = self._brentq(fct, a, b, args=args)
                     fz = fct(z, *args)
                     if abs(fa) > abs(fz) < abs(fb):  # Skip discontinuities
                         return z
 
             ls = len(s)
+            if self.fiber.stats is not None:
+                self.fiber.stats.count('steps', ls - 1)
             for i in range(ls-1):
                 a, b = v[2*i], v[2*i+1]
                 c = (a + b) / 2
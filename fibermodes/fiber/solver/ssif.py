@@ -17,17 +17,25 @@ from .solver import FiberSolver
 from fibermodes import Mode, ModeFamily
 from math import sqrt, isnan, isinf
 import numpy
-from scipy.special import jn, jn_zeros, kn, j0, j1, k0, k1, jvp, kvp
+from scipy.special import jn, jn_zeros, kve, j0, j1, k0, k1, k0e, k1e, jvp
 from fibermodes.constants import Y0
+from fibermodes.functions import kvr
 import logging
 
 
+def _sqrt(x):
+    """math.sqrt for scalars (faster), numpy.sqrt for arrays."""
+    return numpy.sqrt(x) if isinstance(x, numpy.ndarray) else sqrt(x)
+
+
 class Cutoff(FiberSolver):
 
     """Cutoff for standard step-index fiber."""
 
     logger = logging.getLogger(__name__)
 
+    VECTORIZED = ('_cutoffHE',)
+
     def __call__(self, mode):
         nu = mode.nu
         m = mode.m
@@ -47,10 +55,16 @@ class Cutoff(FiberSolver):
         return jn_zeros(nu, m)[m-1]
 
     def _cutoffHE(self, V0, nu):
-        wl = self.fiber.toWl(V0)
-        n02 = self.fiber.maxIndex(0, wl)**2 / self.fiber.minIndex(1, wl)**2
+        if isinstance(V0, numpy.ndarray):
+            n02 = numpy.reshape([self._n02(self.fiber.toWl(v))
+                                 for v in V0.flat], V0.shape)
+        else:
+            n02 = self._n02(self.fiber.toWl(V0))
         return (1+n02) * jn(nu-2, V0) - (1-n02) * jn(nu, V0)
 
+    def _n02(self, wl):
+        return self.fiber.maxIndex(0, wl)**2 / self.fiber.minIndex(1, wl)**2
+
     def _findHEcutoff(self, mode):
         if mode.m > 1:
             pm = Mode(mode.family, mode.nu, mode.m - 1)
@@ -82,6 +96,8 @@ class Neff(FiberSolver):
 
     """neff for standard step-index fiber"""
 
+    VECTORIZED = ('_lpceq', '_teceq', '_tmceq', '_heceq', '_ehceq')
+
     def __call__(self, wl, mode, delta, lowbound):
         epsilon = 1e-12
 
@@ -181,11 +197,11 @@ class Neff(FiberSolver):
         v = rho * k * sqrt(nco2 - ncl2)
 
         jnu = jn(nu, u)
-        knw = kn(nu, w)
+        knw = kve(nu, w)
 
         Delta = (1 - ncl2/nco2)/2
         b1 = jvp(nu, u) / (u * jnu)
-        b2 = kvp(nu, w) / (w * knw)
+        b2 = kvr(nu, w) / w
         F1 = (u * w / v)**2 * (b1 + (1 - 2 * Delta)*b2) / nu
         F2 = (v / (u * w))**2 * nu / (b1 + b2)
         a1 = (F2 - 1) / 2
@@ -206,9 +222,11 @@ class Neff(FiberSolver):
             hphi = -Y0 * nco2 / neff * (a3 * jmur + a4 * jpur) / jnu
             hz = Y0 * u * F2 / (k * rho) * jnur / jnu
         else:
-            kmur = kn(nu-1, w * r / rho)
-            kpur = kn(nu+1, w * r / rho)
-            knur = kn(nu, w * r / rho)
+            # Scaled by exp(w), as knw
+            e = numpy.exp(w - w * r / rho)
+            kmur = kve(nu-1, w * r / rho) * e
+            kpur = kve(nu+1, w * r / rho) * e
+            knur = kve(nu, w * r / rho) * e
             er = -u / w * (a1 * kmur - a2 * kpur) / knw
             ephi = -u / w * (a1 * kmur + a2 * kpur) / knw
             ez = u / (k * neff * rho) * knur / knw
@@ -223,24 +241,28 @@ class Neff(FiberSolver):
     def _uw(self, wl, neff):
         r = self.fiber.outerRadius(0)
         rk0 = r * wl.k0
-        return (rk0 * sqrt(self.fiber.maxIndex(0, wl)**2 - neff**2),
-                rk0 * sqrt(neff**2 - self.fiber.minIndex(1, wl)**2))
+        return (rk0 * _sqrt(self.fiber.maxIndex(0, wl)**2 - neff**2),
+                rk0 * _sqrt(neff**2 - self.fiber.minIndex(1, wl)**2))
+
+    # Characteristic equations are divided by K_nu(w) > 0, and
+    # use exponentially scaled functions, to avoid underflow at large w
+    # and overflow at large nu.
 
     def _lpceq(self, neff, wl, nu):
         u, w = self._uw(wl, neff)
-        return (u * jn(nu - 1, u) * kn(nu, w) +
-                w * jn(nu, u) * kn(nu - 1, w))
+        # w K_nu-1(w) / K_nu(w) = -(nu + w K'_nu(w) / K_nu(w))
+        return u * jn(nu - 1, u) - jn(nu, u) * (nu + w * kvr(nu, w))
 
     def _teceq(self, neff, wl, nu):
         u, w = self._uw(wl, neff)
-        return u * j0(u) * k1(w) + w * j1(u) * k0(w)
+        return u * j0(u) * k1e(w) / k0e(w) + w * j1(u)
 
     def _tmceq(self, neff, wl, nu):
         u, w = self._uw(wl, neff)
         nco = self.fiber.maxIndex(0, wl)
         ncl = self.fiber.minIndex(1, wl)
-        return (u * j0(u) * k1(w) * ncl**2 +
-                w * j1(u) * k0(w) * nco**2)
+        return (u * j0(u) * k1e(w) / k0e(w) * ncl**2 +
+                w * j1(u) * nco**2)
 
     def _heceq(self, neff, wl, nu):
         u, w = self._uw(wl, neff)
@@ -249,14 +271,13 @@ class Neff(FiberSolver):
         ncl = self.fiber.minIndex(1, wl)
         delta = (1 - ncl**2 / nco**2) / 2
         jnu = jn(nu, u)
-        knu = kn(nu, w)
-        kp = kvp(nu, w)
+        kp = kvr(nu, w)
 
-        return (jvp(nu, u) * w * knu +
+        return (jvp(nu, u) * w +
                 kp * u * jnu * (1 - delta) +
-                jnu * sqrt((u * kp * delta)**2 +
-                           ((nu * neff * v2 * knu) /
-                            (nco * u * w))**2))
+                jnu * _sqrt((u * kp * delta)**2 +
+                            ((nu * neff * v2) /
+                             (nco * u * w))**2))
 
     def _ehceq(self, neff, wl, nu):
         u, w = self._uw(wl, neff)
@@ -265,11 +286,10 @@ class Neff(FiberSolver):
         ncl = self.fiber.minIndex(1, wl)
         delta = (1 - ncl**2 / nco**2) / 2
         jnu = jn(nu, u)
-        knu = kn(nu, w)
-        kp = kvp(nu, w)
+        kp = kvr(nu, w)
 
-        return (jvp(nu, u) * w * knu +
+        return (jvp(nu, u) * w +
                 kp * u * jnu * (1 - delta) -
-                jnu * sqrt((u * kp * delta)**2 +
-                           ((nu * neff * v2 * knu) /
-                            (nco * u * w))**2))
+                jnu * _sqrt((u * kp * delta)**2 +
+                            ((nu * neff * v2) /
+                             (nco * u * w))**2))
@@ -0,0 +1,160 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Counters and timings of solver calls.
+
+Instrumentation is disabled by default (the *stats* attribute of a
+:py:class:`~fibermodes.fiber.fiber.Fiber` is None), and then it costs
+a single attribute test per call. To enable it, assign a
+:py:class:`SolverStats` object to the fiber, or use the *stats*
+parameter of :py:class:`~fibermodes.simulator.simulator.Simulator`.
+
+"""
+
+from contextlib import contextmanager
+from time import perf_counter
+import threading
+import copy
+import json
+
+
+class SolverStats(object):
+
+    """Statistics of solver calls, for one or many fibers.
+
+    For each (fiber, solver, mode, wavelength), *records* holds the
+    number of solver calls, of characteristic equation evaluations,
+    of brentq iterations, of scan steps, and the wall time (in seconds).
+    Time of nested calls (e.g. LP modes solved to seed a vector mode)
+    is included in the time of the outer call, but their counters are
+    not. Cutoff records have None as wavelength.
+
+    *caches* holds the number of hits and misses of the co_cache,
+    ne_cache and fi_cache of fibers.
+
+    Objects can be shared by many threads. When pickled (e.g. for
+    a process pool), counters updated by the other processes are lost.
+
+    Args:
+        label: Label of the fiber, used in records keys (see
+            :py:meth:`bind`).
+
+    """
+
+    COUNTERS = ('calls', 'evaluations', 'brentq', 'steps', 'time')
+    CACHES = ('co_cache', 'ne_cache', 'fi_cache')
+
+    def __init__(self, label=None):
+        self.label = label
+        self.records = {}
+        self.caches = {name: [0, 0] for name in self.CACHES}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def bind(self, label):
+        """Return a view of this object, with given fiber label.
+
+        Records and counters are shared with this object.
+
+        """
+        stats = copy.copy(self)
+        stats.label = label
+        return stats
+
+    def reset(self):
+        """Clear all records and counters."""
+        with self._lock:
+            self.records.clear()
+            for c in self.caches.values():
+                c[:] = [0, 0]
+
+    @contextmanager
+    def measure(self, solver, mode, wl=None):
+        """Context where solver calls are counted and timed.
+
+        Args:
+            solver(FiberSolver): The solver.
+            mode(Mode): The mode.
+            wl(Wavelength): The wavelength (None for cutoff).
+
+        """
+        record = dict.fromkeys(self.COUNTERS, 0)
+        record['calls'] = 1
+        outer = getattr(self._local, 'record', None)
+        self._local.record = record
+        t = perf_counter()
+        try:
+            yield record
+        finally:
+            record['time'] = perf_counter() - t
+            self._local.record = outer
+            cls = type(solver)
+            key = (self.label,
+                   cls.__module__.rsplit('.', 1)[-1] + '.' + cls.__name__,
+                   mode, wl)
+            with self._lock:
+                r = self.records.setdefault(
+                    key, dict.fromkeys(self.COUNTERS, 0))
+                for name, value in record.items():
+                    r[name] += value
+
+    def count(self, name, n=1):
+        """Add n to counter name of the current solver call, if any."""
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record[name] += n
+
+    def cache(self, name, hit):
+        """Count a hit (or a miss) of cache name."""
+        with self._lock:
+            self.caches[name][0 if hit else 1] += 1
+
+    def rows(self):
+        """Records as a list of dicts, sorted by decreasing time."""
+        rows = [dict(zip(('fiber', 'solver', 'mode', 'wl'), key), **r)
+                for key, r in self.records.items()]
+        rows.sort(key=lambda row: row['time'], reverse=True)
+        return rows
+
+    def totals(self, by='solver'):
+        """Sum of records, grouped by 'fiber', 'solver', 'mode' or 'wl'."""
+        totals = {}
+        for row in self.rows():
+            t = totals.setdefault(row[by], dict.fromkeys(self.COUNTERS, 0))
+            for name in self.COUNTERS:
+                t[name] += row[name]
+        return totals
+
+    def save(self, filename):
+        """Save records and cache counters as a JSON file."""
+        rows = self.rows()
+        for row in rows:
+            row['mode'] = str(row['mode'])
+        with open(filename, 'w') as f:
+            json.dump({'records': rows,
+                       'caches': {name: {'hits': h, 'misses': m}
+                                  for name, (h, m) in self.caches.items()}},
+                      f, indent=1)
@@ -29,6 +29,8 @@ import warnings
 
 class Cutoff(FiberSolver):
 
+    VECTORIZED = ('_lpcoeq', '_tecoeq', '_tmcoeq', '_ehcoeq', '_hecoeq')
+
     def __call__(self, mode):
         fct = {ModeFamily.LP: self._lpcoeq,
                ModeFamily.TE: self._tecoeq,
@@ -92,13 +94,35 @@ class Cutoff(FiberSolver):
             u1, u2, u3 = numpy.sqrt(numpy.abs(Usq))
             return u1*r1, u2*r1, u2*r2, s1, s2, n1sq, n2sq, n3sq
 
+    def __evaluate(self, fct, v0, nu):
+        """Evaluate cutoff equation fct at v0 (float or array).
+
+        Parameters are computed for each value of v0, then the equation
+        is evaluated at once for the values sharing the same signs
+        (that select the form of the equation).
+
+        """
+        if not isinstance(v0, numpy.ndarray):
+            return fct(self.__params(v0), nu)
+
+        P = numpy.array([self.__params(v) for v in v0.flat]).T
+        ordered = (P[5] > P[6]) & (P[6] > P[7])
+        y = numpy.empty(v0.size)
+        for s1, s2, o in set(zip(P[3], P[4], ordered)):
+            mask = (P[3] == s1) & (P[4] == s2) & (ordered == o)
+            p = P[:, mask]
+            y[mask] = fct((p[0], p[1], p[2], s1, s2, p[5], p[6], p[7]), nu)
+        return y.reshape(v0.shape)
+
     def __delta(self, nu, u1r1, u2r1, s1, s2, s3, n1sq, n2sq, n3sq):
         """s3 is sign of Delta"""
         if s1 < 0:
             f = ivp(nu, u1r1) / (iv(nu, u1r1) * u1r1)  # c
         else:
             jnnuu1r1 = jn(nu, u1r1)
-            if jnnuu1r1 == 0:  # Avoid zero division error
+            if isinstance(jnnuu1r1, numpy.ndarray):
+                pole = jnnuu1r1 == 0
+            elif jnnuu1r1 == 0:  # Avoid zero division error
                 return float("inf")
             f = jvp(nu, u1r1) / (jnnuu1r1 * u1r1)  # a b d
 
@@ -114,12 +138,22 @@ class Cutoff(FiberSolver):
                       nu**2 * n3sq / n2sq * (1 / u1r1**2 + 1 / u2r1**2)**2)
 
         d = kappa1**2 - 4 * kappa2
+        if isinstance(d, numpy.ndarray):
+            # nan where d < 0
+            delta = u2r1 * (nu / u2r1**2 +
+                            (kappa1 + s3 * numpy.sqrt(d)) * 0.5)
+            if s1 >= 0:
+                delta[pole] = float("inf")
+            return delta
         if d < 0:
             return numpy.nan
         return u2r1 * (nu / u2r1**2 + (kappa1 + s3 * sqrt(d)) * 0.5)
 
     def _lpcoeq(self, v0, nu):
-        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = self.__params(v0)
+        return self.__evaluate(self.__lpcoeq, v0, nu)
+
+    def __lpcoeq(self, params, nu):
+        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = params
 
         if s1 == 0:  # e
             return (jn(nu+1, u2r1) * yn(nu-1, u2r2) -
@@ -138,7 +172,10 @@ class Cutoff(FiberSolver):
         return f11a * f2a * u1r1 - f11b * f2b * u2r1
 
     def _tecoeq(self, v0, nu):
-        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = self.__params(v0)
+        return self.__evaluate(self.__tecoeq, v0, nu)
+
+    def __tecoeq(self, params, nu):
+        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = params
         (f11a, f11b) = ((j0(u1r1), jn(2, u1r1)) if s1 > 0 else
                         (i0(u1r1), -iv(2, u1r1)))
         if s2 > 0:
@@ -152,7 +189,10 @@ class Cutoff(FiberSolver):
         return f11a * f2a - f11b * f2b
 
     def _tmcoeq(self, v0, nu):
-        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = self.__params(v0)
+        return self.__evaluate(self.__tmcoeq, v0, nu)
+
+    def __tmcoeq(self, params, nu):
+        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = params
         if s1 == 0:  # e
             f11a, f11b = 2, 1
         elif s1 > 0:  # a, b, d
@@ -170,7 +210,10 @@ class Cutoff(FiberSolver):
         return f11a * n2sq * f2a - f11b * n1sq * f2b * u2r1
 
     def _ehcoeq(self, v0, nu):
-        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = self.__params(v0)
+        return self.__evaluate(self.__ehcoeq, v0, nu)
+
+    def __ehcoeq(self, params, nu):
+        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = params
         if s1 == 0:
             return self.__fct3(nu, u2r1, u2r2, 2, n2sq, n3sq)
         else:
@@ -187,12 +230,15 @@ class Cutoff(FiberSolver):
                                n1sq, n2sq, n3sq)
 
     def _hecoeq(self, v0, nu):
-        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = self.__params(v0)
+        return self.__evaluate(self.__hecoeq, v0, nu)
+
+    def __hecoeq(self, params, nu):
+        u1r1, u2r1, u2r2, s1, s2, n1sq, n2sq, n3sq = params
         if s1 == 0:
             return self.__fct3(nu, u2r1, u2r2, -2, n2sq, n3sq)
         else:
             s3 = -1 if s1 == s2 else 1
-            if n1sq > n2sq > n3sq:
+            if numpy.all(n1sq > n2sq) and numpy.all(n2sq > n3sq):
                 s3 = -1 if nu == 1 else 1
             #     return self.__fct1(nu, u1r1, u2r1, u2r2,
             #                        s1, s2, s3,
@@ -17,7 +17,6 @@
 """Electromagnetic fields computation."""
 
 import numpy
-from itertools import product
 from fibermodes import Wavelength, ModeFamily, HE11
 from fibermodes import constants
 
@@ -49,6 +48,29 @@ class Field(object):
         self.X, self.Y = numpy.meshgrid(p, p)
         self.R = numpy.sqrt(numpy.square(self.X) + numpy.square(self.Y))
         self.Phi = numpy.arctan2(self.Y, self.X)
+        self._rfields = None
+
+    def _radial(self):
+        """Radial dependency of the E and H fields on the grid.
+
+        The fields are computed once, for each distinct radius, and kept
+        for the other components and phases.
+
+        Returns:
+            (er, hr): two (3 x np x np) arrays, with r, phi and z
+            components (x, y and z for LP modes).
+
+        """
+        if self._rfields is None:
+            r, inv = numpy.unique(self.R.ravel(), return_inverse=True)
+            er = numpy.empty((3, r.size))
+            hr = numpy.empty((3, r.size))
+            for k, rk in enumerate(r):
+                er[:, k], hr[:, k] = self.fiber._rfield(self.mode, self.wl, rk)
+            shape = (3,) + self.R.shape
+            self._rfields = (er[:, inv].reshape(shape),
+                             hr[:, inv].reshape(shape))
+        return self._rfields
 
     def f(self, phi0):
         """Azimuthal dependency function.
@@ -86,11 +108,7 @@ class Field(object):
 
         """
         if self.mode.family is ModeFamily.LP:
-            self._Ex = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Ex[j, i] = er[0] * f[j, i]
+            self._Ex = self._radial()[0][0] * self.f(phi)
             return self._Ex
         else:
             return self.Et(phi, theta) * numpy.cos(self.Epol(phi, theta))
@@ -107,11 +125,7 @@ class Field(object):
 
         """
         if self.mode.family is ModeFamily.LP:
-            self._Ey = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Ey[j, i] = er[1] * f[j, i]
+            self._Ey = self._radial()[0][1] * self.f(phi)
             return self._Ey
         else:
             return self.Et(phi, theta) * numpy.sin(self.Epol(phi, theta))
@@ -127,11 +141,7 @@ class Field(object):
             (np x np) numpy array
 
         """
-        self._Ez = numpy.zeros(self.X.shape)
-        f = self.f(phi)
-        for i, j in product(range(self.np), repeat=2):
-            er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-            self._Ez[j, i] = er[2] * f[j, i]
+        self._Ez = self._radial()[0][2] * self.f(phi)
         return self._Ez
 
     def Er(self, phi=0, theta=0):
@@ -149,11 +159,7 @@ class Field(object):
             return (self.Et(phi, theta) *
                     numpy.cos(self.Epol(phi, theta) - self.Phi))
         else:
-            self._Er = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Er[j, i] = er[0] * f[j, i]
+            self._Er = self._radial()[0][0] * self.f(phi)
             return self._Er
 
     def Ephi(self, phi=0, theta=0):
@@ -171,11 +177,7 @@ class Field(object):
             return (self.Et(phi, theta) *
                     numpy.sin(self.Epol(phi, theta) - self.Phi))
         else:
-            self._Ephi = numpy.zeros(self.X.shape)
-            g = self.g(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Ephi[j, i] = er[1] * g[j, i]
+            self._Ephi = self._radial()[0][1] * self.g(phi)
             return self._Ephi
 
     def Et(self, phi=0, theta=0):
@@ -246,11 +248,7 @@ class Field(object):
 
         """
         if self.mode.family is ModeFamily.LP:
-            self._Hx = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Hx[j, i] = hr[0] * f[j, i]
+            self._Hx = self._radial()[1][0] * self.f(phi)
             return self._Hx
         else:
             return self.Ht(phi, theta) * numpy.cos(self.Hpol(phi, theta))
@@ -267,11 +265,7 @@ class Field(object):
 
         """
         if self.mode.family is ModeFamily.LP:
-            self._Hy = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Hy[j, i] = hr[1] * f[j, i]
+            self._Hy = self._radial()[1][1] * self.f(phi)
             return self._Hy
         else:
             return self.Ht(phi, theta) * numpy.sin(self.Hpol(phi, theta))
@@ -287,11 +281,7 @@ class Field(object):
             (np x np) numpy array
 
         """
-        self._Hz = numpy.zeros(self.X.shape)
-        f = self.f(phi)
-        for i, j in product(range(self.np), repeat=2):
-            er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-            self._Hz[j, i] = hr[2] * f[j, i]
+        self._Hz = self._radial()[1][2] * self.f(phi)
         return self._Hz
 
     def Hr(self, phi=0, theta=0):
@@ -309,11 +299,7 @@ class Field(object):
             return (self.Ht(phi, theta) *
                     numpy.cos(self.Hpol(phi, theta) - self.Phi))
         else:
-            self._Hr = numpy.zeros(self.X.shape)
-            f = self.f(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Hr[j, i] = hr[0] * f[j, i]
+            self._Hr = self._radial()[1][0] * self.f(phi)
             return self._Hr
 
     def Hphi(self, phi=0, theta=0):
@@ -331,11 +317,7 @@ class Field(object):
             return (self.Ht(phi, theta) *
                     numpy.sin(self.Hpol(phi, theta) - self.Phi))
         else:
-            self._Hphi = numpy.zeros(self.X.shape)
-            g = self.g(phi)
-            for i, j in product(range(self.np), repeat=2):
-                er, hr = self.fiber._rfield(self.mode, self.wl, self.R[j, i])
-                self._Hphi[j, i] = hr[1] * g[j, i]
+            self._Hphi = self._radial()[1][1] * self.g(phi)
             return self._Hphi
 
     def Ht(self, phi=0, theta=0):
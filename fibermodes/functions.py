@@ -16,7 +16,9 @@
 
 """Miscellaneous mathematical functions."""
 
-from math import factorial
+from math import factorial, isfinite
+import numpy
+from scipy.special import ive, kve
 
 # A[(k, m, i)]
 A = {
@@ -135,3 +137,117 @@ def derivative(f, x, k, m, j, h, *args):
     """
     C = factorial(k) / (factorial(m-1) * h**k)
     return C * sum(A[(k, m, j)][i] * f(x + (i-j) * h, *args) for i in range(m))
+
+
+def ivr(nu, x):
+    """Logarithmic derivative of the modified Bessel function of
+    the first kind, I'_nu(x) / I_nu(x).
+
+    It is computed from exponentially scaled Bessel functions, and it
+    remains finite where iv overflows (large x). When I_nu(x) underflows
+    (nu >> x), the ratio I_nu+1(x) / I_nu(x) is computed from its
+    continued fraction.
+
+    Args:
+        nu(int): order
+        x(float or array): argument
+
+    """
+    r = _ratio(ive(nu + 1, x), ive(nu, x), _ivratio, nu, x)
+    if nu == 0:
+        return r  # I'_0 = I_1, also at x = 0
+    return _over(nu, x) + r
+
+
+def kvr(nu, x):
+    """Logarithmic derivative of the modified Bessel function of
+    the second kind, K'_nu(x) / K_nu(x).
+
+    It is computed from exponentially scaled Bessel functions, and it
+    remains finite where kn underflows (large x). When K_nu(x) overflows
+    (nu >> x), the ratio K_nu+1(x) / K_nu(x) is computed using upward
+    recurrence.
+
+    Args:
+        nu(int): order
+        x(float or array): argument
+
+    """
+    r = _ratio(kve(nu + 1, x), kve(nu, x), _kvratio, nu, x)
+    return _over(nu, x) - r
+
+
+def _over(nu, x):
+    """nu / x, silently infinite (or nan) where x is 0."""
+    if isinstance(x, numpy.ndarray) or not x:
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.divide(nu, x)
+    return nu / x
+
+
+def _ratio(a, b, fallback, nu, x):
+    """a / b, or fallback(nu, x) where it is not finite."""
+    if isinstance(b, numpy.ndarray):
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            r = a / b
+        bad = ~numpy.isfinite(r)
+        if bad.any():
+            r[bad] = fallback(nu, numpy.broadcast_to(x, r.shape)[bad])
+        return r
+    if b and isfinite(a) and isfinite(b):
+        return a / b
+    return fallback(nu, x)
+
+
+def _ivratio(nu, x, terms=30):
+    """I_nu+1(x) / I_nu(x), from continued fraction.
+
+    The continued fraction converges quickly when nu >> x, which is
+    where this function is needed.
+
+    """
+    x = numpy.asarray(x, dtype=float)
+    t = numpy.zeros_like(x)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        for k in range(terms, 0, -1):
+            t = 1 / (2 * (nu + k) / x + t)
+    return t[()]
+
+
+def _kvratio(nu, x):
+    """K_nu+1(x) / K_nu(x), from upward recurrence
+    K_k+1 = K_k-1 + 2k / x K_k, which is stable for K.
+
+    """
+    x = numpy.asarray(x, dtype=float)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        t = kve(1, x) / kve(0, x)
+        for k in range(1, abs(nu) + 1):
+            t = 1 / t + 2 * k / x
+    return t[()]
+
+
+def iratio(nu, x, y):
+    """Ratio I_nu(x) / I_nu(y), from exponentially scaled Bessel
+    functions.
+
+    Args:
+        nu(int): order
+        x(float or array): argument of numerator
+        y(float or array): argument of denominator
+
+    """
+    return ive(nu, x) / ive(nu, y) * numpy.exp(x - y)
+
+
+def kratio(nu, x, y):
+    """Ratio K_nu(x) / K_nu(y), from exponentially scaled Bessel
+    functions.
+
+    Args:
+        nu(int): order
+        x(float or array): argument of numerator
+        y(float or array): argument of denominator
+
+    """
+    return kve(nu, x) / kve(nu, y) * numpy.exp(y - x)
@@ -50,12 +50,28 @@ class Mode(namedtuple('Mode', 'family nu m')):
         (positive integer) Radial order of the mode.
         It corresponds to the number of concentric rings in the mode fields.
 
+    .. py:attribute:: id
+
+        Family, *ν* and *m* packed into an integer (see :py:meth:`fromId`).
+        The family uses the 3 lowest bits, *ν* the next 13 bits
+        (0 .. 8191), and *m* the remaining bits. Hashing this integer is
+        much faster than hashing the mode itself, hence it is used as
+        key by the caches of fibers. It is computed only once, when
+        the Mode object is created.
+
     """
 
     def __new__(cls, family, nu, m):
         if not isinstance(family, Family):
             family = Family[family]
-        return super(Mode, cls).__new__(cls, family, nu, m)
+        mode = super(Mode, cls).__new__(cls, family, nu, m)
+        mode.id = family.value | nu << 3 | m << 16
+        return mode
+
+    @classmethod
+    def fromId(cls, id):
+        """Mode from its integer :py:attr:`id`."""
+        return cls(Family(id & 7), (id >> 3) & 0x1fff, id >> 16)
 
     def lpEq(self):
         """Equivalent LP mode."""
@@ -9,7 +9,23 @@ in parallel using multiple processes, or even using MPI.
 
 """
 
+import sys
 from .simulator import Simulator
-from .psimulator import PSimulator
+from .store import ResultStore
+from .sampler import AdaptiveSampler
 
-__all__ = ['Simulator', 'PSimulator']
+__all__ = ['Simulator', 'PSimulator', 'ResultStore', 'AdaptiveSampler']
+
+
+def __getattr__(name):
+    # PSimulator loads multiprocessing
+    if name == 'PSimulator':
+        from .psimulator import PSimulator
+        return PSimulator
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ (PEP 562) is not supported: import it now
+    PSimulator = __getattr__('PSimulator')
@@ -1,13 +1,14 @@
 
-from .simulator import Simulator
+from .simulator import Simulator, _FSimulator
 from multiprocessing import Pool
 from functools import partial
+from threading import Semaphore
 import os
 
 
 def applyf(fsim, name):
     fct = getattr(fsim, name)
-    return fct(), fsim.__self__._fiber.ne_cache
+    return fct(), fsim._fiber.ne_cache, fsim._modes, fsim._results
 
 
 class PSimulator(Simulator):
@@ -24,16 +25,66 @@ class PSimulator(Simulator):
                 self.terminate()
             self.pool = Pool(self.numProcs)
 
-            r = self.pool.imap(partial(applyf, name=name), self._fsims)
-            for i, (res, ne_cache) in enumerate(r):
-                self.fibers[i].ne_cache = ne_cache
-                yield res
+            # Pool.imap consumes its input from another thread. We limit
+            # the number of fibers waiting to be computed, so that
+            # fibers are not all built in advance.
+            inflight = {}
+            sem = Semaphore(2 * self.numProcs)
+            stopped = []
+
+            def fsims():
+                for i, fsim in enumerate(self._fsims):
+                    sem.acquire()
+                    if stopped:
+                        return
+                    self._preload(i, fsim)
+                    inflight[i] = fsim
+                    yield fsim
+
+            r = self.pool.imap(partial(applyf, name=name), fsims())
+            try:
+                for i, (res, ne_cache, modes, results) in enumerate(r):
+                    fsim = inflight.pop(i)
+                    sem.release()
+                    # Merge into the cache of the fiber, which shares
+                    # its registry with the other caches of the fiber
+                    for wl, values in ne_cache.items():
+                        for mode, neff in values.items():
+                            fsim._fiber.set_ne_cache(wl, mode, neff)
+                    fsim._modes = modes
+                    fsim._results = results
+                    fsim._grow(fsim._size())
+                    self._save(i, fsim)
+                    yield res
+            finally:
+                stopped.append(True)
+                sem.release()
+                self._flush()
             self.pool.close()
             self.pool.join()
             self.pool = None
 
         return wrapper
 
+    def compute(self, name, fnum, wlnum=None):
+        """Same as :py:meth:`Simulator.compute`.
+
+        While fibers are sent to the processes, the fiber is built
+        again, with its own caches, instead of taking it from the list
+        of fibers (which is not shared between threads).
+
+        """
+        if self.pool is None or not self.initialized:
+            return super().compute(name, fnum, wlnum)
+        fsim = _FSimulator(self.factory[fnum], self._wavelengths,
+                           self.numax, self.mmax, self.vectorial,
+                           self.scalar, self.delta)
+        return getattr(fsim, name)(wlnum)
+
+    def close(self):
+        self.terminate()
+        super().close()
+
     def terminate(self):
         if self.pool is not None:
             self.pool.terminate()
@@ -0,0 +1,142 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Adaptive choice of wavelengths for dispersion curves.
+
+A uniform list of wavelengths gives too few points where curves bend
+(e.g. near the cutoff of a mode), and too many where they are smooth.
+The :py:class:`AdaptiveSampler` starts from a coarse list of
+wavelengths, and only adds wavelengths where they are needed.
+
+"""
+
+from .simulator import _FSimulator
+from fibermodes import WavelengthGrid
+from fibermodes.slrc import SLRC
+from math import isnan
+import numpy
+
+
+class AdaptiveSampler(object):
+
+    """Wavelengths sampled adaptively, for a quantity of a fiber.
+
+    The middle of each interval of the coarse grid is computed, and
+    compared with the linear interpolation of the values at both ends
+    of the interval (the difference is proportional to the curvature of
+    the curve). Intervals are split again where this difference is
+    larger than *tol* for any mode, or where a mode appears or
+    disappears, until the target accuracy is reached, intervals are
+    smaller than *minstep*, or *maxpoints* wavelengths are computed.
+
+    Args:
+        fiber(:py:class:`~fibermodes.fiber.fiber.Fiber`): The fiber.
+        name(string): Quantity to compute, as the name of the Fiber
+            method (e.g. 'neff', 'ng', 'D').
+        tol(float): Tolerance on the interpolation error (in the units
+            of the quantity).
+        minstep(float): Smallest interval between wavelengths
+            (in meters).
+        maxpoints(int): Maximum number of wavelengths.
+        numax(int): Maximum nu parameter used when finding modes.
+        mmax(int): Maximum m parameter used when finding modes.
+        vectorial(bool): Find vector modes.
+        scalar(bool): Find scalar modes.
+        delta(float): Delta parameter used for mode solver.
+
+    """
+
+    def __init__(self, fiber, name='neff', tol=1e-6, minstep=1e-10,
+                 maxpoints=1000, numax=None, mmax=None, vectorial=True,
+                 scalar=False, delta=1e-6):
+        self.fiber = fiber
+        self.name = name
+        self.tol = tol
+        self.minstep = minstep
+        self.maxpoints = maxpoints
+        self._args = (numax, mmax, vectorial, scalar, delta)
+        self._modes = None
+
+    def _compute(self, wavelengths):
+        """Values at each wavelength, as dict {wl: {mode: value}}.
+
+        Modes are searched only once, at the shortest wavelength
+        of the first grid. Other wavelengths are longer, hence their
+        guided modes are among those.
+
+        """
+        wavelengths = sorted(wavelengths)
+        # Each batch has new wavelengths: rows of the fiber cache are
+        # left in the order of the grid of the simulator
+        fsim = _FSimulator(self.fiber, WavelengthGrid(wavelengths),
+                           *self._args, grid=False)
+        if self._modes is None:
+            self._modes = fsim.modes()[0]
+        else:
+            fsim._modes = [set(m for m in self._modes
+                               if fsim._isGuided(m, wl))
+                           for wl in fsim._wavelengths]
+        values = getattr(fsim, self.name)()
+        return {wl: {m: v for m, v in vals.items() if not isnan(v)}
+                for wl, vals in zip(wavelengths, values)}
+
+    def _split(self, va, vm, vb):
+        """Tell whether the interval must be split, from the values
+        at both ends (va, vb) and at the middle (vm).
+
+        """
+        if not (va.keys() == vm.keys() == vb.keys()):
+            return True
+        return any(abs(vm[m] - (va[m] + vb[m]) / 2) > self.tol
+                   for m in vm)
+
+    def sample(self, wavelengths):
+        """Compute the quantity on adaptively chosen wavelengths.
+
+        Args:
+            wavelengths(list): Coarse grid of wavelengths (list, SLRC
+                definition, or array), including both ends of the
+                spectral range.
+
+        Returns:
+            (wavelengths, values) where *wavelengths* is a
+            :py:class:`~fibermodes.wavelengthgrid.WavelengthGrid`, and
+            *values* is a list of dicts {mode: value} (one for each
+            wavelength). Modes not guided at a wavelength are absent.
+
+        """
+        if isinstance(wavelengths, numpy.ndarray):
+            wavelengths = wavelengths.tolist()
+        wls = sorted(set(float(wl) for wl in SLRC(wavelengths)))
+        values = self._compute(wls)
+
+        intervals = list(zip(wls[:-1], wls[1:]))
+        while intervals:
+            room = self.maxpoints - len(values)
+            intervals = [(a, b) for a, b in intervals
+                         if b - a >= 2 * self.minstep][:max(room, 0)]
+            if not intervals:
+                break
+            mids = [(a + b) / 2 for a, b in intervals]
+            values.update(self._compute(mids))
+            split = []
+            for (a, b), m in zip(intervals, mids):
+                if self._split(values[a], values[m], values[b]):
+                    split.append((a, m))
+                    split.append((m, b))
+            intervals = split
+
+        wls = sorted(values)
+        return WavelengthGrid(wls), [values[wl] for wl in wls]
@@ -18,19 +18,41 @@ an array of parameters.
 
 """
 
-from fibermodes import FiberFactory, Wavelength, Mode, ModeFamily
+from fibermodes import FiberFactory, WavelengthGrid, Mode, ModeFamily
 from fibermodes.slrc import SLRC
-from functools import reduce, partial
-import operator
+from fibermodes.fiber.solver.stats import SolverStats
+from fibermodes.fiber import cachemanager
+from .store import ResultStore
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from math import isnan
+import copy
+import json
+import numpy
+
+
+def _solveNeff(fiber, mode, wl, delta, lowbound):
+    """Task run by the executor (must be picklable)."""
+    return fiber.neff(mode, wl, delta=delta, lowbound=lowbound)
 
 
 class _FSimulator(object):
 
+    #: Estimated memory used by each result, or by each mode of a set
+    #: of modes (in bytes), accounted to the fiber by the cache manager.
+    ITEMSIZE = 72
+
     def __init__(self, fiber, wavelengths,
-                 numax, mmax, vectorial, scalar, delta):
+                 numax, mmax, vectorial, scalar, delta, grid=True):
         self._fiber = fiber
         self._wavelengths = wavelengths
+        self._grid = grid
+        if grid:
+            # Rows of the cache follow the wavelengths of the simulation
+            fiber.ne_cache.setGrid(wavelengths)
         self._modes = None
+        self._results = {}
 
         self._numax = numax
         self._mmax = mmax
@@ -38,74 +60,175 @@ class _FSimulator(object):
         self._scalar = scalar
         self._delta = delta
 
-    def modes(self):
+    @property
+    def _modeskey(self):
+        """Name identifying the mode search parameters."""
+        return "modes(numax={},mmax={},vectorial={},scalar={})".format(
+            self._numax, self._mmax, self._vectorial, self._scalar)
+
+    def _grow(self, n):
+        """Account for n results (or modes) kept in memory."""
+        if n:
+            cachemanager.manager.grow(self._fiber, n * self.ITEMSIZE)
+
+    def _size(self):
+        """Number of results and modes kept in memory."""
+        n = sum(len(values) for r in self._results.values() for values in r)
+        if self._modes is not None:
+            n += sum(len(modes) for modes in self._modes if modes)
+        return n
+
+    def _preload(self, store, fnum):
+        """Load known results from a ResultStore."""
+        known = store.getModes(fnum, self._modeskey)
+        if known:
+            self._modes = [known.get(float(wl), None)
+                           for wl in self._wavelengths]
+        for wl, values in store.get(fnum, 'neff').items():
+            for mode, neff in values.items():
+                self._fiber.set_ne_cache(wl, mode, neff)
+        for quantity in store.quantities(fnum):
+            known = store.get(fnum, quantity)
+            self._results[quantity] = [dict(known.get(float(wl), {}))
+                                       for wl in self._wavelengths]
+        self._grow(self._size())
+
+    def _save(self, store, fnum):
+        """Save computed results into a ResultStore."""
+        if self._modes is not None:
+            for wl, modes in zip(self._wavelengths, self._modes):
+                if modes is not None:
+                    store.putModes(fnum, self._modeskey, wl, modes)
+        # Copies, since the fiber may still be computed by another thread
+        for wl in self._wavelengths:
+            store.put(fnum, 'neff', wl,
+                      dict(self._fiber.ne_cache.get(wl, {})))
+        for quantity, r in list(self._results.items()):
+            for wl, values in zip(self._wavelengths, r):
+                store.put(fnum, quantity, wl, dict(values))
+
+    def modes(self, wlidx=None):
         if self._modes is None:
-            numax = self._numax
-            mmax = self._mmax
-            self._modes = [set() for _ in self._wavelengths]
-            for i, wl in enumerate(self._wavelengths):
-                if self._vectorial:
-                    self._modes[i] |= self._fiber.findVmodes(wl, numax, mmax)
-                if self._scalar:
-                    self._modes[i] |= self._fiber.findLPmodes(wl, numax, mmax)
-
-                numax = max(m.nu for m in self._modes[i])
-                mmax = [max((m.m for m in self._modes[i] if m.nu == nu),
-                            default=0)
-                        for nu in range(numax+1)]
+            self._modes = [None for _ in self._wavelengths]
+        if any(modes is None for modes in self._modes):
+            # Set of guided modes only grows when wavelength decreases.
+            # Modes are searched at shortest wavelength, and cutoffs
+            # tell which ones are guided at other wavelengths.
+            i0 = min(range(len(self._wavelengths)),
+                     key=lambda i: self._wavelengths[i])
+            missing = [i for i, modes in enumerate(self._modes)
+                       if modes is None]
+            if self._modes[i0] is None:
+                self._modes[i0] = self._findModes(self._wavelengths[i0])
+            for i in missing:
+                if self._modes[i] is None:
+                    self._modes[i] = set(m for m in self._modes[i0]
+                                         if self._isGuided(
+                                             m, self._wavelengths[i]))
+            self._grow(sum(len(self._modes[i]) for i in missing))
+        if wlidx is not None:
+            return self._modes[wlidx]
         return self._modes
 
-    def cutoff(self):
-        co = [{} for _ in self._wavelengths]
-        for i, wl in enumerate(self._wavelengths):
-            for m in self.modes()[i]:
-                co[i][m] = self._fiber.cutoff(m)
-        return co
+    def _findModes(self, wl):
+        modes = set()
+        if self._vectorial:
+            modes |= self._fiber.findVmodes(wl, self._numax, self._mmax)
+        if self._scalar:
+            modes |= self._fiber.findLPmodes(wl, self._numax, self._mmax)
+        return modes
+
+    def _isGuided(self, mode, wl):
+        """Same criterion as :py:meth:`Fiber.findModes`."""
+        try:
+            return self._fiber.cutoff(mode) <= self._fiber.V0(wl)
+        except (NotImplementedError, ValueError):
+            return not isnan(self._fiber.neff(mode, wl))
+
+    def _compute(self, name, fct, wlidx=None):
+        """Apply fct(mode, wlidx) on each mode and each wavelength,
+        or only at wavelength index wlidx.
 
-    def cutoffWl(self):
+        Values already known (e.g. loaded from a ResultStore) are not
+        computed again.
+
+        """
+        modes = self.modes()
+        r = self._results.setdefault(name,
+                                     [{} for _ in self._wavelengths])
+        indexes = range(len(self._wavelengths)) if wlidx is None else [wlidx]
+        n = 0
+        for i in indexes:
+            for m in modes[i]:
+                if m not in r[i]:
+                    r[i][m] = fct(m, i)
+                    n += 1
+        self._grow(n)
+        if wlidx is not None:
+            return {m: r[wlidx][m] for m in modes[wlidx]}
+        return [{m: r[i][m] for m in modes[i]}
+                for i in range(len(self._wavelengths))]
+
+    def cutoff(self, wlidx=None):
+        return self._compute('cutoff',
+                             lambda m, i: self._fiber.cutoff(m), wlidx)
+
+    def cutoffWl(self, wlidx=None):
         co = {}
-        for m in reduce(operator.or_, self.modes(), set()):
-            co[m] = self._fiber.toWl(self._fiber.cutoff(m))
 
-        cod = [{} for _ in self._wavelengths]
-        for i, wl in enumerate(self._wavelengths):
-            for m in self._modes[i]:
-                cod[i][m] = co[m]
-        return cod
+        def fct(m, i):
+            if m not in co:
+                co[m] = self._fiber.toWl(self._fiber.cutoff(m))
+            return co[m]
+
+        return self._compute('cutoffWl', fct, wlidx)
 
-    def _beta(self, p):
-        r = [{} for _ in self._wavelengths]
-        for i, wl in enumerate(self._wavelengths):
-            for m in self.modes()[i]:
-                lowbound = self._lowbound(m, i)
-                r[i][m] = self._fiber.beta(wl.omega, m, p=p,
-                                           delta=self._delta,
-                                           lowbound=lowbound)
-        return r
+    def _beta(self, p, wlidx=None):
+        def fct(m, i):
+            lowbound = self._lowbound(m, i)
+            return self._fiber.beta(self._wavelengths[i].omega, m, p=p,
+                                    delta=self._delta,
+                                    lowbound=lowbound)
 
-    def beta0(self):
-        return self._beta(0)
+        return self._compute('beta{}'.format(p), fct, wlidx)
 
-    def beta1(self):
-        return self._beta(1)
+    def beta0(self, wlidx=None):
+        return self._beta(0, wlidx)
 
-    def beta2(self):
-        return self._beta(2)
+    def beta1(self, wlidx=None):
+        return self._beta(1, wlidx)
 
-    def beta3(self):
-        return self._beta(3)
+    def beta2(self, wlidx=None):
+        return self._beta(2, wlidx)
+
+    def beta3(self, wlidx=None):
+        return self._beta(3, wlidx)
 
     def _neff(self, mode, wlidx):
+        if self._grid:
+            try:
+                neff = self._fiber.ne_cache.lookupRow(wlidx, mode)
+            except KeyError:
+                pass
+            else:
+                if self._fiber.stats is not None:
+                    self._fiber.stats.cache('ne_cache', True)
+                return neff
         lowbound = self._lowbound(mode, wlidx)
         wl = self._wavelengths[wlidx]
         return self._fiber.neff(mode, wl, delta=self._delta, lowbound=lowbound)
 
-    def _lowbound(self, mode, i):
-        wl = self._wavelengths[i]
-        lowbound = max(layer.maxIndex(wl) for layer in self._fiber.layers)
+    @staticmethod
+    def _dependencies(mode, i):
+        """Modes whose neff bound the neff of mode at wavelength index i.
+
+        Returns:
+            List of (mode, wavelength index).
 
+        """
+        deps = []
         if i > 0:
-            lowbound = min(lowbound, self._neff(mode, i-1))
+            deps.append((mode, i-1))
 
         pm = None
         if mode.family is ModeFamily.EH:
@@ -116,29 +239,240 @@ class _FSimulator(object):
             else:
                 pm = Mode(mode.family, mode.nu, mode.m - 1)
         if pm is not None:
-            lowbound = min(lowbound, self._neff(pm, i))
+            deps.append((pm, i))
 
         if (mode.family is ModeFamily.LP and mode.nu > 0):  # or mode.nu > 1:
-            pm = Mode(mode.family, mode.nu-1, mode.m)
-            lowbound = min(lowbound, self._neff(pm, i))
+            deps.append((Mode(mode.family, mode.nu-1, mode.m), i))
+
+        return deps
 
+    def _lowbound(self, mode, i):
+        wl = self._wavelengths[i]
+        lowbound = max(layer.maxIndex(wl) for layer in self._fiber.layers)
+        for pm, j in self._dependencies(mode, i):
+            lowbound = min(lowbound, self._neff(pm, j))
         return lowbound
 
-    def _apply_fct(self, fct):
-        r = [{} for _ in self._wavelengths]
-        for i, wl in enumerate(self._wavelengths):
-            for m in self.modes()[i]:
-                lowbound = self._lowbound(m, i)
-                r[i][m] = fct(m, wl, delta=self._delta, lowbound=lowbound)
-        return r
+    def schedule(self, executor):
+        """Solve neff of all modes, running independent ones concurrently.
+
+        The bounds used by the solver form a dependency graph between
+        (mode, wavelength) pairs: HE(nu, m) depends on EH(nu, m-1),
+        EH(nu, m) on HE(nu, m), LP(l, m) on LP(l-1, m), and each mode on
+        itself at the previous wavelength. Each pair is submitted to
+        the executor as soon as its bound is known. Results are put in
+        the cache of the fiber, and they are identical to the values
+        computed serially.
+
+        Args:
+            executor(concurrent.futures.Executor): Thread or process pool.
+                Solvers are re-entrant, hence threads share the fiber
+                (and its cache of results).
+
+        """
+        modes = self.modes()
+        wavelengths = self._wavelengths
+        cache = self._fiber.ne_cache
+
+        def known(node):
+            mode, i = node
+            try:
+                if self._grid:
+                    cache.lookupRow(i, mode)
+                else:
+                    cache.lookup(wavelengths[i], mode)
+            except KeyError:
+                return False
+            return True
+
+        # Dependency graph, restricted to unknown values
+        pending = {}
+        dependents = {}
+        stack = [(m, i) for i in range(len(wavelengths)) for m in modes[i]]
+        while stack:
+            node = stack.pop()
+            if node in pending or known(node):
+                continue
+            deps = [d for d in self._dependencies(*node) if not known(d)]
+            pending[node] = set(deps)
+            for d in deps:
+                dependents.setdefault(d, []).append(node)
+            stack.extend(deps)
+
+        futures = {}
+
+        def submit(node):
+            mode, i = node
+            f = executor.submit(_solveNeff, self._fiber, mode, wavelengths[i],
+                                self._delta, self._lowbound(mode, i))
+            futures[f] = node
+
+        for node, deps in pending.items():
+            if not deps:
+                submit(node)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for f in done:
+                node = futures.pop(f)
+                mode, i = node
+                self._fiber.set_ne_cache(wavelengths[i], mode, f.result())
+                for d in dependents.get(node, ()):
+                    pending[d].discard(node)
+                    if not pending[d]:
+                        submit(d)
+
+    def _apply_fct(self, name, fct, wlidx=None):
+        def f(m, i):
+            lowbound = self._lowbound(m, i)
+            return fct(m, self._wavelengths[i], delta=self._delta,
+                       lowbound=lowbound)
+
+        return self._compute(name, f, wlidx)
+
+    def neff(self, wlidx=None):
+        return self._compute('neff', self._neff, wlidx)
 
     def __getattr__(self, name):
         if name[0] != '_':
             fct = getattr(self._fiber, name)
-            return partial(self._apply_fct, fct)
+            return partial(self._apply_fct, name, fct)
         return getattr(super(), name)
 
 
+class _LRUSequence(object):
+
+    """Sequence of items built on demand.
+
+    Only the `cachesize` most recently used items are kept in memory.
+
+    """
+
+    def __init__(self, cachesize):
+        self.cachesize = cachesize
+        self._cache = OrderedDict()
+
+    def _build(self, index):
+        raise NotImplementedError()
+
+    def _stream(self):
+        """Iterator on items, for derived class that can build all
+        items faster than accessing them one by one."""
+        return (self._build(i) for i in range(len(self)))
+
+    def _keep(self, index, item):
+        self._cache[index] = item
+        if self.cachesize is not None:
+            while len(self._cache) > self.cachesize:
+                self._cache.popitem(last=False)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError
+        try:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+        except KeyError:
+            item = self._build(index)
+            self._keep(index, item)
+            return item
+
+    def __iter__(self):
+        for index, item in enumerate(self._stream()):
+            try:
+                self._cache.move_to_end(index)
+                item = self._cache[index]
+            except KeyError:
+                self._keep(index, item)
+            yield item
+
+    def release(self, index):
+        """Remove item from memory."""
+        self._cache.pop(index, None)
+
+    def adopt(self, other, moved):
+        """Take items of other sequence, moved to new indexes.
+
+        Args:
+            other(_LRUSequence): Sequence of the items.
+            moved(dict): New index of items, by index in other.
+
+        """
+        for index, item in other._cache.items():  # least recent first
+            if index in moved:
+                self._keep(moved[index], item)
+
+    def clear(self):
+        """Remove all items from memory."""
+        self._cache.clear()
+
+
+class _FiberList(_LRUSequence):
+
+    """Fibers generated by a FiberFactory, built on demand."""
+
+    def __init__(self, factory, cachesize):
+        super().__init__(cachesize)
+        # Copied, so that fibers (and their fingerprints) still match
+        # the list if the factory is modified afterwards
+        self.factory = copy.deepcopy(factory)
+        self._len = len(factory)
+
+    def __len__(self):
+        return self._len
+
+    def _build(self, index):
+        return self.factory[index]
+
+    def _stream(self):
+        return iter(self.factory)
+
+    def match(self, other):
+        """Find fibers of other list (built by another factory) that are
+        identical to fibers of this list, by comparing the fingerprints
+        of both factories.
+
+        Returns:
+            dict: Index of fibers in this list, by index in other.
+
+        """
+        known = {}
+        for index in range(len(other)):
+            known.setdefault(other.factory.fingerprint(index), index)
+        moved = {}
+        for index in range(len(self)):
+            if not known:
+                break
+            old = known.pop(self.factory.fingerprint(index), None)
+            if old is not None:
+                moved[old] = index
+        return moved
+
+
+class _FSimList(_LRUSequence):
+
+    """_FSimulator objects for each fiber, built on demand."""
+
+    def __init__(self, fibers, *args):
+        super().__init__(fibers.cachesize)
+        self._fibers = fibers
+        self._args = args
+
+    def __len__(self):
+        return len(self._fibers)
+
+    def _build(self, index):
+        return _FSimulator(self._fibers[index], *self._args)
+
+    def _stream(self):
+        return (_FSimulator(fiber, *self._args) for fiber in self._fibers)
+
+    def release(self, index):
+        super().release(index)
+        self._fibers.release(index)
+
+
 class Simulator(object):
 
     """The Simulator links :py:class:`~fibermodes.fiber.factory.FiberFactory`
@@ -157,13 +491,41 @@ class Simulator(object):
         scalar(bool): Find scalar modes.
         delta(float): Delta parameter used for mode solver (smaller is mode
             precise, bigger is faster).
+        store(ResultStore or string): Store (or directory name) used
+            to save results, and to resume interrupted simulations.
+        cachesize(int): Maximum number of fibers kept in memory, or None
+            to keep all fibers.
+        executor(concurrent.futures.Executor or int): When given, modes
+            of each fiber are solved concurrently using this executor (see
+            :py:meth:`_FSimulator.schedule`), before computing
+            the requested quantity. An int is the number of threads
+            of a new thread pool, owned by the simulator (see
+            :py:meth:`close`). Threads avoid copying fibers
+            between processes, and run in parallel while numpy and
+            scipy routines release the GIL.
+        stats(bool): Count and time solver calls of each fiber, in the
+            *stats* attribute (a
+            :py:class:`~fibermodes.fiber.solver.stats.SolverStats`
+            object, where fibers are labelled by their index).
         clone(Simulator): Simulator object to clone.
 
+    Fibers are generated from the factory when they are needed, and only
+    the *cachesize* most recently used fibers (with their cached results)
+    are kept in memory. When a store is used, fibers are released as soon
+    as their results are saved. Therefore, memory stays bounded, whatever
+    the number of fibers generated by the factory. The memory used by
+    the caches of all fibers, and the results kept for them, can also
+    be bounded using the budget of
+    :py:data:`fibermodes.fiber.cachemanager.manager`; results of evicted
+    fibers are saved into the store first (without a store, they are
+    dropped, and computed again when needed).
+
     """
 
     def __init__(self, factory=None, wavelengths=None,
                  numax=None, mmax=None, vectorial=True, scalar=False,
-                 delta=1e-6, clone=None):
+                 delta=1e-6, store=None, cachesize=256, executor=None,
+                 stats=False, clone=None):
         if clone is not None:
             self._fibers = clone._fibers
             self._wavelengths = clone._wavelengths
@@ -173,10 +535,22 @@ class Simulator(object):
             self._scalar = clone._scalar
             self.delta = clone.delta
             self.factory = clone.factory
+            self.store = clone.store
+            self.cachesize = clone.cachesize
+            self.executor = clone.executor
+            self._ownexecutor = False
+            self.stats = clone.stats
         else:
             self._fibers = None
             self._fsims = None
             self._wavelengths = None
+            self.store = None
+            self.cachesize = cachesize
+            self._ownexecutor = isinstance(executor, int)
+            if self._ownexecutor:
+                executor = ThreadPoolExecutor(executor)
+            self.executor = executor
+            self.stats = SolverStats() if stats else None
 
             self._numax = numax
             self._mmax = mmax
@@ -187,15 +561,35 @@ class Simulator(object):
             self.set_factory(factory)
             if wavelengths is not None:
                 self.set_wavelengths(wavelengths)
+            if store is not None:
+                self.set_store(store)
         self._build_fsims()
 
+    def close(self):
+        """Shut down the thread pool created by the simulator, if any.
+
+        Executors given to the constructor, and those of cloned
+        simulators, are left to their owner. The simulator can also be
+        used as a context manager, closed on exit.
+
+        """
+        if self._ownexecutor:
+            self.executor.shutdown()
+            self.executor = None
+            self._ownexecutor = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _build_fsims(self):
         if self.initialized:
-            self._fsims = tuple(_FSimulator(fiber, self._wavelengths,
-                                            self.numax, self.mmax,
-                                            self.vectorial, self.scalar,
-                                            self.delta)
-                                for fiber in self._fibers)
+            self._fsims = _FSimList(self._fibers, self._wavelengths,
+                                    self.numax, self.mmax,
+                                    self.vectorial, self.scalar,
+                                    self.delta)
 
     def set_wavelengths(self, value):
         """Set the list of wavelengths.
@@ -204,10 +598,15 @@ class Simulator(object):
         the current list of wavelengths.
 
         Args:
-            value(list): List of wavelengths (in meters)
+            value(list): List of wavelengths (in meters), or array
+                (e.g. :py:class:`~fibermodes.wavelengthgrid.WavelengthGrid`)
 
         """
-        self._wavelengths = tuple(Wavelength(w) for w in iter(SLRC(value)))
+        if isinstance(value, numpy.ndarray):
+            value = numpy.sort(value)  # as SLRC does for lists
+        else:
+            value = list(SLRC(value))
+        self._wavelengths = WavelengthGrid(value)
         self._build_fsims()
 
     def set_factory(self, factory):
@@ -216,21 +615,108 @@ class Simulator(object):
         It can be used if this was not done in the constructor, or to modify
         the current FiberFactory.
 
+        Fibers of the previous factory that are identical to fibers of
+        the new factory (same
+        :py:meth:`~fibermodes.fiber.factory.FiberFactory.fingerprint`)
+        are kept at their new index, with their results (those in memory,
+        and those saved in the store). Therefore, after a parameter of
+        a layer is modified, or values are added to a range, only the
+        fibers that changed are computed again.
+
         Args:
             factory(FiberFactory): FiberFactory object to use in simulator.
 
+        Returns:
+            dict: New index of each fiber that was kept, by old index.
+
+        Raises:
+            ValueError: No factory was set before, and the store
+                contains results for a different FiberFactory.
+
         """
         if isinstance(factory, str):
             factory = FiberFactory(factory)
+        if (self.store is not None and factory is not None and
+                self._fibers is None):
+            self._checkStore(self.store, factory)
         self.factory = factory
+        moved = {}
         if factory is not None:
-            self._fibers = tuple(iter(factory))
+            fibers = self._fibers
+            fsims = self._fsims if self.initialized else None
+            self._fibers = _FiberList(factory, self.cachesize)
             self._build_fsims()
+            if fibers is not None:
+                moved = self._fibers.match(fibers)
+                self._fibers.adopt(fibers, moved)
+                if fsims is not None:
+                    self._fsims.adopt(fsims, moved)
+            if self.store is not None and fibers is not None:
+                # Results of other fibers are not valid anymore
+                self.store.renumber(moved)
+                self.store.factory = self._layers(factory)
+        return moved
+
+    def set_store(self, store):
+        """Set the ResultStore used to save results.
+
+        Results are saved after each fiber is computed. Values already
+        in the store are not computed again. This allows to resume an
+        interrupted simulation, or to add wavelengths or modes to an
+        existing simulation.
+
+        Args:
+            store(ResultStore or string): ResultStore object, or name
+                of the directory where results are saved, or None.
+
+        Raises:
+            ValueError: The store contains results for a different
+                FiberFactory, or for a different delta.
+
+        """
+        if isinstance(store, str):
+            store = ResultStore(store)
+        if store is not None and self.factory is not None:
+            self._checkStore(store, self.factory)
+        self.store = store
+
+    def _checkStore(self, store, factory):
+        """Check that results in store were computed for factory, and
+        with the same delta. Results are identified by fiber index
+        only, hence they cannot be used for other fibers.
+
+        """
+        layers = self._layers(factory)
+        if store.factory is not None and store.factory != layers:
+            raise ValueError("Store contains results for a different "
+                             "FiberFactory.")
+        if store.delta is not None and store.delta != self.delta:
+            raise ValueError("Store contains results for a different "
+                             "delta ({}).".format(store.delta))
+        if store.factory is None:
+            store.factory = layers
+        if store.delta is None:
+            store.delta = self.delta
+
+    @staticmethod
+    def _layers(factory):
+        """Definition of the layers of factory, as saved in the store."""
+        return json.loads(factory.dumps(
+            default=lambda o: o.tolist()))["layers"]
+
+    def clear_caches(self):
+        """Remove fibers, and their cached results, from memory."""
+        if self._fibers is not None:
+            self._fibers.clear()
+        if self._fsims is not None:
+            self._fsims.clear()
 
     @property
     def fibers(self):
         """List of fibers, generated from the FiberFactory.
 
+        Fibers are built when they are accessed.
+
         Raises:
             ValueError: No FiberFactory was initialized.
 
@@ -242,7 +728,8 @@ class Simulator(object):
 
     @property
     def wavelengths(self):
-        """List of wavelengths.
+        """Wavelengths, as a
+        :py:class:`~fibermodes.wavelengthgrid.WavelengthGrid`.
 
         This list always is sorted.
 
@@ -300,9 +787,124 @@ class Simulator(object):
         """Whether FiberFactory and wavelengths are set."""
         return not (self._fibers is None or self._wavelengths is None)
 
+    def _preload(self, fnum, fsim):
+        cachemanager.manager.track(fsim._fiber, self._spill)
+        if self.stats is not None:
+            fsim._fiber.stats = self.stats.bind(fnum)
+        if self.store is not None:
+            fsim._preload(self.store, fnum)
+
+    def _spill(self, fiber):
+        """Save results of fiber into the store, before its caches are
+        evicted by the cache manager. Results kept by the simulator for
+        this fiber are released, even without a store.
+
+        Returns:
+            bool: Whether results were saved.
+
+        """
+        if self._fsims is None:
+            return False
+        for fnum, fsim in list(self._fsims._cache.items()):
+            if fsim._fiber is fiber:
+                saved = self.store is not None
+                if saved:
+                    fsim._save(self.store, fnum)
+                self._fsims.release(fnum)
+                return saved
+        return False
+
+    def compute(self, name, fnum, wlnum=None):
+        """Compute a quantity for a single fiber, and optionally
+        a single wavelength.
+
+        This gives some values quickly (e.g. those displayed by a user
+        interface), without going through all the fibers. Results are
+        kept with the fiber (within *cachesize*), hence they are not
+        computed again when iterating over the same quantity. They are
+        not saved into the store.
+
+        Args:
+            name(string): Quantity to compute (e.g. 'modes', 'cutoff',
+                'neff', 'beta1').
+            fnum(int): Index of the fiber.
+            wlnum(int): Index of the wavelength, or None for all
+                wavelengths.
+
+        Returns:
+            Value for each mode (dict, or set of modes for 'modes'),
+            or list of them for each wavelength if wlnum is None.
+
+        Raises:
+            ValueError: FiberFactory or wavelengths were not initialized.
+
+        """
+        if not self.initialized:
+            raise ValueError("Object not initialized. You must call "
+                             "set_factory and set_wavelengths first.")
+        fsim = self._fsims[fnum]
+        cachemanager.manager.track(fsim._fiber, self._spill)
+        if self.stats is not None:
+            fsim._fiber.stats = self.stats.bind(fnum)
+        return getattr(fsim, name)(wlnum)
+
+    def sample(self, name, fnum, wavelengths=None, tol=1e-6,
+               minstep=1e-10, maxpoints=1000):
+        """Compute a quantity for a single fiber, on wavelengths
+        chosen adaptively (see
+        :py:class:`~fibermodes.simulator.sampler.AdaptiveSampler`).
+
+        Args:
+            name(string): Quantity to compute (e.g. 'neff', 'ng', 'D').
+            fnum(int): Index of the fiber.
+            wavelengths(list): Coarse grid of wavelengths, including
+                both ends of the spectral range (default: wavelengths
+                of the simulator).
+            tol(float): Tolerance on the interpolation error (in the
+                units of the quantity).
+            minstep(float): Smallest interval between wavelengths
+                (in meters).
+            maxpoints(int): Maximum number of wavelengths.
+
+        Returns:
+            (wavelengths, values) where *wavelengths* is a
+            :py:class:`~fibermodes.wavelengthgrid.WavelengthGrid`, and
+            *values* is a list of dicts {mode: value}.
+
+        """
+        from .sampler import AdaptiveSampler  # sampler imports this module
+        if wavelengths is None:
+            wavelengths = self.wavelengths
+        fiber = self.fibers[fnum]
+        cachemanager.manager.track(fiber, self._spill)
+        if self.stats is not None:
+            fiber.stats = self.stats.bind(fnum)
+        sampler = AdaptiveSampler(fiber, name, tol, minstep, maxpoints,
+                                  self.numax, self.mmax, self.vectorial,
+                                  self.scalar, self.delta)
+        return sampler.sample(wavelengths)
+
+    def _save(self, fnum, fsim):
+        if self.store is not None:
+            fsim._save(self.store, fnum)
+            self._fsims.release(fnum)
+
+    def _flush(self):
+        if self.store is not None:
+            self.store.flush()
+
     def __getattr__(self, name):
         def wrapper():
-            for fsim in self._fsims:
-                fct = getattr(fsim, name)
-                yield fct()
+            try:
+                for fnum, fsim in enumerate(self._fsims):
+                    self._preload(fnum, fsim)
+                    if (self.executor is not None and
+                            name not in ('modes', 'cutoff', 'cutoffWl')):
+                        fsim.schedule(self.executor)
+                    fct = getattr(fsim, name)
+                    r = fct()
+                    self._save(fnum, fsim)
+                    yield r
+            finally:
+                self._flush()
         return wrapper
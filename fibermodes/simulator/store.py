@@ -0,0 +1,303 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent store for simulation results.
+
+A :py:class:`ResultStore` keeps the values computed by a
+:py:class:`~fibermodes.simulator.simulator.Simulator` on disk, so that an
+interrupted sweep can be resumed without computing again the values
+already known.
+
+Results are identified by fiber number, wavelength, quantity name
+(e.g. 'neff' or 'beta1'), and :py:class:`~fibermodes.mode.Mode`. Therefore,
+adding wavelengths to an existing simulation, or finding more modes, only
+computes the missing values.
+
+The store is a directory. Each flush writes pending results into a new
+chunk file (numpy .npz format). Chunk files are never modified after they
+are written; they are merged together by :py:meth:`ResultStore.compact`.
+
+"""
+
+import json
+import os
+import os.path
+import numpy
+from fibermodes import Mode, ModeFamily
+
+
+#: Pseudo-mode used to mark a set of modes as computed (even if empty).
+_MARKER = (0, 0, 0)
+
+
+class ResultStore(object):
+
+    """Persistent, resumable store for simulation results.
+
+    Args:
+        path(string): Directory where results are kept. It is created
+            if it does not exist.
+        bufsize(int): Number of pending values that triggers
+            an automatic flush.
+
+    """
+
+    def __init__(self, path, bufsize=10000):
+        self.path = path
+        self.bufsize = bufsize
+        self._results = {}
+        self._pending = []
+        self._meta = {}
+        self._nchunks = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _metafile(self):
+        return os.path.join(self.path, "store.json")
+
+    def _chunkfile(self, num):
+        return os.path.join(self.path, "chunk{:06d}.npz".format(num))
+
+    def _chunks(self):
+        return sorted(f for f in os.listdir(self.path)
+                      if f.startswith("chunk") and f.endswith(".npz") and
+                      ".tmp" not in f)
+
+    def _load(self):
+        if os.path.isfile(self._metafile()):
+            with open(self._metafile(), 'r') as f:
+                self._meta = json.load(f)
+
+        chunks = self._chunks()
+        for filename in chunks:
+            with numpy.load(os.path.join(self.path, filename)) as data:
+                names = list(data['names'])
+                for fnum, wl, q, fam, nu, m, value in zip(
+                        data['fnum'], data['wl'], data['quantity'],
+                        data['family'], data['nu'], data['m'],
+                        data['value']):
+                    self._set(int(fnum), float(wl), names[q],
+                              (int(fam), int(nu), int(m)), float(value))
+        if chunks:
+            self._nchunks = int(chunks[-1][5:-4]) + 1
+
+    def _set(self, fnum, wl, quantity, key, value):
+        cell = self._results.setdefault(fnum, {}).setdefault(quantity, {})
+        try:
+            cell[wl][key] = value
+        except KeyError:
+            cell[wl] = {key: value}
+
+    def _cell(self, fnum, quantity):
+        return self._results.get(fnum, {}).get(quantity, {})
+
+    @staticmethod
+    def _key(mode):
+        return (mode.family.value, mode.nu, mode.m)
+
+    @staticmethod
+    def _mode(key):
+        return Mode(ModeFamily(key[0]), key[1], key[2])
+
+    @property
+    def factory(self):
+        """JSON definition of the fiber layers used for the results,
+        or None if not set.
+
+        """
+        return self._meta.get("factory", None)
+
+    @factory.setter
+    def factory(self, value):
+        self._meta["factory"] = value
+        self._writemeta()
+
+    @property
+    def delta(self):
+        """Delta parameter of the mode solver used for the results,
+        or None if not set.
+
+        """
+        return self._meta.get("delta", None)
+
+    @delta.setter
+    def delta(self, value):
+        self._meta["delta"] = value
+        self._writemeta()
+
+    def _writemeta(self):
+        tmpfile = self._metafile() + ".tmp"
+        with open(tmpfile, 'w') as f:
+            json.dump(self._meta, f)
+        os.replace(tmpfile, self._metafile())
+
+    def get(self, fnum, quantity):
+        """Get known results for a given fiber and quantity.
+
+        Args:
+            fnum(int): Fiber number.
+            quantity(string): Name of the quantity.
+
+        Returns:
+            dict of dict. Keys are wavelengths, then modes.
+
+        """
+        cell = self._cell(fnum, quantity)
+        return {wl: {self._mode(k): v for k, v in values.items()
+                     if k != _MARKER}
+                for wl, values in cell.items()}
+
+    def getModes(self, fnum, key):
+        """Get known sets of modes for a given fiber.
+
+        Args:
+            fnum(int): Fiber number.
+            key(string): Name identifying the mode search parameters.
+
+        Returns:
+            dict. Keys are wavelengths, values are sets of modes.
+            Only wavelengths where modes were computed are returned.
+
+        """
+        cell = self._cell(fnum, key)
+        return {wl: set(self._mode(k) for k in values if k != _MARKER)
+                for wl, values in cell.items() if _MARKER in values}
+
+    def quantities(self, fnum):
+        """List of quantities with known results for a given fiber.
+
+        Args:
+            fnum(int): Fiber number.
+
+        Returns:
+            list of quantity names (sets of modes are not included).
+
+        """
+        return [q for q, cell in self._results.get(fnum, {}).items()
+                if not any(_MARKER in values for values in cell.values())]
+
+    def put(self, fnum, quantity, wl, values):
+        """Add results for a given fiber, quantity and wavelength.
+
+        Args:
+            fnum(int): Fiber number.
+            quantity(string): Name of the quantity.
+            wl(float): Wavelength.
+            values(dict): Values, indexed by mode.
+
+        """
+        wl = float(wl)
+        for mode, value in values.items():
+            key = self._key(mode)
+            if key in self._cell(fnum, quantity).get(wl, {}):
+                continue
+            self._set(fnum, wl, quantity, key, float(value))
+            self._pending.append((fnum, wl, quantity, key, float(value)))
+        if len(self._pending) >= self.bufsize:
+            self.flush()
+
+    def putModes(self, fnum, key, wl, modes):
+        """Add the set of modes found at a given wavelength.
+
+        Args:
+            fnum(int): Fiber number.
+            key(string): Name identifying the mode search parameters.
+            wl(float): Wavelength.
+            modes(set): Set of modes.
+
+        """
+        wl = float(wl)
+        if _MARKER in self._cell(fnum, key).get(wl, {}):
+            return
+        self.put(fnum, key, wl, {mode: 1 for mode in modes})
+        self._set(fnum, wl, key, _MARKER, 1)
+        self._pending.append((fnum, wl, key, _MARKER, 1))
+
+    def flush(self):
+        """Write pending results to disk."""
+        if not self._pending:
+            return
+
+        names = sorted(set(p[2] for p in self._pending))
+        fnum, wl, quantity, key, value = zip(*self._pending)
+        family, nu, m = zip(*key)
+
+        filename = self._chunkfile(self._nchunks)
+        tmpfile = filename[:-4] + ".tmp.npz"
+        numpy.savez(tmpfile,
+                    names=numpy.array(names),
+                    fnum=numpy.array(fnum, dtype=int),
+                    wl=numpy.array(wl),
+                    quantity=numpy.array([names.index(q) for q in quantity],
+                                         dtype=int),
+                    family=numpy.array(family, dtype=int),
+                    nu=numpy.array(nu, dtype=int),
+                    m=numpy.array(m, dtype=int),
+                    value=numpy.array(value))
+        os.replace(tmpfile, filename)
+        self._nchunks += 1
+        self._pending = []
+
+    def compact(self):
+        """Merge all chunk files into a single one."""
+        self.flush()
+        if len(self._chunks()) < 2:
+            return
+        self._rewrite()
+
+    def renumber(self, moved):
+        """Move results to new fiber numbers (e.g. after the factory
+        was modified, see
+        :py:meth:`~fibermodes.simulator.simulator.Simulator.set_factory`).
+
+        Results of fibers that were not moved are removed.
+
+        Args:
+            moved(dict): New fiber number, by old fiber number.
+
+        """
+        self.flush()
+        if all(moved.get(fnum) == fnum for fnum in self._results):
+            return
+        self._results = {moved[fnum]: cells
+                         for fnum, cells in self._results.items()
+                         if fnum in moved}
+        self._rewrite()
+
+    def _rewrite(self):
+        """Write all results into a new chunk file, replacing the others."""
+        chunks = self._chunks()
+        self._pending = [(fnum, wl, quantity, key, value)
+                         for fnum, cells in self._results.items()
+                         for quantity, cell in cells.items()
+                         for wl, values in cell.items()
+                         for key, value in values.items()]
+        self.flush()
+        for filename in chunks:
+            os.remove(os.path.join(self.path, filename))
+
+    def clear(self):
+        """Remove all results from the store."""
+        self._results = {}
+        self._pending = []
+        for filename in self._chunks():
+            os.remove(os.path.join(self.path, filename))
+        self._nchunks = 0
+
+    def __len__(self):
+        return sum(len(values) for cells in self._results.values()
+                   for cell in cells.values()
+                   for values in cell.values())
@@ -24,6 +24,7 @@ be either a scalar (float), a list of floats, a range, or a function (code).
 import math
 import logging
 import numpy
+from functools import lru_cache
 
 
 class SLRC(object):
@@ -117,16 +118,28 @@ class SLRC(object):
             else:
                 return []
         elif k == 'code':
-            cp = ", ".join(self.codeParams) + ", " if self.codeParams else ""
-            code = "def f({}*args, **kwargs):\n".format(cp)
-            for line in self._value.splitlines():
-                code += "    {}\n".format(line)
-            loc = {}
-            exec(code, self.rglobals, loc)
-            return loc['f']
+            cp = tuple(self.codeParams) if self.codeParams else ()
+            return self._compile(self._value, cp)
         else:
             return self._value
 
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _compile(cls, source, codeParams):
+        """Build function from source code.
+
+        Compiled functions are cached, since the same code usually is
+        evaluated for many fibers.
+
+        """
+        cp = ", ".join(codeParams) + ", " if codeParams else ""
+        code = "def f({}*args, **kwargs):\n".format(cp)
+        for line in source.splitlines():
+            code += "    {}\n".format(line)
+        loc = {}
+        exec(code, cls.rglobals, loc)
+        return loc['f']
+
     @value.setter
     def value(self, value):
         if isinstance(value, SLRC):
@@ -0,0 +1,121 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Arrays of wavelengths, with vectorized units conversion."""
+
+import numpy
+from fibermodes.constants import c, tpi
+from fibermodes.wavelength import Wavelength
+
+
+class WavelengthGrid(numpy.ndarray):
+
+    """Array of wavelengths (in meters).
+
+    This class is inherited from :py:class:`numpy.ndarray`, as
+    :py:class:`~fibermodes.wavelength.Wavelength` is inherited from
+    :py:class:`float`. Properties convert all the wavelengths at once
+    (e.g. ``grid.k0`` is an array of wave numbers). Accessing a single
+    element (by index or iteration) gives a
+    :py:class:`~fibermodes.wavelength.Wavelength` object. Slices are
+    WavelengthGrid objects, but results of arithmetic operations are
+    plain arrays.
+
+    """
+
+    def __new__(cls, *args, **kwargs):
+        """Construct a WavelengthGrid object, from a sequence of values.
+
+        You can pass to the constructor any keyword defined in properties
+        (k0, omega, w, wl, wavelength, frequency, v, or f), as for
+        :py:class:`~fibermodes.wavelength.Wavelength`.
+        If no keyword is given, values are considered to be wavelengths.
+
+        """
+        nargs = len(args) + len(kwargs)
+        if nargs > 1:
+            raise TypeError("WavelengthGrid constructor need exactly one "
+                            "parameter")
+        if nargs == 0:
+            return numpy.empty(0).view(cls)
+        if args:
+            return numpy.array(args[0], dtype=float, ndmin=1).view(cls)
+
+        (key, value), = kwargs.items()
+        value = numpy.array(value, dtype=float, ndmin=1)
+        if key == 'k0':
+            num = tpi
+        elif key in ('omega', 'w'):
+            num = c * tpi
+        elif key in ('wl', 'wavelength'):
+            return value.view(cls)
+        elif key in ('frequency', 'v', 'f'):
+            num = c
+        else:
+            raise TypeError("Invalid argument")
+        return cls._inverse(num, value).view(cls)
+
+    @staticmethod
+    def _inverse(num, x):
+        """num / x, inf where x is 0."""
+        with numpy.errstate(divide='ignore'):
+            return num / numpy.asarray(x)
+
+    def __array_wrap__(self, array, context=None, return_scalar=False):
+        if return_scalar:
+            return array[()]
+        return array.view(numpy.ndarray)
+
+    def __getitem__(self, index):
+        value = super().__getitem__(index)
+        if isinstance(value, numpy.ndarray):
+            return value
+        return Wavelength(value)
+
+    def __iter__(self):
+        return (Wavelength(wl) for wl in self.wavelength)
+
+    @property
+    def k0(self):
+        """Wave numbers (:math:`2 \\pi / \\lambda`)."""
+        return self._inverse(tpi, self)
+
+    @property
+    def omega(self):
+        """Angular frequencies (in rad/s)."""
+        return self._inverse(c * tpi, self)
+
+    w = omega
+
+    @property
+    def wavelength(self):
+        """Wavelengths (in meters), as plain array."""
+        return self.view(numpy.ndarray)
+
+    wl = wavelength
+
+    @property
+    def frequency(self):
+        """Frequencies (in Hertz)."""
+        return self._inverse(c, self)
+
+    v = frequency
+    f = frequency
+
+    def __str__(self):
+        return "[{}]".format(", ".join(str(wl) for wl in self))
+
+    def __repr__(self):
+        return "WavelengthGrid({})".format(self.wavelength.tolist())
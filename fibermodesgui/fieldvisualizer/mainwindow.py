@@ -8,12 +8,66 @@ import pyqtgraph as pg
 import numpy
 
 
+class FieldWorker(QtCore.QThread):
+
+    """Compute the fields of modes in the background.
+
+    The fields are computed for each resolution (number of points)
+    in turn, so that a coarse preview can be shown first.
+
+    """
+
+    # r, np, {mode: Field}
+    fieldsAvailable = QtCore.pyqtSignal(float, int, object)
+
+    # Workers are kept until they are finished, even if the window
+    # is closed (they cannot be interrupted while computing a field)
+    _running = set()
+
+    def __init__(self, fiber, wl, modes, r, resolutions):
+        super().__init__()
+        self.fiber = fiber
+        self.wl = wl
+        self.modes = modes
+        self.r = r
+        self.resolutions = resolutions
+        self.cancelled = False
+        self.finished.connect(self._done)
+
+    def start(self):
+        self._running.add(self)
+        super().start()
+
+    def _done(self):
+        self._running.discard(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        for np in self.resolutions:
+            fields = {}
+            for mode in self.modes:
+                if self.cancelled:
+                    return
+                fields[mode] = Field(self.fiber, mode, self.wl, self.r, np)
+                fields[mode]._radial()  # Only costly part
+            self.fieldsAvailable.emit(self.r, np, fields)
+
+
 class FieldVisualizer(AppWindow):
 
-    # TODO: cache field objects. Recompute fields only when needed:
-    # - np changed
-    # - r changed
-    # - (phase, oriendation, amplitude): compute only image
+    """Display the combination of the fields of many modes.
+
+    The radial profiles of the fields of each mode are computed in
+    a worker thread (see :py:class:`FieldWorker`), at *PREVIEW*
+    resolution first. They are kept, so that changing phase,
+    orientation or amplitude of the modes only recombines arrays.
+
+    """
+
+    #: Number of points of the preview.
+    PREVIEW = 50
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -67,7 +121,8 @@ class FieldVisualizer(AppWindow):
 
         self.__layers = None
         self.__quiver = []
-        self.initFields()
+        self._fields = {}  # (mode, r, np): Field
+        self._worker = None
 
         self.graph = pg.PlotWidget()
         self.image = pg.ImageItem()
@@ -89,27 +144,55 @@ class FieldVisualizer(AppWindow):
         self.modes = modes
         self.updatePlot()
 
-    def initFields(self):
-        self.__field = {f: None for f in Field.FTYPES}
+    def combineFields(self, fname, r, np):
+        """Weighted sum of field fname of the modes, or None if the
+        fields are not computed yet."""
+        try:
+            fields = [(self._fields[(m, r, np)], p, t, a)
+                      for m, p, t, a in self.modes]
+        except KeyError:
+            return None
+        F = numpy.zeros((np, np))
+        for field, p, t, a in fields:
+            F += getattr(field, fname)(p, t) * a
+        return F
 
-    def computeFields(self, reset=False, **kwargs):
-        if reset:
-            self.initFields()
+    def computeFields(self, r, np):
+        """Compute missing fields in the background, cancelling the
+        previous job if it became stale."""
+        # Only keep the fields that can still be displayed
+        keep = {(r, np), (r, self.PREVIEW)}
+        self._fields = {k: v for k, v in self._fields.items()
+                        if k[1:] in keep}
 
-        np = self.options.np.value()
-        r = self.options.radius.value() * 1e-6
-        for f in Field.FTYPES:
-            if kwargs.get(f, False):
-                if self.__field[f] is None:
-                    self.__field[f] = numpy.zeros((np, np))
-                else:
-                    kwargs.pop(f)  # Do not recompute if already computed
-
-        for m, p, t, a in self.modes:
-            field = self.fiber.field(m, self.wl, r, np)
-            for f in Field.FTYPES:
-                if kwargs.get(f, False):
-                    self.__field[f] += getattr(field, f)(p, t) * a
+        modes = {m for m, _, _, _ in self.modes
+                 if (m, r, np) not in self._fields}
+        w = self._worker
+        if (w is not None and w.isRunning() and
+                (set(w.modes), w.r, w.resolutions[-1]) == (modes, r, np)):
+            return  # Same job
+        self._cancel()
+        if modes:
+            modes = list(modes)
+            resolutions = [np]
+            if np > self.PREVIEW and any((m, r, self.PREVIEW)
+                                         not in self._fields for m in modes):
+                resolutions.insert(0, self.PREVIEW)
+            self._worker = FieldWorker(self.fiber, self.wl, modes, r,
+                                       resolutions)
+            self._worker.fieldsAvailable.connect(self.updateFields)
+            self._worker.start()
+
+    def _cancel(self):
+        if self._worker is not None:
+            self._worker.fieldsAvailable.disconnect()
+            self._worker.cancel()
+            self._worker = None
+
+    def updateFields(self, r, np, fields):
+        for m, field in fields.items():
+            self._fields[(m, r, np)] = field
+        self.showFields()
 
     def plotLayers(self, state):
         if self.__layers is None:
@@ -142,16 +225,29 @@ class FieldVisualizer(AppWindow):
         #     self.r = max(abs(vr.top()), abs(vr.bottom()),
         #                  abs(vr.left()), abs(vr.right()))
 
+        r = self.options.radius.value() * 1e-6
+        self.computeFields(r, self.options.np.value())
+        self.showFields()
+
+    def showFields(self):
+        """Display the fields, at full resolution if available,
+        otherwise using the preview."""
         fname = self.options.field.currentText()
-        self.computeFields(reset=True, **{fname: True})
-        self.image.setImage(self.__field[fname])
-        self.setImageColor()
         r = self.options.radius.value() * 1e-6
+        np = self.options.np.value()
+        F = self.combineFields(fname, r, np)
+        if F is None:
+            F = self.combineFields(fname, r, self.PREVIEW)
+            if F is None:
+                return
+        self.image.setImage(F)
+        self.setImageColor()
         self.image.setRect(QtCore.QRectF(-r, -r, 2*r, 2*r))
 
-        self.computeFields(Emod=True, Epol=True)
-        self.options.quiver.updateFields(self.__field['Emod'],
-                                         self.__field['Epol'])
+        if F.shape[0] == np:
+            self.options.quiver.updateFields(
+                self.combineFields('Emod', r, np),
+                self.combineFields('Epol', r, np))
 
     def updateRange(self, view, rgn):
         pass
@@ -167,3 +263,7 @@ class FieldVisualizer(AppWindow):
     def hideEvent(self, event):
         self.options.hide()
         return super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self._cancel()
+        return super().closeEvent(event)
@@ -13,14 +13,90 @@
 # You should have received a copy of the GNU General Public License
 # along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
 
-from PyQt4 import QtGui
+from PyQt4 import QtGui, QtCore
 import pyqtgraph as pg
 import numpy
-from fibermodes import Mode, ModeFamily, HE11
+from fibermodes import Mode, ModeFamily, HE11, Wavelength
+from functools import partial
 from itertools import count
 from math import isnan
 
 
+def _passes(n, coarse):
+    """Indexes 0 to n-1, by passes of increasing resolution: about
+    *coarse* evenly spaced points first, then points halfway between
+    those already computed."""
+    done = numpy.zeros(n, dtype=bool)
+    step = max(1, (n - 1) // coarse)
+    while True:
+        idx = numpy.arange(0, n, step)
+        if n and idx[-1] != n - 1:
+            idx = numpy.append(idx, n - 1)
+        idx = idx[~done[idx]]
+        done[idx] = True
+        yield idx
+        if step == 1:
+            return
+        step //= 2
+
+
+class CharEqWorker(QtCore.QThread):
+
+    """Evaluate a function of a solver in the background.
+
+    The function is evaluated on x by passes (a coarse grid first,
+    then refined), using :py:meth:`FiberSolver.evaluate` on blocks
+    of points. Each block is signalled, so that the plot is updated
+    progressively. Then, *zeros* (a function returning zeros and the
+    log of the solver) is called, if given. It is given a function
+    telling whether the worker was cancelled, to stop early.
+
+    """
+
+    valuesAvailable = QtCore.pyqtSignal(object, object)  # indexes, values
+    zerosAvailable = QtCore.pyqtSignal(object, object)  # zeros, log
+
+    COARSE = 64
+    BLOCK = 2048
+
+    # Workers are kept until they are finished, even if the dialog
+    # is closed (they are only interrupted between two modes)
+    _running = set()
+
+    def __init__(self, solver=None, fct=None, x=(), args=(), zeros=None):
+        super().__init__()
+        self.solver = solver
+        self.fct = fct
+        self.x = numpy.asarray(x)
+        self.args = args
+        self.zeros = zeros
+        self.cancelled = False
+        self.finished.connect(self._done)
+
+    def start(self):
+        self._running.add(self)
+        super().start()
+
+    def _done(self):
+        self._running.discard(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        for idx in _passes(self.x.size, self.COARSE):
+            for i in range(0, idx.size, self.BLOCK):
+                if self.cancelled:
+                    return
+                block = idx[i:i+self.BLOCK]
+                y = self.solver.evaluate(self.fct, self.x[block], *self.args)
+                self.valuesAvailable.emit(block, y)
+        if self.zeros is not None and not self.cancelled:
+            x, log = self.zeros(lambda: self.cancelled)
+            if not self.cancelled:
+                self.zerosAvailable.emit(x, log)
+
+
 class CharEqDialog(QtGui.QDialog):
 
     """Plot characteristic function
@@ -72,7 +148,7 @@ class CharEqDialog(QtGui.QDialog):
 
         npLabel = QtGui.QLabel(self.tr("# points"))
         self.npInput = QtGui.QSpinBox()
-        self.npInput.setRange(50, 10000)
+        self.npInput.setRange(50, 100000)
         self.npInput.setValue(50)
         self.npInput.setSingleStep(50)
         self.npInput.valueChanged.connect(self.updateMode)
@@ -115,6 +191,8 @@ class CharEqDialog(QtGui.QDialog):
         self.setLayout(layout)
         self.__zeros = None
         self.__points = None
+        self._worker = None
+        self._zerosWorker = None
         self.updateMode()
 
     def setTitle(self):
@@ -147,90 +225,126 @@ class CharEqDialog(QtGui.QDialog):
 
     def plotCharEq(self):
         Neff = numpy.linspace(self.neffMin, self.neffMax, self.npInput.value())
-        y = numpy.empty(Neff.shape)
-
         Fct = {ModeFamily.LP: self.fiber._neff._lpceq,
                ModeFamily.TE: self.fiber._neff._teceq,
                ModeFamily.TM: self.fiber._neff._tmceq,
                ModeFamily.HE: self.fiber._neff._heceq,
                ModeFamily.EH: self.fiber._neff._ehceq
                }
-        fct = Fct[self.mode.family]
-
-        for i, neff in enumerate(Neff):
-            try:
-                y[i] = fct(neff, self.wl, self.mode.nu)
-            except ZeroDivisionError:
-                y[i] = numpy.nan
-
-        self.plot.clear()
-        self.plot.plot(Neff, y)
-        self.plot.addLine(y=0)
-        self.showZeros(self.zeros.isChecked(), True)
+        self._compute(self.fiber._neff, Fct[self.mode.family],
+                      Neff, (self.wl, self.mode.nu))
 
     def plotCutoff(self):
         V0 = self.fiber.V0(self.wl)
         V = numpy.linspace(0, V0, self.npInput.value())
-        y = numpy.empty(V.shape)
-
         Fct = {ModeFamily.LP: self.fiber._cutoff._lpcoeq,
                ModeFamily.TE: self.fiber._cutoff._tecoeq,
                ModeFamily.TM: self.fiber._cutoff._tmcoeq,
                ModeFamily.HE: self.fiber._cutoff._hecoeq,
                ModeFamily.EH: self.fiber._cutoff._ehcoeq
                }
-        fct = Fct[self.mode.family]
+        self._compute(self.fiber._cutoff, Fct[self.mode.family],
+                      V, (self.mode.nu,))
 
-        for i, v in enumerate(V):
-            try:
-                y[i] = fct(v, self.mode.nu)
-            except ZeroDivisionError:
-                y[i] = numpy.nan
+    def _compute(self, solver, fct, x, args):
+        """Plot fct(x, *args), computed in the background."""
+        self._cancel()
+        self._x = x
+        self._y = numpy.empty(x.shape)
+        self._done = numpy.zeros(x.shape, dtype=bool)
 
         self.plot.clear()
-        self.plot.plot(V, y)
+        self._curve = self.plot.plot([], [])
         self.plot.addLine(y=0)
+        self._worker = self._run(CharEqWorker(solver, fct, x, args))
         self.showZeros(self.zeros.isChecked(), True)
 
-    def _get_char_eq_zeros(self):
+    def _run(self, worker):
+        worker.valuesAvailable.connect(self.updateValues)
+        worker.zerosAvailable.connect(self.updateZeros)
+        worker.start()
+        return worker
+
+    def _cancel(self, zeros=False):
+        """Cancel the zeros worker (and the plot worker if not zeros)."""
+        names = ['_zerosWorker'] if zeros else ['_worker', '_zerosWorker']
+        for name in names:
+            worker = getattr(self, name)
+            if worker is not None:
+                worker.valuesAvailable.disconnect()
+                worker.zerosAvailable.disconnect()
+                worker.cancel()
+                setattr(self, name, None)
+
+    def updateValues(self, indexes, values):
+        self._y[indexes] = values
+        self._done[indexes] = True
+        self._curve.setData(self._x[self._done], self._y[self._done])
+
+    def updateZeros(self, x, log):
+        self._zerosWorker = None
+        self.__zeros = pg.ScatterPlotItem(x, [0] * len(x), pen='r', brush='r')
+        x, y = zip(*log) if log else ([], [])
+        self.__points = pg.ScatterPlotItem(x, y, pen='b', brush='b')
+        self.showZeros(self.zeros.isChecked())
+
+    def closeEvent(self, event):
+        self._cancel()
+        super().closeEvent(event)
+
+    def _get_char_eq_zeros(self, pmode, delta, cancelled):
+        """Zeros of the characteristic function, and the points evaluated
+        by the solver to find them (called from the worker thread).
+
+        The worker uses its own solver, since the log is kept by the
+        solver, and the solver of the fiber is used by other threads.
+
+        """
         x = []
-        delta = float(self.delta.text())
         nl = len(self.fiber)
-        self.fiber._neff.start_log()
+        wl = Wavelength(self.wl)
+        solver = type(self.fiber._neff)(self.fiber)
+        solver.start_log()
         for m in count(1):
-            if self.mode.family is ModeFamily.EH and nl > 2:
-                mode = Mode(ModeFamily.HE, self.mode.nu, m)
+            if cancelled():
+                break
+            if pmode.family is ModeFamily.EH and nl > 2:
+                mode = Mode(ModeFamily.HE, pmode.nu, m)
             else:
-                mode = Mode(self.mode.family, self.mode.nu, m)
-            neff = self.fiber.neff(mode, self.wl, delta)
+                mode = Mode(pmode.family, pmode.nu, m)
+            neff = solver(wl, mode, delta, None)
             if isnan(neff):
                 break
             else:
                 x.append(neff)
 
             if mode.family is ModeFamily.HE and nl > 2:
-                mode = Mode(ModeFamily.EH, self.mode.nu, m)
-                neff = self.fiber.neff(mode, self.wl, delta)
+                mode = Mode(ModeFamily.EH, pmode.nu, m)
+                neff = solver(wl, mode, delta, None)
                 if isnan(neff):
                     break
                 else:
                     x.append(neff)
-        self.fiber._neff.stop_log()
-        return x
+        solver.stop_log()
+        return x, solver.log
 
-    def _get_cutoff_eq_zeros(self):
+    def _get_cutoff_eq_zeros(self, pmode, cancelled):
+        """Same as _get_char_eq_zeros, for the cutoff function."""
         V0 = self.fiber.V0(self.wl)
         x = []
-        self.fiber._cutoff.start_log()
+        solver = type(self.fiber._cutoff)(self.fiber)
+        solver.start_log()
         for m in count(1):
-            mode = Mode(self.mode.family, self.mode.nu, m)
-            co = self.fiber.cutoff(mode)
+            if cancelled():
+                break
+            mode = Mode(pmode.family, pmode.nu, m)
+            co = solver(mode)
             if co < V0:
                 x.append(co)
             else:
                 break
-        self.fiber._cutoff.stop_log()
-        return x
+        solver.stop_log()
+        return x, solver.log
 
     def showZeros(self, checked, reset=False):
 
@@ -240,6 +354,7 @@ class CharEqDialog(QtGui.QDialog):
         self.points.setEnabled(ckzeros)
 
         if reset:
+            self._cancel(zeros=True)
             if self.__zeros is not None:
                 self.plot.removeItem(self.__zeros)
                 self.__zeros = None
@@ -249,25 +364,19 @@ class CharEqDialog(QtGui.QDialog):
 
         if ckzeros:
             if self.__zeros is None:
-                if self.fType.currentIndex() == 0:
-                    x = self._get_char_eq_zeros()
-                else:
-                    x = self._get_cutoff_eq_zeros()
-                y = [0] * len(x)
-                self.__zeros = pg.ScatterPlotItem(x, y, pen='r', brush='r')
-            self.plot.addItem(self.__zeros)
-
-            if self.__points is None:
-                x, y = [], []
-                if self.fType.currentIndex() == 0:
-                    if len(self.fiber._neff.log) > 0:
-                        x, y = zip(*self.fiber._neff.log)
-                else:
-                    if len(self.fiber._cutoff.log) > 0:
-                        x, y = zip(*self.fiber._cutoff.log)
-                self.__points = pg.ScatterPlotItem(x, y, pen='b', brush='b')
-
-            if ckpoints:
+                # Computed in the background (see updateZeros)
+                if self._zerosWorker is None:
+                    if self.fType.currentIndex() == 0:
+                        fct = partial(self._get_char_eq_zeros, self.mode,
+                                      float(self.delta.text()))
+                    else:
+                        fct = partial(self._get_cutoff_eq_zeros, self.mode)
+                    self._zerosWorker = self._run(CharEqWorker(zeros=fct))
+                return
+            if self.__zeros.scene() is None:
+                self.plot.addItem(self.__zeros)
+
+            if ckpoints and self.__points.scene() is None:
                 self.plot.addItem(self.__points)
                 self.__points.stackBefore(self.__zeros)
 
@@ -301,12 +301,13 @@ class ModeSolver(AppWindow):
         self.plotFrame = PlotFrame(self)
         self.plotFrame.modified.connect(self.setDirty)
         self.modeTableView.selChanged.connect(self.plotFrame.updateModeSel)
-        self.modeTableModel.dataChanged.connect(self.plotFrame.updatePlot)
+        self.modeTableModel.modeSelChanged.connect(self.plotFrame.updatePlot)
+        self.doc.valuesAvailable.connect(self.plotFrame.updateValues)
         self.splitter.addWidget(self.plotFrame)
         self.setCentralWidget(self.splitter)
 
         self.doc.computeStarted.connect(self.initProgressBar)
-        self.doc.valueAvailable.connect(self.updateProgressBar)
+        self.doc.valuesAvailable.connect(self.updateProgressBar)
         self.doc.computeFinished.connect(self.stopProgressBar)
 
     def _parametersFrame(self):
@@ -540,6 +541,8 @@ class ModeSolver(AppWindow):
         self.actions['plotchareq'].setEnabled(True)
         self.fiberSelector.updateFiberName()
         self.fiberSlider.setNum(len(self.doc.fibers))
+        if len(self.doc.fibers):
+            self.setFiber(self.fiberSlider.fiberInput.value())
         self.setDirty(True)
         self._updateFiberCount()
         self.statusBar().showMessage(self.tr("Fiber factory loaded"), 5000)
@@ -567,6 +570,7 @@ class ModeSolver(AppWindow):
         self.modeTableModel.setFiber(value)
         self.plotFrame.setFiber(value)
         self.showVNumber()
+        self.prefetch()
         self.setDirty(True)
 
     def setWavelength(self, value):
@@ -577,8 +581,13 @@ class ModeSolver(AppWindow):
             self.modeTableModel.setWavelength(value)
             self.plotFrame.setWavelength(value)
             self.showVNumber()
+            self.prefetch()
             self.setDirty(True)
 
+    def prefetch(self):
+        """Compute displayed fiber and wavelength first."""
+        self.doc.prefetch(self.modeTableModel._fnum, self.modeTableModel._wl)
+
     def showVNumber(self):
         try:
             wlnum = self.modeTableModel._wl
@@ -609,12 +618,12 @@ class ModeSolver(AppWindow):
         self.timer.start(0)
         self.actions['exportcur'].setEnabled(False)
 
-    def updateProgressBar(self):
+    def updateProgressBar(self, keys):
         tot = self.progressBar.maximum()
         if tot == 0:
-            tot = self.doc.toCompute + 1
+            tot = self.doc.numValues
             self.progressBar.setMaximum(tot)
-        self.progressBar.setValue(self.progressBar.value() + 1)
+        self.progressBar.setValue(self.progressBar.value() + len(keys))
         elapsed = self.time.elapsed()
         self.estimation = elapsed
         if self.doc.toCompute > 0:
@@ -642,6 +651,7 @@ class ModeSolver(AppWindow):
 
     def run_simulation(self):
         self.doc.ready = True
+        self.prefetch()
         self.doc.start()
         self.actions['start'].setEnabled(False)
         self.actions['stop'].setEnabled(True)
@@ -61,6 +61,8 @@ PARAMS = {
 
 class ModeTableModel(QtCore.QAbstractTableModel):
 
+    modeSelChanged = QtCore.pyqtSignal()
+
     def __init__(self, doc, parent=None):
         super().__init__(parent)
         self._doc = doc
@@ -68,7 +70,7 @@ class ModeTableModel(QtCore.QAbstractTableModel):
         self.modes = []
 
         doc.modesAvailable.connect(self.updateModes)
-        doc.valueAvailable.connect(self.updateValue)
+        doc.valuesAvailable.connect(self.updateValues)
 
     def rowCount(self, parent=QtCore.QModelIndex):
         return len(self.modes)
@@ -127,6 +129,7 @@ class ModeTableModel(QtCore.QAbstractTableModel):
         if index.column() == 0:
             mode = self.modes[index.row()]
             self._doc.selection[mode] = value
+            self.modeSelChanged.emit()
         self.dataChanged.emit(index, index)
         return True
 
@@ -170,12 +173,17 @@ class ModeTableModel(QtCore.QAbstractTableModel):
         self.beginResetModel()
         try:
             self.modes = list(self._doc.modes[self._fnum][self._wl])
-        except IndexError:
+        except (KeyError, IndexError):
             pass
         self.endResetModel()
 
-    def updateValue(self, fnum, wl, mode, j):
-        if (fnum, wl) == (self._fnum, self._wl):
-            i = self.modes.index(mode)
-            index = self.index(i, j)
-            self.dataChanged.emit(index, index)
+    def updateValues(self, keys):
+        """Signal the block of cells covering the new values
+        of the current fiber and wavelength."""
+        rows = {mode: i for i, mode in enumerate(self.modes)}
+        cells = [(rows[mode], j + 1) for (fnum, wl, mode, j) in keys
+                 if (fnum, wl) == (self._fnum, self._wl) and mode in rows]
+        if cells:
+            i, j = zip(*cells)
+            self.dataChanged.emit(self.index(min(i), min(j)),
+                                  self.index(max(i), max(j)))
@@ -240,6 +240,7 @@ class PlotFrame(QtGui.QFrame):
         self.doc = parent.doc
         self._wl = self._fnum = 0
         self._modesel = []
+        self._curves = {}  # (row, mode): plot item
 
         self.plotOptions = PlotOptions(self)
 
@@ -314,6 +315,7 @@ class PlotFrame(QtGui.QFrame):
             return
 
         self.plot.clear()
+        self._curves = {}
         if self.plotOptions.showLegend.isChecked():
             if self.legend is not None:
                 self.legend.scene().removeItem(self.legend)
@@ -418,11 +420,7 @@ class PlotFrame(QtGui.QFrame):
         for m, xy in y.items():
             if self.doc.selection.get(m, 1) == 0:
                 continue
-            X, Y = zip(*sorted(xy))
-            if xaxis == VNUMBER:
-                X = [self.X[-x-1] for x in X]
-            elif xaxis == WAVELENGTHS:
-                X = [self.X[x] for x in X]
+            X, Y = self._curveData(xy)
 
             col = m.color()
             symb = MARKM[m.family] if mark == 'Mode' else mark
@@ -431,13 +429,80 @@ class PlotFrame(QtGui.QFrame):
                            width=3 if m in self._modesel else 1)
             spen = pg.mkPen(color='w', width=2 if m in self._modesel else 1)
             name = str(m) if nr == 1 else "{} ({})".format(str(m), nf)
-            self.plot.plot(X, Y, pen=pen, symbol=symb,
-                           symbolBrush=symbb, symbolPen=spen, name=name)
+            self._curves[(row, m)] = self.plot.plot(
+                X, Y, pen=pen, symbol=symb,
+                symbolBrush=symbb, symbolPen=spen, name=name)
             miny = min(Y)
             maxy = max(Y)
             self.miny = min(miny, self.miny)
             self.maxy = max(maxy, self.maxy)
 
+    def _curveData(self, xy):
+        """X and Y of a curve, from (fiber or wavelength index, value)."""
+        X, Y = zip(*sorted(xy))
+        xaxis = self.xAxisSelector.currentIndex()
+        if xaxis == VNUMBER:
+            X = [self.X[-x-1] for x in X]
+        elif xaxis == WAVELENGTHS:
+            X = [self.X[x] for x in X]
+        return X, Y
+
+    def updateValues(self, keys):
+        """Update the curves of the modes that got new values.
+
+        Existing curves are modified in place. The whole plot is
+        redrawn only when new curves (or cutoffs) must be added.
+
+        """
+        if not self.doc.initialized:
+            return
+
+        rows = {}
+        for row in range(self.plotModel.rowCount()):
+            what = self.plotModel.data(self.plotModel.index(row, 0),
+                                       QtCore.Qt.UserRole)
+            rows.setdefault(what, []).append(row)
+        cutoffs = (self.plotOptions.showCutoffs.isEnabled() and
+                   self.plotOptions.showCutoffs.isChecked())
+
+        xaxis = self.xAxisSelector.currentIndex()
+        changed = set()
+        for f, w, m, j in keys:
+            if xaxis == FIBERS and w != self._wl:
+                continue
+            if xaxis != FIBERS and f != self._fnum:
+                continue
+            if self.doc.selection.get(m, 1) == 0:
+                continue
+            if cutoffs and self.doc.params[j].startswith("cutoff"):
+                self.updatePlot()
+                return
+            for row in rows.get(j, ()):
+                if (row, m) not in self._curves:
+                    self.updatePlot()
+                    return
+                changed.add((row, m, j))
+
+        for row, m, j in changed:
+            if xaxis == FIBERS:
+                xy = [(f+1, self.doc.values[(f, self._wl, m, j)])
+                      for f in range(len(self.doc.fibers))
+                      if (f, self._wl, m, j) in self.doc.values]
+            else:
+                xy = [(w, self.doc.values[(self._fnum, w, m, j)])
+                      for w in range(len(self.doc.wavelengths))
+                      if (self._fnum, w, m, j) in self.doc.values]
+            X, Y = self._curveData(xy)
+            self._curves[(row, m)].setData(X, Y)
+            self.miny = min(min(Y), self.miny)
+            self.maxy = max(max(Y), self.maxy)
+        if changed:
+            try:
+                viewBox = self.plot.getPlotItem().getViewBox()
+                viewBox.setYRange(self.miny, self.maxy)
+            except:
+                pass
+
     def plotCutoffs(self):
         xaxis = self.xAxisSelector.currentIndex()
         if xaxis == WAVELENGTHS:
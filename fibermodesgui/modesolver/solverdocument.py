@@ -1,6 +1,8 @@
 
 from PyQt4 import QtCore
-from fibermodes import FiberFactory, Simulator, PSimulator, Mode
+from fibermodes import FiberFactory, Simulator, PSimulator
+from collections import deque
+import threading
 import csv
 
 
@@ -8,9 +10,17 @@ class SolverDocument(QtCore.QThread):
 
     computeStarted = QtCore.pyqtSignal()
     modesAvailable = QtCore.pyqtSignal(int)  # fiber num
-    valueAvailable = QtCore.pyqtSignal(int, int, object, int)
+    # list of (fnum, wlnum, mode, j) keys of new values
+    valuesAvailable = QtCore.pyqtSignal(list)
     computeFinished = QtCore.pyqtSignal()
 
+    #: New values are signalled in batches, every BATCH_TIME ms.
+    BATCH_TIME = 50
+
+    #: Number of neighbours computed first on each side of the selection
+    #: (see :py:meth:`prefetch`).
+    NEIGHBOURS = 2
+
     def __init__(self, parent):
         super().__init__(parent)
 
@@ -20,8 +30,9 @@ class SolverDocument(QtCore.QThread):
         # self.numfibers = 0
 
         self.toCompute = 0
+        self.numValues = 0
         self.values = {}
-        self.modes = []
+        self.modes = {}  # fnum: list of sets of modes, for each wl
         self.selection = {}
 
         self.simulator = PSimulator()
@@ -29,20 +40,34 @@ class SolverDocument(QtCore.QThread):
         self.running = False
         self.ready = False
 
+        # Keys of new values, appended by the compute thread,
+        # and signalled by the timer (in the GUI thread)
+        self._pending = deque()
+        # (fnum, wlnum) to compute before the next fiber,
+        # pushed by the GUI thread (see prefetch)
+        self._queue = deque()
+        # Guards _pending and _queue, shared with the GUI thread
+        self._lock = threading.Lock()
+        self._batchTimer = QtCore.QTimer(self)
+        self._batchTimer.setInterval(self.BATCH_TIME)
+        self._batchTimer.timeout.connect(self._flushValues)
+        self.finished.connect(self._stopBatches)
+
+        # Name of simulator function for each parameter
         self.PARAMFCT = {
-            "cutoff (V)": self.simulator.cutoff,
-            "cutoff (wavelength)": self.simulator.cutoffWl,
-            "neff": self.simulator.neff,
-            "b": self.simulator.b,
-            "vp": self.simulator.vp,
-            "beta0": self.simulator.beta0,
-            "ng": self.simulator.ng,
-            "vg": self.simulator.vg,
-            "beta1": self.simulator.beta1,
-            "D": self.simulator.D,
-            "beta2": self.simulator.beta2,
-            "S": self.simulator.S,
-            "beta3": self.simulator.beta3}
+            "cutoff (V)": "cutoff",
+            "cutoff (wavelength)": "cutoffWl",
+            "neff": "neff",
+            "b": "b",
+            "vp": "vp",
+            "beta0": "beta0",
+            "ng": "ng",
+            "vg": "vg",
+            "beta1": "beta1",
+            "D": "D",
+            "beta2": "beta2",
+            "S": "S",
+            "beta3": "beta3"}
 
     @property
     def initialized(self):
@@ -102,10 +127,17 @@ class SolverDocument(QtCore.QThread):
 
     @filename.setter
     def filename(self, value):
+        self.stop_thread()
         self._filename = value
         self.factory = FiberFactory(value)
-        self.simulator.set_factory(self.factory)
-        self.start()
+        moved = self.simulator.set_factory(self.factory)
+
+        # Keep results of fibers that did not change
+        self.modes = {moved[fnum]: m for fnum, m in self.modes.items()
+                      if fnum in moved}
+        self.values = {(moved[key[0]],) + key[1:]: v
+                       for key, v in self.values.items() if key[0] in moved}
+        self.start(keep=True)
 
     @property
     def fibers(self):
@@ -135,7 +167,14 @@ class SolverDocument(QtCore.QThread):
         else:
             self.simulator = PSimulator(clone=self.simulator, processes=value)
 
-    def start(self):
+    def start(self, keep=False):
+        """(Re)start computation of all values.
+
+        Args:
+            keep(bool): Keep known modes and values (they must still
+                be valid), and only compute the missing ones.
+
+        """
         if not self.simulator.initialized:
             return
 
@@ -143,24 +182,84 @@ class SolverDocument(QtCore.QThread):
             return
 
         self.stop_thread()
+        self._pending.clear()
+        if not keep:
+            self.modes = {}
+            self.values = {}
+        self.toCompute = -len(self.values)
+        self.running = True
+        self._batchTimer.start()
         super().start()
 
+    def prefetch(self, fnum, wlnum):
+        """Compute values of given fiber and wavelength, then of their
+        neighbours, before the next fiber.
+
+        Points are pushed to the front of the work queue of the
+        document thread, replacing those of the previous selection.
+
+        """
+        nf = len(self.simulator.fibers)
+        nw = len(self.simulator.wavelengths)
+        points = [(fnum, wlnum)]
+        for d in range(1, self.NEIGHBOURS + 1):
+            points.extend([(fnum, wlnum + d), (fnum, wlnum - d),
+                           (fnum + d, wlnum), (fnum - d, wlnum)])
+        with self._lock:
+            self._queue.clear()
+            self._queue.extend((i, j) for i, j in points
+                               if 0 <= i < nf and 0 <= j < nw)
+
+    def _computeQueued(self):
+        """Compute the points pushed by :py:meth:`prefetch`, skipping
+        the values already known."""
+        while self.running:
+            with self._lock:
+                if not self._queue:
+                    return
+                fnum, wlnum = self._queue.popleft()
+            if fnum not in self.modes:
+                self._setModes(fnum, self.simulator.compute('modes', fnum))
+            modes = self.modes[fnum][wlnum]
+            for j, p in enumerate(self.params):
+                if all((fnum, wlnum, mode, j) in self.values
+                       for mode in modes):
+                    continue
+                values = self.simulator.compute(self.PARAMFCT[p],
+                                                fnum, wlnum)
+                for mode, value in values.items():
+                    self._setValue((fnum, wlnum, mode, j), value)
+
+    def _setModes(self, fnum, modes):
+        """Keep modes of a fiber, unless they are already known."""
+        if fnum in self.modes:
+            return
+        self.modes[fnum] = modes
+        self.modesAvailable.emit(fnum)
+
+    def _setValue(self, key, value):
+        """Keep a new value, unless it is already known."""
+        if key not in self.values:
+            self.values[key] = value
+            self.toCompute -= 1
+            with self._lock:
+                self._pending.append(key)
+
     def run(self):
-        self.modes = []
-        self.values = {}
-        self.toCompute = 0
-        self.running = True
+        total = 0
         for fnum, resultf in enumerate(self.simulator.modes()):
-            self.modes.append(resultf)
-            self.modesAvailable.emit(fnum)
-            self.toCompute += sum(len(rw) for rw in resultf)
-        self.toCompute *= len(self.params)
+            self._setModes(fnum, resultf)
+            total += sum(len(rw) for rw in resultf)
+            self._computeQueued()
+        total *= len(self.params)
+        self.numValues = total
+        self.toCompute += total
 
         if self.toCompute > 0:
             self.computeStarted.emit()
 
             for j, p in enumerate(self.params):
-                fct = self.PARAMFCT[p]
+                fct = getattr(self.simulator, self.PARAMFCT[p])
 
                 for fnum, resultf in enumerate(fct()):
                     if not self.running:
@@ -168,11 +267,24 @@ class SolverDocument(QtCore.QThread):
                         return
                     for wlnum, resultw in enumerate(resultf):
                         for mode, value in resultw.items():
-                            self.values[(fnum, wlnum, mode, j)] = value
-                            self.valueAvailable.emit(fnum, wlnum, mode, j)
-                            self.toCompute -= 1
+                            self._setValue((fnum, wlnum, mode, j), value)
+                    self._computeQueued()
+            # Last values are signalled (queued) before computeFinished
+            self._flushValues()
             self.computeFinished.emit()
 
+    def _flushValues(self):
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        if batch:
+            self.valuesAvailable.emit(batch)
+
+    def _stopBatches(self):
+        if not self.isRunning():  # thread could have been restarted
+            self._batchTimer.stop()
+        self._flushValues()
+
     def stop_thread(self):
         self.running = False
         self.wait()
@@ -181,12 +293,9 @@ class SolverDocument(QtCore.QThread):
         """Clear caches from the simulator.
 
         """
-        self.modes = []
+        self.modes = {}
         self.values = {}
-        for fiber in self.simulator.fibers:
-            fiber.co_cache = {Mode("HE", 1, 1): 0,
-                              Mode("LP", 0, 1): 0}
-            fiber.ne_cache = {}
+        self.simulator.clear_caches()
 
     def export(self, filename, wlnum, fnum):
         with open(filename, 'w', newline='') as csvfile:
@@ -46,12 +46,11 @@ setup(name='fibermodes',
         'License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)',
         'Natural Language :: English',
         'Operating System :: OS Independent',
-        'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         'Topic :: Scientific/Engineering :: Physics'],
       install_requires=[
-        'numpy >= 1.9.0',
-        'scipy >= 0.15.0',
+        'numpy >= 1.13.3',
+        'scipy >= 1.4.0',
         'pyqtgraph >= 0.9.10',
         # 'PyQt4 >= 4.11'  # see http://stackoverflow.com/questions/4628519/is-it-possible-to-require-pyqt-from-setuptools-setup-py
       ],
@@ -16,7 +16,9 @@
 """Test suite for fiber.geometry.stepindex module"""
 
 import unittest
+import numpy
 
+from fibermodes import Wavelength
 from fibermodes.fiber.geometry.stepindex import StepIndex
 
 
@@ -40,6 +42,43 @@ class TestStepIndex(unittest.TestCase):
         self.assertEqual(geom.index(10e-6, 1550e-9), 1.444)
         self.assertIsNone(geom.index(2e-6, 1550e-9))
 
+    def testFieldsContinuity(self):
+        """Constants found from fields at inner radius give back
+        the same fields."""
+        geom = StepIndex(4e-6, 6e-6, m="Fixed", mp=(1.454,))
+        wl = Wavelength(1550e-9)
+        r = 4e-6
+
+        for neff in (1.45, 1.46):
+            EH = numpy.array([0.5, 0., 0., -2.])
+            geom.EH_fields(r, r, 0, neff, wl, EH, True)
+            numpy.testing.assert_allclose(EH, [0.5, 0., 0., -2.])
+
+            EH = numpy.array([0., 0.5, -2., 0.])
+            geom.EH_fields(r, r, 0, neff, wl, EH, False)
+            numpy.testing.assert_allclose(EH, [0., 0.5, -2., 0.])
+
+            EH0 = numpy.array([[1., 0.2], [0.3, 1.], [-2., 3.], [4., -5.]])
+            EH = EH0.copy()
+            geom.EH_fields(r, r, 2, neff, wl, EH)
+            numpy.testing.assert_allclose(EH, EH0)
+
+    def testFieldsArray(self):
+        core = StepIndex(0, 2e-6, m="Fixed", mp=(1.474,))
+        ring = StepIndex(2e-6, 4e-6, m="Fixed", mp=(1.454,))
+        wl = Wavelength(1550e-9)
+        neffs = numpy.linspace(1.445, 1.47, 5)
+
+        for nu, shape in ((0, (4,)), (2, (4, 2))):
+            EHa = numpy.empty(shape + neffs.shape)
+            core.EH_fields(0, 2e-6, nu, neffs, wl, EHa)
+            ring.EH_fields(2e-6, 4e-6, nu, neffs, wl, EHa)
+            for i, neff in enumerate(neffs):
+                EH = numpy.empty(shape)
+                core.EH_fields(0, 2e-6, nu, neff, wl, EH)
+                ring.EH_fields(2e-6, 4e-6, nu, neff, wl, EH)
+                numpy.testing.assert_allclose(EHa[..., i], EH)
+
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,103 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fiber.geometry.supergaussian module"""
+
+import unittest
+import numpy
+
+from fibermodes import Wavelength, FiberFactory, Mode
+from fibermodes.fiber.geometry import StepIndex, SuperGaussian
+
+
+class TestSuperGaussian(unittest.TestCase):
+
+    """Test suite for SuperGaussian class"""
+
+    def _geom(self, ri, ro, c, m=1, n=1.474):
+        return SuperGaussian(ri, ro, 0, c, m, m="Fixed", mp=(n,),
+                             cm="Fixed", cmp=(1.444,))
+
+    def testIndex(self):
+        geom = self._geom(0, 8e-6, 4e-6)
+        wl = Wavelength(1550e-9)
+
+        self.assertAlmostEqual(geom.index(0, wl), 1.474)
+        self.assertAlmostEqual(geom.index(4e-6, wl),
+                               1.444 + 0.03 * numpy.exp(-0.5))
+        self.assertIsNone(geom.index(9e-6, wl))
+        self.assertAlmostEqual(geom.maxIndex(wl), 1.474)
+        self.assertAlmostEqual(geom.minIndex(wl), geom.index(8e-6, wl))
+
+        h = 1e-12
+        for r in (1e-6, 4e-6, 7e-6):
+            self.assertAlmostEqual(
+                geom.indexp(r, wl),
+                (geom.index(r + h, wl) - geom.index(r - h, wl)) / (2 * h),
+                delta=1e-3)
+
+    def testUniformFields(self):
+        """Very large c gives the fields of a step-index layer."""
+        wl = Wavelength(1550e-9)
+        for ri, ro in ((0, 8e-6), (8e-6, 10e-6)):
+            sg = self._geom(ri, ro, 1)
+            si = StepIndex(ri, ro, m="Fixed", mp=(1.474,))
+            for neff in (1.45, 1.47, 1.48):
+                for nu in (0, 1, 3):
+                    for tm in (True, False):
+                        shape = (4,) if nu == 0 else (4, 2)
+                        a = numpy.ones(shape)
+                        b = numpy.ones(shape)
+                        sg.EH_fields(ri, ro, nu, neff, wl, a, tm)
+                        si.EH_fields(ri, ro, nu, neff, wl, b, tm)
+                        if ri == 0:
+                            # Solutions are normalized differently
+                            a /= a[:2].sum(axis=0)
+                        numpy.testing.assert_allclose(
+                            a, b, rtol=0, atol=1e-7 * abs(b).max())
+
+    def testFieldsAtTurningPoint(self):
+        """Fields are finite where the index equals neff."""
+        geom = self._geom(0, 8e-6, 4e-6)
+        wl = Wavelength(1550e-9)
+        neff = geom.index(4e-6, wl)
+        EH = numpy.empty((4, 2))
+        geom.EH_fields(0, 8e-6, 1, neff, wl, EH)
+        self.assertTrue(numpy.all(numpy.isfinite(EH)))
+
+    def testNeff(self):
+        """Vector modes compared with a fine staircase approximation."""
+        wl = Wavelength(1550e-9)
+        f = FiberFactory()
+        f.addLayer(radius=8e-6, geometry="SuperGaussian",
+                   tparams=[0, 4e-6, 1], index=1.474)
+        f.addLayer(index=1.444)
+        fiber = f[0]
+
+        f = FiberFactory()
+        r = numpy.linspace(0.01, 8, 800)
+        n = 1.444 + 0.03 * numpy.exp(-0.5 * ((r - 0.005) / 4)**2)
+        f.addProfile(numpy.column_stack((r, n)), unit=1e-6)
+        f.addLayer(index=1.444)
+        staircase = f[0]
+
+        for mode in (Mode('HE', 1, 1), Mode('TE', 0, 1)):
+            self.assertAlmostEqual(fiber.neff(mode, wl, delta=1e-4),
+                                   staircase.neff(mode, wl, delta=1e-4),
+                                   places=7, msg=str(mode))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,8 +16,9 @@
 """Test suite for fibermodes.fiber.material.silica module"""
 
 import unittest
+import warnings
 
-from fibermodes import Wavelength
+from fibermodes import Wavelength, WavelengthGrid
 from fibermodes.fiber.material import Silica
 
 
@@ -29,6 +30,16 @@ class TestSilica(unittest.TestCase):
         self.assertAlmostEqual(Silica.n(Wavelength(0.5876e-6)), 1.45846, 5)
         self.assertAlmostEqual(Silica.n(Wavelength(1.55e-6)), 1.44402, 5)
 
+    def testIndexArray(self):
+        wl = WavelengthGrid([0.5876e-6, 1.55e-6])
+        n = Silica.n(wl)
+        self.assertEqual(list(n), [Silica.n(w) for w in wl])
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            Silica.n(WavelengthGrid([1e-6, 5e-6]))
+        self.assertEqual(len(w), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.fiber.solver.fdm module."""
+
+import unittest
+import numpy
+
+from fibermodes import FiberFactory, Mode, Wavelength
+from fibermodes.fiber.solver import fdm
+
+# numpy.trapz was renamed numpy.trapezoid in NumPy 2.0
+trapezoid = getattr(numpy, 'trapezoid', None) or numpy.trapz
+
+
+class TestFDM(unittest.TestCase):
+
+    """Test suite for finite-difference Neff solver."""
+
+    def setUp(self):
+        self.f = FiberFactory()
+        self.wl = Wavelength(1550e-9)
+
+    def testSSIF(self):
+        self.f.addLayer(radius=4e-6, index=1.474)
+        self.f.addLayer(index=1.444)
+        fiber = self.f[0]
+        solver = fdm.Neff(fiber)
+
+        for nu, nmodes in ((0, 2), (1, 1), (2, 1), (3, 0)):
+            neff, psi = solver.solve(self.wl, nu)
+            self.assertEqual(len(neff), nmodes)
+            self.assertEqual(psi.shape, (nmodes, solver.grid().size))
+            for m, n in enumerate(neff, 1):
+                self.assertAlmostEqual(
+                    n, fiber.neff(Mode('LP', nu, m), self.wl), places=5)
+
+        # Refined with the exact characteristic equation
+        fiber.setSolvers(Neff=fdm.Neff)
+        for mode, neff in ((Mode('LP', 0, 1), 1.4689382871197456),
+                           (Mode('LP', 0, 2), 1.4491468363288242),
+                           (Mode('LP', 1, 1), 1.461339462319498)):
+            self.assertAlmostEqual(fiber.neff(mode, self.wl), neff,
+                                   places=11)
+        self.assertTrue(numpy.isnan(fiber.neff(Mode('LP', 2, 2), self.wl)))
+
+    def testFields(self):
+        self.f.addLayer(radius=4e-6, index=1.474)
+        self.f.addLayer(index=1.444)
+        solver = fdm.Neff(self.f[0])
+        r = solver.grid()
+        neff, psi = solver.solve(self.wl, 0)
+
+        # Normalized and orthogonal
+        for i in range(len(neff)):
+            for j in range(len(neff)):
+                self.assertAlmostEqual(
+                    trapezoid(psi[i] * psi[j] * r, r), i == j,
+                    places=4)
+
+        # Same shape as the exact field
+        f = numpy.array([solver._lpfield(self.wl, 0, neff[0], rho)[0][0]
+                         for rho in r[::50]])
+        f *= psi[0, 0] / f[0]
+        numpy.testing.assert_allclose(psi[0, ::50], f,
+                                      atol=1e-3 * psi[0, 0])
+
+    def testSuperGaussian(self):
+        """Graded profile compared with fine staircase approximation."""
+        self.f.addLayer(radius=8e-6, geometry="SuperGaussian",
+                        tparams=[0, 4e-6, 1], index=1.474)
+        self.f.addLayer(index=1.444)
+        solver = fdm.Neff(self.f[0])
+
+        g = FiberFactory()
+        r = numpy.linspace(0.01, 8, 800)
+        n = 1.444 + 0.03 * numpy.exp(-0.5 * ((r - 0.005) / 4)**2)
+        g.addProfile(numpy.column_stack((r, n)), unit=1e-6)
+        g.addLayer(index=1.444)
+        g.setSolvers(Neff=fdm.Neff)
+        staircase = g[0]
+
+        for nu in range(3):
+            neff, _ = solver.solve(self.wl, nu)
+            for m, n in enumerate(neff, 1):
+                self.assertAlmostEqual(
+                    n, staircase.neff(Mode('LP', nu, m), self.wl), places=5)
+
+    def testVectorModes(self):
+        """Vector modes are seeded by LP modes."""
+        self.f.addLayer(radius=6e-6, index=1.452)
+        self.f.addLayer(radius=9e-6, index=1.449)
+        self.f.addLayer(index=1.444)
+        fiber = self.f[0]
+        self.f.setSolvers(Neff=fdm.Neff)
+        fdmfiber = self.f[0]
+
+        for mode in (Mode('HE', 1, 1), Mode('TE', 0, 1), Mode('TM', 0, 1),
+                     Mode('HE', 2, 1), Mode('EH', 1, 1), Mode('HE', 1, 2)):
+            self.assertAlmostEqual(fdmfiber.neff(mode, self.wl),
+                                   fiber.neff(mode, self.wl),
+                                   places=10, msg=str(mode))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.fiber.solver.mlsif module."""
+
+import unittest
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+
+from fibermodes import FiberFactory, Mode, Wavelength
+from fibermodes.fiber.solver import mlsif
+
+
+class TestMLSIFCutoff(unittest.TestCase):
+
+    """Test suite for multilayer step-index fiber cutoffs."""
+
+    def setUp(self):
+        self.f = FiberFactory()
+
+    def _compareCutoffs(self, modes, places=4):
+        fiber = self.f[0]
+        mlfiber = self.f[0]
+        mlfiber.setSolvers(Cutoff=mlsif.Cutoff)
+        for mode in modes:
+            self.assertAlmostEqual(mlfiber.cutoff(mode), fiber.cutoff(mode),
+                                   places=places, msg=str(mode))
+
+    def testSSIF(self):
+        self.f.addLayer(radius=4e-6, index=1.474)
+        self.f.addLayer(index=1.444)
+
+        # HE(1, m) and EH(1, m) are degenerated at cutoff for SSIF
+        modes = [Mode(fam, nu, m)
+                 for fam, nus in (('LP', (0, 1, 2)), ('TE', (0,)),
+                                  ('TM', (0,)), ('HE', (2, 3)),
+                                  ('EH', (2, 3)))
+                 for nu in nus
+                 for m in (1, 2)]
+        self._compareCutoffs(modes)
+
+    def testTLSIF(self):
+        """Annular-core fiber."""
+        self.f.addLayer(radius=4e-6, index=1.43)
+        self.f.addLayer(radius=6e-6, index=1.47)
+        self.f.addLayer(index=1.44)
+
+        modes = [Mode(fam, nu, m)
+                 for fam, nus in (('LP', (0, 1, 2)), ('TE', (0,)),
+                                  ('TM', (0,)))
+                 for nu in nus
+                 for m in (1, 2)]
+        self._compareCutoffs(modes)
+
+        # tlsif cutoffs of hybrid modes are less accurate
+        modes = [Mode(fam, nu, m)
+                 for fam in ('HE', 'EH')
+                 for nu in (1, 2, 3)
+                 for m in (1, 2)]
+        self._compareCutoffs(modes, places=2)
+
+    def testFourLayers(self):
+        self.f.addLayer(radius=2e-6, index=1.474)
+        self.f.addLayer(radius=4e-6, index=1.444)
+        self.f.addLayer(radius=6e-6, index=1.46)
+        self.f.addLayer(index=1.444)
+        fiber = self.f[0]
+        self.assertIsInstance(fiber._cutoff, mlsif.Cutoff)
+
+        wl = Wavelength(1550e-9)
+        modes = {Mode('HE', 1, 1), Mode('TE', 0, 1), Mode('TM', 0, 1),
+                 Mode('HE', 2, 1), Mode('EH', 1, 1), Mode('HE', 3, 1),
+                 Mode('HE', 1, 2)}
+        self.assertEqual(fiber.findVmodes(wl), modes)
+
+        # Mode appears just above cutoff
+        mode = Mode('HE', 1, 2)
+        co = fiber.cutoff(mode)
+        self.assertLess(fiber.b(mode, fiber.toWl(co * 1.01), delta=1e-5),
+                        0.01)
+
+
+class TestMLSIFTransferMatrix(unittest.TestCase):
+
+    """Test suite for the transfer-matrix path of multilayer solvers."""
+
+    def setUp(self):
+        self.f = FiberFactory()
+        r = numpy.linspace(0.2, 8, 40)
+        self.f.addProfile(numpy.column_stack(
+            (r, 1.444 + 0.03 * (1 - (r / 8)**2))), unit=1e-6)
+        self.f.addLayer(index=1.444)
+
+    def testLayers(self):
+        fiber = self.f[0]
+        self.assertEqual(len(fiber), 40)
+        self.assertGreater(len(fiber) - 2, mlsif.Neff.TMATRIX_LAYERS)
+
+    def testCharEq(self):
+        """Transfer matrices give the same characteristic equations
+        as the layer by layer computation."""
+        fiber = self.f[0]
+        wl = Wavelength(1550e-9)
+        neffs = (1.4445, 1.452, 1.461, 1.469)
+        chareqs = {
+            'LP': lambda s, n: s._lpceq(n, wl, 1),
+            'TE': lambda s, n: s._teceq(n, wl, 0),
+            'TM': lambda s, n: s._tmceq(n, wl, 0),
+            'HE': lambda s, n: s._heceq(n, wl, 2),
+        }
+        slow = mlsif.Neff(fiber)
+        slow.TMATRIX_LAYERS = len(fiber)
+        for fam, ceq in chareqs.items():
+            fast = mlsif.Neff(fiber)
+            for neff in neffs:
+                a, b = ceq(fast, neff), ceq(slow, neff)
+                self.assertAlmostEqual(a / b, 1, places=9,
+                                       msg="{} {}".format(fam, neff))
+
+    def testStaircase(self):
+        """Staircase with tiny steps converges to the step-index fiber."""
+        f = FiberFactory()
+        f.addProfile([(r, 1.474 - 1e-9 * r) for r in range(1, 41)],
+                     unit=1e-7)
+        f.addLayer(index=1.444)
+        fiber = f[0]
+        self.assertIsInstance(fiber._neff, mlsif.Neff)
+
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(index=1.444)
+        ssif = f[0]
+
+        wl = Wavelength(1550e-9)
+        for mode in (Mode('HE', 1, 1), Mode('LP', 1, 1)):
+            self.assertAlmostEqual(fiber.neff(mode, wl, delta=1e-5),
+                                   ssif.neff(mode, wl, delta=1e-5),
+                                   places=6, msg=str(mode))
+
+
+class TestMLSIFSeeded(unittest.TestCase):
+
+    """Vector modes seeded by LP modes give the same results."""
+
+    def _fiber(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(radius=8e-6, index=1.454)
+        f.addLayer(radius=10e-6, index=1.449)
+        f.addLayer(index=1.444)
+        return f[0]
+
+    def testSeeded(self):
+        wl = Wavelength(1550e-9)
+        fiber = self._fiber()
+        seeded = self._fiber()
+        seeded._neff.LPSEED = True
+
+        # LP(1,2) is above LP(3,1), but HE(2,2) is the root
+        # below EH(2,1): seeds must not swap them.
+        self.assertGreater(fiber.neff(Mode('LP', 1, 2), wl, 1e-5),
+                           fiber.neff(Mode('LP', 3, 1), wl, 1e-5))
+        for mode in (Mode('HE', 1, 1), Mode('TE', 0, 1), Mode('TM', 0, 1),
+                     Mode('HE', 2, 1), Mode('EH', 2, 1), Mode('HE', 2, 2),
+                     Mode('EH', 1, 2), Mode('HE', 1, 3)):
+            self.assertAlmostEqual(seeded.neff(mode, wl, 1e-5),
+                                   fiber.neff(mode, wl, 1e-5),
+                                   places=10, msg=str(mode))
+
+
+class TestMLSIFThreads(unittest.TestCase):
+
+    """Characteristic equations and fields, evaluated from many threads
+    with the same solver, give the serial results."""
+
+    def testReentrant(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(radius=8e-6, index=1.454)
+        f.addLayer(radius=10e-6, index=1.449)
+        f.addLayer(index=1.444)
+        solver = f[0]._neff
+        wl = Wavelength(1550e-9)
+
+        def task(neff):
+            return (solver._heceq(neff, wl, 2),
+                    solver._tmceq(neff, wl, 0),
+                    solver._lpceq(neff, wl, 1),
+                    tuple(solver._hefield(wl, 2, neff, 5e-6)[0]))
+
+        neffs = numpy.linspace(1.4455, 1.4735, 50)
+        serial = [task(neff) for neff in neffs]
+        with ThreadPoolExecutor(4) as executor:
+            for _ in range(3):
+                self.assertEqual(list(executor.map(task, neffs)), serial)
+
+
+class TestMLSIFEvaluate(unittest.TestCase):
+
+    """Characteristic equations evaluated on arrays."""
+
+    def testEvaluate(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(radius=8e-6, index=1.454)
+        f.addLayer(index=1.444)
+        solver = f[0]._neff
+        wl = Wavelength(1550e-9)
+        neffs = numpy.linspace(1.4445, 1.4735, 101)
+
+        for fct, nu in ((solver._teceq, 0), (solver._tmceq, 0),
+                        (solver._heceq, 1), (solver._ehceq, 3),
+                        (solver._lpceq, 1)):
+            y = solver.evaluate(fct, neffs, wl, nu)
+            self.assertEqual(y.shape, neffs.shape)
+            for neff, v in zip(neffs, y):
+                self.assertAlmostEqual(v / fct(neff, wl, nu), 1,
+                                       places=9, msg=fct.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,7 +18,8 @@
 import unittest
 
 from fibermodes import Wavelength, Mode, FiberFactory
-from math import sqrt
+from math import sqrt, isfinite
+import numpy
 
 
 class TestSSIF(unittest.TestCase):
@@ -137,6 +138,26 @@ class TestSSIF(unittest.TestCase):
         lp01 = fiber.neff(Mode('LP', 0, 1), wl)
         self.assertAlmostEqual(lp01, neff, places=5)
 
+    def testHighOrderModes(self):
+        """Characteristic equations remain finite near cutoff of
+        high order modes, where kn(nu, w) overflows.
+
+        """
+        wl = Wavelength(1.55e-6)
+        f = FiberFactory()
+        f.addLayer(radius=100e-6, index=1.474)
+        f.addLayer(index=1.444)
+        fiber = f[0]
+        solver = fiber._neff
+
+        for neff in (1.444 + 1e-7, 1.444 + 1e-5, 1.46):
+            self.assertTrue(isfinite(solver._lpceq(neff, wl, 120)))
+            self.assertTrue(isfinite(solver._heceq(neff, wl, 120)))
+            self.assertTrue(isfinite(solver._ehceq(neff, wl, 120)))
+
+        self.assertAlmostEqual(fiber.neff(Mode('HE', 100, 1), wl),
+                               1.45020504527, 10)
+
     def testFindVmodes(self):
         f = FiberFactory()
         f.addLayer(radius=4.5e-6, index=1.448918)
@@ -232,5 +253,28 @@ class TestSSIF(unittest.TestCase):
             u = wl.k0 * rho * sqrt(n1**2 - neff**2)
             self.assertAlmostEqual(u, sols[m], 3)
 
+    def testEvaluate(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(index=1.444)
+        fiber = f[0]
+        wl = Wavelength(1550e-9)
+        solver = fiber._neff
+        neffs = numpy.linspace(1.4445, 1.4735, 101)
+        for fct, nu in ((solver._lpceq, 0), (solver._lpceq, 2),
+                        (solver._teceq, 0), (solver._tmceq, 0),
+                        (solver._heceq, 1), (solver._ehceq, 2)):
+            y = solver.evaluate(fct, neffs, wl, nu)
+            numpy.testing.assert_allclose(
+                y, [fct(neff, wl, nu) for neff in neffs],
+                rtol=1e-9, err_msg=fct.__name__)
+
+        solver = fiber._cutoff
+        V0 = numpy.linspace(0.5, 12, 47)
+        y = solver.evaluate(solver._cutoffHE, V0, 3)
+        numpy.testing.assert_allclose(
+            y, [solver._cutoffHE(v, 3) for v in V0], rtol=1e-9)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.fiber.solver.stats module."""
+
+import unittest
+import os.path
+import json
+import pickle
+import shutil
+import tempfile
+
+from fibermodes import FiberFactory, Mode, Wavelength, HE11
+from fibermodes.fiber.solver.stats import SolverStats
+
+
+class TestSolverStats(unittest.TestCase):
+
+    """Test suite for solver statistics."""
+
+    def setUp(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(radius=8e-6, index=1.454)
+        f.addLayer(index=1.444)
+        self.fiber = f[0]
+        self.wl = Wavelength(1550e-9)
+
+    def testDisabled(self):
+        self.assertIsNone(self.fiber.stats)
+        self.fiber.neff(HE11, self.wl, delta=1e-4)
+        self.fiber.cutoff(Mode('TE', 0, 1))
+
+    def testNeff(self):
+        stats = self.fiber.stats = SolverStats()
+        neff = self.fiber.neff(Mode('TE', 0, 1), self.wl, delta=1e-4)
+        self.assertEqual(self.fiber.neff(Mode('TE', 0, 1), self.wl), neff)
+        self.assertEqual(stats.caches['ne_cache'], [1, 1])
+
+        (key, record), = stats.records.items()
+        self.assertEqual(key, (None, 'mlsif.Neff', Mode('TE', 0, 1), self.wl))
+        self.assertEqual(record['calls'], 1)
+        self.assertGreater(record['steps'], 0)
+        self.assertGreater(record['brentq'], 0)
+        self.assertGreater(record['evaluations'],
+                           record['steps'] + record['brentq'])
+        self.assertGreater(record['time'], 0)
+
+    def testCutoffAndFields(self):
+        stats = self.fiber.stats = SolverStats(label='f')
+        self.fiber.cutoff(Mode('TE', 0, 1))
+        self.fiber.cutoff(Mode('TE', 0, 1))
+        self.fiber.cutoff(HE11)
+        self.assertEqual(stats.caches['co_cache'], [2, 1])
+        self.assertIn(('f', 'tlsif.Cutoff', Mode('TE', 0, 1), None),
+                      stats.records)
+
+        self.fiber.neff(HE11, self.wl, delta=1e-4)
+        self.fiber._rfield(HE11, self.wl, 1e-6)
+        self.fiber._rfield(HE11, self.wl, 1e-6)
+        self.assertEqual(stats.caches['fi_cache'], [1, 1])
+
+    def testBindAndSave(self):
+        stats = SolverStats()
+        self.fiber.stats = stats.bind(3)
+        self.fiber.neff(HE11, self.wl, delta=1e-4)
+        self.fiber.neff(Mode('LP', 0, 1), self.wl, delta=1e-4)
+        self.assertEqual(len(stats.records), 2)
+        self.assertEqual(set(stats.totals('fiber')), {3})
+        self.assertEqual(stats.totals('fiber')[3]['calls'], 2)
+
+        stats = pickle.loads(pickle.dumps(stats))
+        path = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(path, 'stats.json')
+            stats.save(filename)
+            with open(filename) as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(path)
+        self.assertEqual(sorted(row['mode'] for row in data['records']),
+                         [str(HE11), str(Mode('LP', 0, 1))])
+        self.assertEqual(data['caches']['ne_cache'], {'hits': 0, 'misses': 2})
+
+        stats.reset()
+        self.assertEqual(stats.records, {})
+        self.assertEqual(stats.caches['ne_cache'], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
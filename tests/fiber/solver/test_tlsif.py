@@ -19,6 +19,7 @@ import unittest
 
 from fibermodes import FiberFactory, Mode, Wavelength
 from math import sqrt
+import numpy
 
 
 class TestTLSIF(unittest.TestCase):
@@ -586,5 +587,23 @@ class TestTLSIF(unittest.TestCase):
         # self.assertGreater(D, 15)
         # self.assertLess(D, 30)
 
+    def testEvaluateCutoff(self):
+        V0 = numpy.linspace(0.1, 20, 61)
+        for n in ((1.474, 1.454, 1.444), (1.444, 1.474, 1.454)):
+            f = FiberFactory()
+            f.addLayer(radius=2e-6, index=n[0])
+            f.addLayer(radius=6e-6, index=n[1])
+            f.addLayer(index=n[2])
+            solver = f[0]._cutoff
+            for fct in (solver._lpcoeq, solver._tecoeq, solver._tmcoeq,
+                        solver._ehcoeq, solver._hecoeq):
+                for nu in (1, 2):
+                    y = solver.evaluate(fct, V0, nu)
+                    with numpy.errstate(all='ignore'):
+                        z = [fct(v, nu) for v in V0]
+                    numpy.testing.assert_allclose(y, z, rtol=1e-9,
+                                                  err_msg=fct.__name__)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,173 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.fiber.cachemanager module."""
+
+import unittest
+import gc
+import shutil
+import sys
+import tempfile
+import threading
+
+from fibermodes import FiberFactory, Wavelength, HE11, Mode
+from fibermodes.fiber import cachemanager
+from fibermodes.fiber.cachemanager import CacheManager
+from fibermodes.fiber.modecache import ModeCache
+from fibermodes.simulator import Simulator
+from fibermodes.simulator.store import ResultStore
+
+
+class TestCacheManager(unittest.TestCase):
+
+    """Test suite for the memory budget of fiber caches."""
+
+    def setUp(self):
+        self._manager = cachemanager.manager
+        cachemanager.manager = CacheManager()
+        f = FiberFactory()
+        f.addLayer(radius=[4e-6, 5e-6, 6e-6], index=1.474)
+        f.addLayer(index=1.444)
+        self.factory = f
+        self.wl = Wavelength(1550e-9)
+
+    def tearDown(self):
+        cachemanager.manager = self._manager
+
+    def testUsage(self):
+        manager = cachemanager.manager
+        fiber = self.factory[0]
+        fiber.neff(HE11, self.wl, delta=1e-4)
+        used = manager.used
+        self.assertGreater(used, 0)
+        fiber.set_ne_cache(self.wl, HE11, 1.46)  # no new cell
+        self.assertEqual(manager.used, used)
+        fiber.cutoff(Mode('TE', 0, 1))
+        usage = manager.usage()
+        self.assertEqual(usage['used'], used + ModeCache.ITEMSIZE)
+        self.assertEqual(usage['fibers'], 1)
+        self.assertIsNone(usage['budget'])
+
+        fiber._rfield(HE11, self.wl, 1e-6)
+        self.assertGreater(manager.used, used + ModeCache.ITEMSIZE)
+
+        fiber.clearCaches()
+        self.assertEqual(manager.usage()['used'], 0)
+        self.assertEqual(fiber.ne_cache, {})
+        self.assertEqual(fiber.fi_cache, {})
+        self.assertEqual(fiber.cutoff(HE11), 0)
+
+        fiber.neff(HE11, self.wl, delta=1e-4)
+        del fiber
+        gc.collect()
+        self.assertEqual(manager.usage(),
+                         {'budget': None, 'used': 0,
+                          'peak': manager.peak, 'fibers': 0,
+                          'evictions': 0, 'spills': 0})
+
+    def testEviction(self):
+        manager = cachemanager.manager
+        fibers = list(self.factory)
+        fibers[0].neff(HE11, self.wl, delta=1e-4)
+        manager.budget = 3 * manager.used
+        fibers[1].neff(HE11, self.wl, delta=1e-4)
+        fibers[2].neff(HE11, self.wl, delta=1e-4)
+        self.assertEqual(manager.evictions, 0)
+
+        fibers[0].cutoff(Mode('TE', 0, 1))  # Least recently used: 1
+        self.assertEqual(manager.evictions, 1)
+        self.assertEqual(fibers[1].ne_cache, {})
+        self.assertIn(HE11, fibers[0].ne_cache[self.wl])
+        self.assertIn(HE11, fibers[2].ne_cache[self.wl])
+        self.assertLessEqual(manager.used, manager.budget)
+        self.assertEqual(manager.spills, 0)
+
+    def testEvictionWhileStoring(self):
+        fiber = self.factory[0]
+        modes = [Mode('LP', nu, 1) for nu in range(20)]
+        errors = []
+
+        def fill():
+            try:
+                for k in range(2000):
+                    wl = 1500e-9 + k * 1e-12
+                    for mode in modes:
+                        fiber.set_ne_cache(wl, mode, 1.45)
+                        try:
+                            self.assertEqual(
+                                fiber.ne_cache.lookup(wl, mode), 1.45)
+                        except KeyError:
+                            pass  # evicted meanwhile
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            thread = threading.Thread(target=fill)
+            thread.start()
+            while thread.is_alive():
+                try:
+                    fiber.clearCaches()  # as done by CacheManager._evict
+                except Exception as e:
+                    errors.append(e)
+            thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+
+    def testSimulatorResults(self):
+        manager = cachemanager.manager
+        sim = Simulator(self.factory, [1550e-9, 1600e-9], delta=1e-4)
+        sim.compute('modes', 0)
+        used = manager.used
+        sim.compute('neff', 0)
+        self.assertGreater(manager.used, used)
+        self.assertIn(0, sim._fsims._cache)
+
+        # Without store, results are dropped with the caches
+        manager.budget = manager.used
+        neff1 = sim.compute('neff', 1)
+        self.assertEqual(manager.evictions, 1)
+        self.assertEqual(manager.spills, 0)
+        self.assertNotIn(0, sim._fsims._cache)
+        self.assertEqual(sim.compute('neff', 1), neff1)
+
+    def testSpill(self):
+        manager = cachemanager.manager
+        path = tempfile.mkdtemp()
+        try:
+            store = ResultStore(path)
+            sim = Simulator(self.factory, [1550e-9, 1600e-9], delta=1e-4,
+                            store=store)
+            neff0 = sim.compute('neff', 0)
+            fiber = sim.fibers[0]
+            manager.budget = manager.used
+            sim.compute('neff', 1)
+            self.assertEqual(manager.spills, 1)
+            self.assertEqual(fiber.ne_cache, {})
+            self.assertNotIn(0, sim._fsims._cache)
+            for wl, values in zip(sim.wavelengths, neff0):
+                self.assertEqual(store.get(0, 'neff')[float(wl)],
+                                 {m: v for m, v in values.items()})
+
+            # Results come back from the store
+            self.assertEqual(sim.compute('neff', 0), neff0)
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,7 @@
 
 import unittest
 import os.path
+import io
 
 from fibermodes import FiberFactory
 
@@ -61,6 +62,15 @@ class TestFiberFactory(unittest.TestCase):
                                   'num': 5}
         self.assertEqual(len(f), 15)
 
+        layer = f.layers[1]
+        layer["mparams"][0] = [1.444, 1.445]
+        self.assertEqual(len(f), 30)
+        f.addLayer(index=1.4, mparams=[], radius=[1, 2])
+        self.assertEqual(len(f), 60)
+        f.removeLayer()
+        self.assertEqual(len(f), 30)
+        self.assertIs(f.axes, f.axes)  # cached until modified
+
     def testDefaultLayerAttributes(self):
         f = FiberFactory()
         f.addLayer()
@@ -107,6 +117,91 @@ class TestFiberFactory(unittest.TestCase):
             self.assertEqual(fiber.outerRadius(0), f.layers[0].radius[i])
             self.assertEqual(f[i].outerRadius(0), f.layers[0].radius[i])
 
+    def testFactoryRandomAccess(self):
+        f = FiberFactory()
+        f.addLayer(radius=[2e-6, 3e-6, 4e-6], index=[1.454, 1.464])
+        f.addLayer(radius=[6e-6, 7e-6], index=1.444)
+        f.addLayer(index=1.44)
+
+        fibers = list(f)
+        self.assertEqual(len(fibers), 12)
+        for i in (0, 5, 11, -1):
+            self.assertEqual(f[i].outerRadius(0), fibers[i].outerRadius(0))
+            self.assertEqual(f[i].outerRadius(1), fibers[i].outerRadius(1))
+            self.assertEqual(f[i].maxIndex(0, 1550e-9),
+                             fibers[i].maxIndex(0, 1550e-9))
+        with self.assertRaises(IndexError):
+            f[12]
+
+        f.layers[0].radius = [2e-6, 3e-6]
+        self.assertEqual(len(f), 8)
+        self.assertEqual(f.axes[0].size, 2)
+
+    def testFingerprint(self):
+        f = FiberFactory()
+        f.addLayer(radius=[2e-6, 3e-6], index=1.454)
+        f.addLayer(radius=6e-6, index=1.444)
+        f.addLayer(index=1.44)
+        self.assertEqual(f[1].fingerprint, f.fingerprint(1))
+        self.assertEqual(f.fingerprint(-1), f.fingerprint(1))
+        self.assertNotEqual(f.fingerprint(0), f.fingerprint(1))
+        with self.assertRaises(IndexError):
+            f.fingerprint(2)
+
+        g = FiberFactory()
+        g.addLayer(name="core", radius=[1e-6, 2e-6, 2.5e-6, 3e-6],
+                   index=1.454)
+        g.addLayer(radius=6e-6, index=1.444)
+        g.addLayer(index=1.44)
+        self.assertEqual(g.fingerprint(1), f.fingerprint(0))
+        self.assertEqual(g.fingerprint(3), f.fingerprint(1))
+
+    def testFactoryView(self):
+        f = FiberFactory()
+        f.addLayer(radius=[2e-6, 3e-6, 4e-6], index=[1.454, 1.464])
+        f.addLayer(radius=[6e-6, 7e-6], index=1.444)
+        f.addLayer(index=1.44)
+
+        v = f.select((0, 'tparams', 0), 1)
+        self.assertEqual(len(v), 4)
+        for i, fiber in enumerate(v):
+            self.assertEqual(fiber.outerRadius(0), 3e-6)
+            self.assertEqual(f[v.index(i)].outerRadius(1),
+                             fiber.outerRadius(1))
+
+        v = v.select(2, slice(1, None))
+        self.assertEqual(len(v), 2)
+        self.assertEqual(v[0].outerRadius(1), 7e-6)
+
+        s = f[2:10:3]
+        self.assertEqual(len(s), 3)
+        self.assertEqual(s.index(2), 8)
+        with self.assertRaises(ValueError):
+            s.select(0, 0)
+
+    def testAddProfile(self):
+        f = FiberFactory()
+        profile = io.StringIO("# r (um), n\n"
+                              "0.5, 1.470\n"
+                              "1.0, 1.465\n"
+                              "1.5, 1.460\n")
+        self.assertEqual(f.addProfile(profile, name="core", unit=1e-6,
+                                      delimiter=","), 3)
+        f.addLayer(name="cladding", index=1.444)
+
+        self.assertEqual(len(f.layers), 4)
+        self.assertEqual(f.layers[1].name, "core1")
+        self.assertEqual(f.layers[2].radius, 1.5e-6)
+        self.assertEqual(f.layers[2].mparams[0], 1.460)
+        fiber = f[0]
+        self.assertEqual(len(fiber), 4)
+        self.assertEqual(fiber.outerRadius(1), 1e-6)
+
+        f.addProfile([(0.1e-6, 1.48)], pos=0)
+        self.assertEqual(f.layers[0].radius, 0.1e-6)
+        with self.assertRaises(ValueError):
+            f.addProfile([(1e-6, 1.47), (0.5e-6, 1.46)])
+
     def testFactoryLayerSetMaterial(self):
         f = FiberFactory(os.path.join(__dir__, 'smf28.fiber'))
         f.layers[1].material = "Silica"
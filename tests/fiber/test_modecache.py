@@ -0,0 +1,129 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.fiber.modecache module."""
+
+import unittest
+import pickle
+from math import isnan
+import numpy
+
+from fibermodes import Mode, HE11, LP01
+from fibermodes.fiber.modecache import ModeRegistry, ModeCache, ModeValues
+
+
+class TestModeCache(unittest.TestCase):
+
+    """Test suite for array-backed mode caches."""
+
+    def setUp(self):
+        self.cache = ModeCache()
+        self.cache.store(1550e-9, HE11, 1.45)
+        self.cache.store(1550e-9, Mode('TE', 0, 1), float("nan"))
+        self.cache.store(1300e-9, HE11, 1.46)
+
+    def testRegistry(self):
+        registry = ModeRegistry()
+        self.assertIsNone(registry.column(HE11))
+        self.assertEqual(registry.register(HE11), 0)
+        self.assertEqual(registry.register(LP01), 1)
+        self.assertEqual(registry.register(Mode('HE', 1, 1)), 0)
+        self.assertEqual(registry.column(LP01), 1)
+        self.assertEqual(registry.modes, [HE11, LP01])
+
+    def testLookup(self):
+        cache = self.cache
+        self.assertEqual(cache.lookup(1550e-9, HE11), 1.45)
+        self.assertTrue(isnan(cache.lookup(1550e-9, Mode('TE', 0, 1))))
+        with self.assertRaises(KeyError):
+            cache.lookup(1300e-9, Mode('TE', 0, 1))
+        with self.assertRaises(KeyError):
+            cache.lookup(1550e-9, LP01)
+        with self.assertRaises(KeyError):
+            cache.lookup(1600e-9, HE11)
+        self.assertTrue(cache.known(1300e-9, HE11))
+        self.assertFalse(cache.known(1300e-9, LP01))
+
+    def testDictInterface(self):
+        cache = self.cache
+        self.assertEqual(len(cache), 2)
+        self.assertIn(1300e-9, cache)
+        self.assertNotIn(1600e-9, cache)
+        self.assertEqual(cache[1550e-9][HE11], 1.45)
+        self.assertEqual(dict(cache[1300e-9]), {HE11: 1.46})
+        self.assertEqual(cache.get(1600e-9, {}), {})
+
+        cache[1550e-9][LP01] = 1.449
+        self.assertEqual(cache.lookup(1550e-9, LP01), 1.449)
+        self.assertEqual(len(cache[1550e-9]), 3)
+        del cache[1550e-9][Mode('TE', 0, 1)]
+        self.assertEqual(set(cache[1550e-9]), {HE11, LP01})
+
+        cache.setdefault(1600e-9, {})[HE11] = 1.44
+        cache[1000e-9] = {LP01: 1.47}
+        self.assertEqual(cache, {1550e-9: {HE11: 1.45, LP01: 1.449},
+                                 1300e-9: {HE11: 1.46},
+                                 1600e-9: {HE11: 1.44},
+                                 1000e-9: {LP01: 1.47}})
+        del cache[1300e-9]
+        self.assertNotIn(1300e-9, cache)
+        cache.clear()
+        self.assertEqual(cache, {})
+        self.assertEqual(len(cache.registry), 3)
+
+    def testGrid(self):
+        cache = self.cache
+        wavelengths = [1300e-9, 1400e-9, 1550e-9]
+        cache.setGrid(wavelengths)
+        self.assertEqual(cache._wavelengths[:3], wavelengths)
+        self.assertEqual(cache.lookup(1550e-9, HE11), 1.45)
+        self.assertEqual(cache.lookup(1300e-9, HE11), 1.46)
+
+        a = cache.array([HE11, LP01], len(wavelengths))
+        self.assertEqual(a.shape, (3, 2))
+        self.assertEqual(a[0, 0], 1.46)
+        self.assertEqual(a[2, 0], 1.45)
+        self.assertTrue(isnan(a[1, 0]))
+        self.assertTrue(numpy.isnan(a[:, 1]).all())
+
+        self.assertEqual(cache.lookupRow(0, HE11), 1.46)
+        self.assertEqual(cache.lookupRow(2, HE11), 1.45)
+        with self.assertRaises(KeyError):
+            cache.lookupRow(1, HE11)
+        with self.assertRaises(KeyError):
+            cache.lookupRow(2, LP01)
+
+        rows = cache._values
+        cache.setGrid(wavelengths)  # same grid: rows are not moved
+        self.assertIs(cache._values, rows)
+
+    def testSharedRegistry(self):
+        cache = self.cache
+        values = ModeValues(ModeCache(cache.registry))
+        values[LP01] = 0
+        self.assertEqual(values[LP01], 0)
+        self.assertEqual(cache.registry.column(LP01), 2)
+        self.assertNotIn(LP01, cache[1550e-9])
+
+    def testPickle(self):
+        cache = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual(cache[1300e-9], self.cache[1300e-9])
+        self.assertEqual(set(cache[1550e-9]), set(self.cache[1550e-9]))
+        cache.store(1550e-9, LP01, 1.449)
+        self.assertEqual(cache.lookup(1550e-9, LP01), 1.449)
+
+
+if __name__ == "__main__":
+    unittest.main()
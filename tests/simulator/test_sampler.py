@@ -0,0 +1,78 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.simulator.sampler module"""
+
+import unittest
+import numpy
+
+from fibermodes import FiberFactory, Mode, HE11, WavelengthGrid
+from fibermodes.simulator import Simulator, AdaptiveSampler
+
+
+class TestAdaptiveSampler(unittest.TestCase):
+
+    """Test suite for adaptive wavelength sampling."""
+
+    def setUp(self):
+        f = FiberFactory()
+        f.addLayer(radius=4.5e-6, index=1.449)
+        f.addLayer(index=1.444)
+        self.sim = Simulator(f, {'start': 1000e-9, 'end': 1700e-9,
+                                 'num': 5}, delta=1e-5)
+        self.fiber = self.sim.fibers[0]
+
+    def testAccuracy(self):
+        tol = 1e-6
+        wls, values = self.sim.sample('neff', 0, tol=tol)
+        self.assertIsInstance(wls, WavelengthGrid)
+        self.assertEqual(len(wls), len(values))
+        self.assertEqual(wls[0], 1000e-9)
+        self.assertEqual(wls[-1], 1700e-9)
+        self.assertLess(len(wls), 100)
+
+        x = wls.wavelength
+        y = numpy.array([v[HE11] for v in values])
+        for wl in numpy.linspace(1001e-9, 1699e-9, 15):
+            neff = self.fiber.neff(HE11, wl, delta=1e-5)
+            self.assertLess(abs(numpy.interp(wl, x, y) - neff), tol)
+
+    def testCutoff(self):
+        minstep = 1e-10
+        wls, values = self.sim.sample('neff', 0, minstep=minstep)
+        te01 = Mode('TE', 0, 1)
+        guided = [te01 in v for v in values]
+        self.assertTrue(guided[0])
+        self.assertFalse(guided[-1])
+        i = guided.index(False)
+        self.assertLess(wls[i] - wls[i-1], 2 * minstep)
+        self.assertTrue(wls[i-1] <= self.fiber.cutoffWl(te01) <= wls[i])
+
+    def testMaxPoints(self):
+        sampler = AdaptiveSampler(self.fiber, 'ng', tol=1e-9, maxpoints=12)
+        wls, values = sampler.sample([1000e-9, 1300e-9, 1700e-9])
+        self.assertEqual(len(wls), 12)
+        self.assertIn(HE11, values[-1])
+
+    def testGridKept(self):
+        self.sim.compute('neff', 0)
+        cache = self.fiber.ne_cache
+        grid = cache._wavelengths[:len(self.sim.wavelengths)]
+        self.sim.sample('neff', 0, maxpoints=20)
+        self.assertEqual(cache._wavelengths[:len(grid)], grid)
+
+
+if __name__ == "__main__":
+    unittest.main()
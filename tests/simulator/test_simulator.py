@@ -17,8 +17,9 @@
 
 import unittest
 import os.path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from fibermodes import FiberFactory, Mode, ModeFamily, HE11
+from fibermodes import FiberFactory, Mode, ModeFamily, HE11, WavelengthGrid
 from fibermodes.simulator import Simulator
 
 __dir__, _ = os.path.split(__file__)
@@ -62,6 +63,10 @@ class TestSimulator(unittest.TestCase):
                              'num': 4})
         self.assertEqual(len(sim.wavelengths), 4)
 
+        sim.set_wavelengths(WavelengthGrid([1560e-9, 1550e-9]))
+        self.assertIsInstance(sim.wavelengths, WavelengthGrid)
+        self.assertEqual(list(sim.wavelengths), [1550e-9, 1560e-9])
+
         with self.assertRaises(ValueError):
             sim.fibers
         self.assertFalse(sim.initialized)
@@ -105,6 +110,18 @@ class TestSimulator(unittest.TestCase):
             self.assertEqual(len(fmodes), 1)
             self.assertEqual(len(fmodes[0]), n)
 
+    def testModesWavelengths(self):
+        f = FiberFactory()
+        f.addLayer(radius=[4e-6, 5e-6], index=1.474)
+        f.addLayer(radius=6e-6, index=1.444)
+        f.addLayer(index=1.449)
+        wavelengths = [1300e-9, 1550e-9, 1400e-9]
+        sim = self.Simulator(f, wavelengths)
+        self.assertEqual(list(sim.wavelengths), sorted(wavelengths))
+        for fiber, fmodes in zip(sim.fibers, sim.modes()):
+            for wl, modes in zip(sim.wavelengths, fmodes):
+                self.assertEqual(modes, fiber.findVmodes(wl))
+
     def testCutoff(self):
         sim = self.Simulator(
             os.path.join(__dir__, '..', 'fiber', 'rcfs.fiber'), 1550e-9)
@@ -121,6 +138,108 @@ class TestSimulator(unittest.TestCase):
         neff = list(sim.neff())
         self.assertEqual(len(neff), 1)
         self.assertAlmostEqual(neff[0][0][Mode('HE', 1, 1)], 1.446386514937099)
+        grid = sim.fibers[0].ne_cache.array([HE11], len(sim.wavelengths))
+        self.assertEqual(grid[0, 0], neff[0][0][HE11])
+
+    def testExecutor(self):
+        f = FiberFactory()
+        f.addLayer(radius=4e-6, index=1.474)
+        f.addLayer(radius=6e-6, index=1.444)
+        f.addLayer(index=1.449)
+        wavelengths = [1550e-9, 1300e-9]
+        sim = self.Simulator(f, wavelengths, scalar=True, delta=1e-5)
+        neff = list(sim.neff())
+
+        for Executor in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with Executor(2) as executor:
+                sim = self.Simulator(f, wavelengths, scalar=True, delta=1e-5,
+                                     executor=executor)
+                self.assertEqual(list(sim.neff()), neff)
+
+        with self.Simulator(f, wavelengths, scalar=True, delta=1e-5,
+                            executor=2) as sim:
+            executor = sim.executor
+            self.assertIsInstance(executor, ThreadPoolExecutor)
+            self.assertEqual(list(sim.neff()), neff)
+            self.Simulator(clone=sim).close()  # executor owned by sim
+            executor.submit(int).result()
+        self.assertIsNone(sim.executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(int)
+
+    def testStats(self):
+        f = FiberFactory()
+        f.addLayer(radius=[4e-6, 5e-6, 6e-6], index=1.449)
+        f.addLayer(index=1.444)
+        sim = self.Simulator(f, 1550e-9, delta=1e-4, stats=True)
+        self.assertIsNone(sim.fibers[0].stats)
+        list(sim.neff())
+        totals = sim.stats.totals('fiber')
+        self.assertEqual(sorted(totals), list(range(3)))
+        for t in totals.values():
+            self.assertGreater(t['evaluations'], 0)
+        self.assertGreater(sim.stats.caches['ne_cache'][1], 0)
+
+    def testCompute(self):
+        f = FiberFactory()
+        f.addLayer(radius=[4e-6, 5e-6], index=1.474)
+        f.addLayer(radius=6e-6, index=1.444)
+        f.addLayer(index=1.449)
+        wavelengths = [1300e-9, 1550e-9]
+        sim = self.Simulator(f, wavelengths, delta=1e-4)
+        with self.assertRaises(ValueError):
+            self.Simulator().compute('neff', 0, 0)
+
+        neff = sim.compute('neff', 1, 1)
+        self.assertEqual(set(neff), sim.compute('modes', 1, 1))
+        self.assertEqual(sim.compute('modes', 1), list(sim.modes())[1])
+        self.assertEqual(sim.compute('cutoff', 1, 1)[HE11], 0)
+        self.assertEqual(len(sim.compute('beta1', 0)), 2)
+
+        # Same values when iterating
+        fiber = sim.fibers[1]
+        fiber.ne_cache.clear()
+        self.assertEqual(list(sim.neff())[1][1], neff)
+        self.assertNotIn(sim.wavelengths[1], fiber.ne_cache)
+
+    def testSetFactoryKeepsResults(self):
+        f = FiberFactory()
+        f.addLayer(radius=[4e-6, 5e-6], index=1.474)
+        f.addLayer(index=1.444)
+        sim = self.Simulator(f, 1550e-9, delta=1e-4)
+        neff = list(sim.neff())
+        fiber = sim.fibers[1]
+
+        f = FiberFactory()
+        f.addLayer(radius=[4.5e-6, 5e-6, 6e-6], index=1.474)
+        f.addLayer(index=1.444)
+        self.assertEqual(sim.set_factory(f), {1: 1})
+        self.assertIs(sim.fibers[1], fiber)
+        fiber.ne_cache.clear()  # values come from the fiber simulator
+        newneff = list(sim.neff())
+        self.assertEqual(newneff[1], neff[1])
+        self.assertEqual(fiber.ne_cache, {})
+        self.assertEqual(len(sim.fibers[0].ne_cache), 1)
+
+        # Fibers are matched even if they are not in memory,
+        # and when the same factory is modified
+        sim.clear_caches()
+        f.layers[0].radius = [4e-6, 4.5e-6, 5e-6]
+        self.assertEqual(sim.set_factory(f), {0: 1, 1: 2})
+
+    def testCacheSize(self):
+        f = FiberFactory()
+        f.addLayer(radius={'start': 4e-6, 'end': 5e-6, 'num': 10},
+                   index=1.474)
+        f.addLayer(index=1.444)
+        sim = self.Simulator(f, 1550e-9, cachesize=3)
+        self.assertEqual(len(sim.fibers), 10)
+        self.assertTrue(sim.fibers[-1] is sim.fibers[9])
+
+        co = list(sim.cutoff())
+        self.assertEqual(len(co), 10)
+        self.assertLessEqual(len(sim.fibers._cache), 3)
+        self.assertLessEqual(len(sim._fsims._cache), 3)
 
 if __name__ == "__main__":
     unittest.main()
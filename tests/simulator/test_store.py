@@ -0,0 +1,115 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.simulator.store module"""
+
+import unittest
+import shutil
+import tempfile
+
+from fibermodes import FiberFactory, Mode, HE11
+from fibermodes.simulator import Simulator, ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+
+    """Test suite for ResultStore class"""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+        self.factory = FiberFactory()
+        self.factory.addLayer(radius=[4e-6, 4.5e-6], index=1.474)
+        self.factory.addLayer(index=1.444)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def testPutGet(self):
+        store = ResultStore(self.path)
+        store.put(0, 'neff', 1550e-9, {HE11: 1.45})
+        store.putModes(1, 'modes', 1550e-9, set())
+        store.flush()
+
+        store = ResultStore(self.path)
+        self.assertEqual(store.get(0, 'neff'), {1550e-9: {HE11: 1.45}})
+        self.assertEqual(store.getModes(1, 'modes'), {1550e-9: set()})
+        self.assertEqual(store.quantities(0), ['neff'])
+        self.assertEqual(store.quantities(1), [])
+
+    def testCompact(self):
+        store = ResultStore(self.path)
+        store.put(0, 'neff', 1550e-9, {HE11: 1.45})
+        store.flush()
+        store.put(0, 'neff', 1560e-9, {HE11: 1.44})
+        store.compact()
+        self.assertEqual(len(store._chunks()), 1)
+
+        store = ResultStore(self.path)
+        self.assertEqual(len(store), 2)
+
+    def testResume(self):
+        sim = Simulator(self.factory, [1550e-9, 1560e-9], store=self.path)
+        neff = list(sim.neff())
+
+        sim = Simulator(self.factory, [1550e-9, 1560e-9], store=self.path)
+        for fiber in sim.fibers:
+            fiber._neff = None  # Would fail if neff was computed again
+        self.assertEqual(list(sim.neff()), neff)
+
+    def testAddWavelength(self):
+        sim = Simulator(self.factory, [1550e-9], store=self.path)
+        neff = list(sim.neff())
+
+        sim = Simulator(self.factory, [1530e-9, 1550e-9], store=self.path)
+        neff2 = list(sim.neff())
+        for n1, n2 in zip(neff, neff2):
+            self.assertEqual(n1[0], n2[1])
+        self.assertTrue(Mode('TE', 0, 1) in neff2[1][0])
+
+    def testDifferentFactory(self):
+        Simulator(self.factory, 1550e-9, store=self.path)
+
+        factory = FiberFactory()
+        factory.addLayer(radius=4e-6, index=1.474)
+        factory.addLayer(index=1.444)
+        with self.assertRaises(ValueError):
+            Simulator(factory, 1550e-9, store=self.path)
+
+    def testSetFactory(self):
+        sim = Simulator(self.factory, 1550e-9, store=self.path)
+        neff = list(sim.neff())
+
+        factory = FiberFactory()
+        factory.addLayer(radius=[4.5e-6, 5e-6], index=1.474)
+        factory.addLayer(index=1.444)
+        sim.clear_caches()
+        self.assertEqual(sim.set_factory(factory), {1: 0})
+        self.assertEqual(sim.store.get(0, 'neff'), {1550e-9: neff[1][0]})
+        self.assertEqual(sim.store.get(1, 'neff'), {})
+
+        sim = Simulator(factory, 1550e-9, store=self.path)
+        sim.fibers[0]._neff = None  # Would fail if neff was computed again
+        self.assertEqual(list(sim.neff())[0], neff[1])
+
+    def testDifferentDelta(self):
+        Simulator(self.factory, 1550e-9, delta=1e-6, store=self.path)
+        with self.assertRaises(ValueError):
+            Simulator(self.factory, 1550e-9, delta=1e-4, store=self.path)
+        self.assertEqual(ResultStore(self.path).delta, 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
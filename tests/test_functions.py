@@ -17,6 +17,8 @@
 """Test suite for fibermodes.functions module"""
 
 import unittest
+import numpy
+from scipy.special import iv, ivp, kn, kvp
 
 from fibermodes import functions
 
@@ -62,5 +64,45 @@ class TestFunctions(unittest.TestCase):
                             msg="x={}, k={}, m={}, j={}".format(x, k, m, j))
                     # print(k, m, j, minerr, maxerr)
 
+    def testBesselRatios(self):
+        for nu in (0, 1, 2, 5, 50):
+            for x in (0.01, 0.5, 3, 40):
+                self.assertAlmostEqual(
+                    functions.ivr(nu, x) / (ivp(nu, x) / iv(nu, x)), 1)
+                self.assertAlmostEqual(
+                    functions.kvr(nu, x) / (kvp(nu, x) / kn(nu, x)), 1)
+                self.assertAlmostEqual(
+                    functions.iratio(nu, x, 2 * x) /
+                    (iv(nu, x) / iv(nu, 2 * x)), 1)
+                self.assertAlmostEqual(
+                    functions.kratio(nu, x, 2 * x) /
+                    (kn(nu, x) / kn(nu, 2 * x)), 1)
+
+    def testBesselRatiosLimits(self):
+        # iv and kn overflow or underflow, but not the ratios
+        x = numpy.array((0.5, 3, 1000))
+        for nu in (1, 300):
+            ir = functions.ivr(nu, x)
+            kr = functions.kvr(nu, x)
+            self.assertTrue(numpy.all(numpy.isfinite(ir)))
+            self.assertTrue(numpy.all(numpy.isfinite(kr)))
+            for i, xi in enumerate(x):
+                self.assertAlmostEqual(functions.ivr(nu, xi), ir[i])
+                self.assertAlmostEqual(functions.kvr(nu, xi), kr[i])
+
+        # nu >> x: I'/I ~ nu/x + x/(2(nu+1)), K'/K ~ -nu/x - x/(2(nu-1))
+        self.assertAlmostEqual(functions.ivr(300, 0.5) - 600, 0.5 / 602, 8)
+        self.assertAlmostEqual(functions.kvr(300, 0.5) + 600, -0.5 / 598, 8)
+        # x >> nu: I'/I ~ 1 - 1/(2x), K'/K ~ -1 - 1/(2x)
+        self.assertAlmostEqual(functions.ivr(1, 1000), 1 - 1 / 2000, 6)
+        self.assertAlmostEqual(functions.kvr(1, 1000), -1 - 1 / 2000, 6)
+        self.assertAlmostEqual(functions.iratio(1, 1000, 1001),
+                               numpy.exp(-1), 3)
+
+        # x = 0: I'_0(0) / I_0(0) = 0
+        self.assertEqual(functions.ivr(0, 0.0), 0)
+        self.assertEqual(functions.ivr(0, numpy.array([0., 1.]))[0], 0)
+        self.assertEqual(functions.ivr(1, 0.0), numpy.inf)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,96 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for the import of the fibermodes package.
+
+Each test runs in a new interpreter, to measure a cold import.
+
+"""
+
+import unittest
+import os
+import os.path
+import subprocess
+import sys
+
+_root = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(_root))
+    return subprocess.check_output([sys.executable, '-c', code],
+                                   env=env, universal_newlines=True)
+
+
+class TestImport(unittest.TestCase):
+
+    """Test suite for the lazy imports of fibermodes."""
+
+    #: Time budget (in seconds) to import fibermodes, FiberFactory and
+    #: Simulator, numpy being already loaded. On slow machines, the
+    #: budget is the time to import numpy, whichever is larger.
+    BUDGET = 0.25
+
+    #: Number of cold imports; the fastest one is compared to the budget.
+    RUNS = 5
+
+    #: Modules that should only be loaded when solving.
+    HEAVY = ('scipy', 'multiprocessing', 'distutils',
+             'fibermodes.fiber.solver.solver',
+             'fibermodes.fiber.geometry.stepindex')
+
+    def testLazyModules(self):
+        out = _run("import sys, fibermodes\n"
+                   "f = fibermodes.FiberFactory()\n"
+                   "f.addLayer(radius=4e-6, index=1.474)\n"
+                   "f.addLayer(index=1.444)\n"
+                   "f.loads(f.dumps())\n"
+                   "print(len(f))\n"
+                   "print(' '.join(sorted(sys.modules)))\n")
+        n, modules = out.splitlines()
+        self.assertEqual(n, '1')
+        modules = modules.split()
+        for name in self.HEAVY:
+            self.assertNotIn(name, modules)
+
+    def testLazyAttributes(self):
+        out = _run("from fibermodes import *\n"
+                   "from fibermodes.fiber import geometry, solver\n"
+                   "from fibermodes.simulator import PSimulator\n"
+                   "print(PSimulator.__name__, Simulator.__name__,\n"
+                   "      geometry.StepIndex.__name__,\n"
+                   "      solver.FiberSolver.__name__, solver.fdm.__name__)\n")
+        self.assertEqual(out.split(), ['PSimulator', 'Simulator',
+                                       'StepIndex', 'FiberSolver',
+                                       'fibermodes.fiber.solver.fdm'])
+        with self.assertRaises(subprocess.CalledProcessError):
+            _run("from fibermodes import Nothing")
+
+
+    def testImportTime(self):
+        code = ("from time import perf_counter\n"
+                "t = perf_counter()\n"
+                "import numpy\n"
+                "t1 = perf_counter()\n"
+                "from fibermodes import FiberFactory, Simulator\n"
+                "print(t1 - t, perf_counter() - t1)\n")
+        times = [[float(t) for t in _run(code).split()]
+                 for _ in range(self.RUNS)]
+        tnumpy, t = map(min, zip(*times))
+        self.assertLess(t, max(self.BUDGET, tnumpy))
+
+
+if __name__ == "__main__":
+    unittest.main()
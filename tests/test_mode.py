@@ -26,6 +26,16 @@ class TestMode(unittest.TestCase):
         self.assertNotEqual(Mode('HE', 1, 1), Mode('HE', 2, 1))
         self.assertNotEqual(Mode('HE', 1, 1), Mode('LP', 0, 1))
 
+    def testId(self):
+        modes = [Mode(fam, nu, m) for fam in Family
+                 for nu in (0, 1, 2, 8191) for m in (1, 2, 100)]
+        ids = [mode.id for mode in modes]
+        self.assertEqual(len(set(ids)), len(modes))
+        for mode, id_ in zip(modes, ids):
+            self.assertIsInstance(id_, int)
+            self.assertEqual(Mode.fromId(id_), mode)
+        self.assertEqual(Mode('HE', 1, 1).id, HE11.id)
+
     def testLpEq(self):
         mode = Mode(Family.HE, 1, 1)
         self.assertEqual(mode.lpEq(), Mode(Family.LP, 0, 1))
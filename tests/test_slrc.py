@@ -99,6 +99,18 @@ class TestSLRC(unittest.TestCase):
         x = SLRC(testCode)
         self.assertAlmostEqual(x(), 3.141592653589793)
 
+    def testCodeCompiledOnce(self):
+        testCode = "return 2 * r[0]"
+        x = SLRC(testCode)
+        x.codeParams = ["r"]
+        y = SLRC(testCode)
+        y.codeParams = ["r"]
+        self.assertIs(x.value, y.value)
+        self.assertEqual(x([3]), 6)
+
+        y.codeParams = ["r", "fp"]
+        self.assertIsNot(x.value, y.value)
+
     def testBadCode(self):
         """Test execution of not allowed code"""
         testCode = "import os"
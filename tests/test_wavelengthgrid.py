@@ -0,0 +1,69 @@
+# This file is part of FiberModes.
+#
+# FiberModes is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FiberModes is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FiberModes.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test suite for fibermodes.wavelengthgrid module"""
+
+import unittest
+import pickle
+import numpy
+
+from fibermodes import Wavelength, WavelengthGrid
+
+
+class TestWavelengthGrid(unittest.TestCase):
+
+    def testConversions(self):
+        values = [1300e-9, 1550e-9]
+        g = WavelengthGrid(values)
+        for name in ('k0', 'omega', 'w', 'frequency', 'v', 'f'):
+            self.assertIsInstance(getattr(g, name), numpy.ndarray)
+            self.assertNotIsInstance(getattr(g, name), WavelengthGrid)
+            self.assertEqual(list(getattr(g, name)),
+                             [getattr(Wavelength(wl), name) for wl in values])
+            h = WavelengthGrid(**{name: getattr(g, name)})
+            numpy.testing.assert_allclose(h, values, rtol=1e-15)
+        self.assertEqual(list(g.wavelength), values)
+        self.assertEqual(list(WavelengthGrid(wl=values)), values)
+
+        g = WavelengthGrid([0])
+        self.assertEqual(g.k0[0], float("inf"))
+
+    def testElements(self):
+        g = WavelengthGrid([1300e-9, 1550e-9, 1600e-9])
+        self.assertEqual(len(g), 3)
+        self.assertIsInstance(g[1], Wavelength)
+        self.assertEqual(g[-1], 1600e-9)
+        self.assertTrue(all(isinstance(wl, Wavelength) for wl in g))
+        self.assertEqual(list(reversed(g)), [1600e-9, 1550e-9, 1300e-9])
+        self.assertIsInstance(g[1:], WavelengthGrid)
+        self.assertEqual(list(g[1:]), [1550e-9, 1600e-9])
+        self.assertNotIsInstance(g * 2, WavelengthGrid)
+        self.assertEqual(str(g[:1]), "[1300.00 nm]")
+
+        g = pickle.loads(pickle.dumps(g))
+        self.assertIsInstance(g, WavelengthGrid)
+        self.assertEqual(len(g), 3)
+
+    def testInit(self):
+        self.assertEqual(len(WavelengthGrid()), 0)
+        self.assertEqual(list(WavelengthGrid(1550e-9)), [1550e-9])
+        with self.assertRaises(TypeError):
+            WavelengthGrid([1550e-9], k0=[1])
+        with self.assertRaises(TypeError):
+            WavelengthGrid(x=[1])
+
+
+if __name__ == "__main__":
+    unittest.main()